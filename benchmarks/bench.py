@@ -0,0 +1,208 @@
+"""Micro-benchmarks for the deterministic metrics and text utilities.
+
+Usage:
+    python -m benchmarks.bench --save benchmarks/baseline.json
+    python -m benchmarks.bench --compare benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from benchmarks.corpus import corpus_sizes, generate_corpus
+from rage.case import RageCase
+from rage.metrics import ContextPrecisionRecallF1, RougeLAnswerFaithfulness, WorldOverlapAnswerFaithfulness
+from rage.tokenizer import default_tokenizer, warm_up_jieba
+from rage.utils import caculate_rouge_l_score, calculate_word_overlap, clear_sentence_cache, split_chinese_sentences
+
+Benchmark = Callable[[Sequence[RageCase]], object]
+
+
+def bench_split_chinese_sentences(cases: Sequence[RageCase]) -> None:
+    for case in cases:
+        for context in case.retrieved_contexts:
+            split_chinese_sentences(context)
+
+
+def bench_calculate_word_overlap(cases: Sequence[RageCase]) -> None:
+    for case in cases:
+        calculate_word_overlap(case.generated_answer, case.answer, split_to_sentence=True)  # type: ignore
+
+
+def bench_caculate_rouge_l_score(cases: Sequence[RageCase]) -> None:
+    for case in cases:
+        caculate_rouge_l_score(case.generated_answer, case.answer)  # type: ignore
+
+
+def metric_benchmark(metric_factory: Callable[[], object]) -> Benchmark:
+    def run(cases: Sequence[RageCase]) -> None:
+        metric = metric_factory()
+        for case in cases:
+            metric.calculate(case)  # type: ignore
+
+    return run
+
+
+benchmarks: Dict[str, Benchmark] = {
+    "split_chinese_sentences": bench_split_chinese_sentences,
+    "calculate_word_overlap": bench_calculate_word_overlap,
+    "caculate_rouge_l_score": bench_caculate_rouge_l_score,
+    "word_overlap_faithfulness": metric_benchmark(WorldOverlapAnswerFaithfulness),
+    "rouge_l_faithfulness": metric_benchmark(RougeLAnswerFaithfulness),
+    "context_prf1_exact": metric_benchmark(lambda: ContextPrecisionRecallF1.from_parameters(match_strategy="exact")),
+    "context_prf1_rouge": metric_benchmark(lambda: ContextPrecisionRecallF1.from_parameters(match_strategy="rouge")),
+}
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    size: str
+    language: str
+    num_cases: int
+    ops_per_sec: float
+    best_seconds: float
+    peak_memory_kib: float
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.name, self.size, self.language)
+
+
+class BenchmarkReport(BaseModel):
+    metadata: Dict[str, str]
+    results: List[BenchmarkResult]
+
+
+def clear_caches() -> None:
+    """Every round starts cold, so the numbers measure the work itself rather than cache hits."""
+    default_tokenizer.clear()
+    clear_sentence_cache()
+
+
+def measure(benchmark: Benchmark, cases: Sequence[RageCase], repeat: int) -> Tuple[float, float]:
+    best_seconds = float("inf")
+    for _ in range(repeat):
+        clear_caches()
+        start_time = time.perf_counter()
+        benchmark(cases)
+        best_seconds = min(best_seconds, time.perf_counter() - start_time)
+    clear_caches()
+    tracemalloc.start()
+    try:
+        benchmark(cases)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best_seconds, peak_memory / 1024
+
+
+def run_benchmarks(
+    names: Sequence[str], sizes: Sequence[str], languages: Sequence[str], repeat: int = 3, seed: int = 0
+) -> BenchmarkReport:
+    # Loads the jieba dictionary outside of any measured round.
+    warm_up_jieba()
+    results = []
+    for size in sizes:
+        for language in languages:
+            cases = generate_corpus(size, language, seed)  # type: ignore
+            for name in names:
+                best_seconds, peak_memory_kib = measure(benchmarks[name], cases, repeat)
+                results.append(
+                    BenchmarkResult(
+                        name=name,
+                        size=size,
+                        language=language,
+                        num_cases=len(cases),
+                        ops_per_sec=len(cases) / best_seconds if best_seconds > 0 else float("inf"),
+                        best_seconds=best_seconds,
+                        peak_memory_kib=peak_memory_kib,
+                    )
+                )
+    metadata = {"python": platform.python_version(), "platform": platform.platform(), "seed": str(seed)}
+    return BenchmarkReport(metadata=metadata, results=results)
+
+
+class Comparison(BaseModel):
+    result: BenchmarkResult
+    baseline: Optional[BenchmarkResult] = None
+    speed_ratio: Optional[float] = None
+    memory_ratio: Optional[float] = None
+    is_regression: bool = False
+
+
+def compare(report: BenchmarkReport, baseline: BenchmarkReport, tolerance: float = 0.1) -> List[Comparison]:
+    """A result regresses when it is more than `tolerance` slower, or uses more than `tolerance` extra peak memory."""
+    baseline_results = {result.key: result for result in baseline.results}
+    comparisons = []
+    for result in report.results:
+        baseline_result = baseline_results.get(result.key)
+        if baseline_result is None:
+            comparisons.append(Comparison(result=result))
+            continue
+        speed_ratio = result.ops_per_sec / baseline_result.ops_per_sec
+        memory_ratio = result.peak_memory_kib / baseline_result.peak_memory_kib if baseline_result.peak_memory_kib else 1.0
+        comparisons.append(
+            Comparison(
+                result=result,
+                baseline=baseline_result,
+                speed_ratio=speed_ratio,
+                memory_ratio=memory_ratio,
+                is_regression=speed_ratio < 1 - tolerance or memory_ratio > 1 + tolerance,
+            )
+        )
+    return comparisons
+
+
+def format_table(comparisons: List[Comparison]) -> str:
+    header = f"{'benchmark':<28}{'size':<8}{'lang':<6}{'ops/sec':>12}{'peak KiB':>12}{'speed':>9}{'memory':>9}"
+    lines = [header, "-" * len(header)]
+    for comparison in comparisons:
+        result = comparison.result
+        speed = f"{comparison.speed_ratio:.2f}x" if comparison.speed_ratio is not None else "-"
+        memory = f"{comparison.memory_ratio:.2f}x" if comparison.memory_ratio is not None else "-"
+        flag = "  REGRESSION" if comparison.is_regression else ""
+        lines.append(
+            f"{result.name:<28}{result.size:<8}{result.language:<6}{result.ops_per_sec:>12.1f}"
+            f"{result.peak_memory_kib:>12.1f}{speed:>9}{memory:>9}{flag}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", nargs="+", choices=list(benchmarks), default=list(benchmarks))
+    parser.add_argument("--sizes", nargs="+", choices=list(corpus_sizes), default=list(corpus_sizes))
+    parser.add_argument("--languages", nargs="+", choices=["zh", "en"], default=["zh", "en"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", type=Path, help="compare against a baseline JSON file, exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.benchmarks, args.sizes, args.languages, repeat=args.repeat, seed=args.seed)
+    comparisons = [Comparison(result=result) for result in report.results]
+    if args.compare is not None:
+        if args.compare.exists():
+            baseline = BenchmarkReport.model_validate_json(args.compare.read_text(encoding="utf-8"))
+            comparisons = compare(report, baseline, tolerance=args.tolerance)
+        else:
+            sys.stderr.write(f"Baseline {args.compare} does not exist, run with --save first\n")
+    sys.stdout.write(format_table(comparisons))
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report.model_dump(mode="json"), indent=2) + "\n", encoding="utf-8")
+    return int(any(comparison.is_regression for comparison in comparisons))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel
+
+from rage.case import RageCase
+
+Language = Literal["zh", "en"]
+
+zh_words = (
+    "我们 他们 公司 城市 国家 政府 学生 老师 医生 研究 发展 经济 技术 数据 模型 系统 问题 方法 结果 影响 "
+    "提高 降低 增加 减少 使用 提供 支持 需要 进行 包括 认为 发现 表示 通过 根据 由于 因此 但是 同时 已经 "
+    "今年 去年 北京 上海 法国 巴黎 长江 黄河 历史 文化 市场 产品 服务 用户 平台 网络 信息 安全 能源 环境 "
+    "气候 健康 教育 科学 工程 农业 工业 交通 旅游 体育 音乐 电影 艺术 首都 人口 面积 年代 世纪 重要 主要"
+).split()
+en_words = (
+    "the a of and to in is was for on with as by at from that this which model data system city country "
+    "government student teacher research growth economy technology result method problem impact increase reduce "
+    "provide support include report found river capital population area history culture market product service "
+    "user network security energy climate health education science engineering transport music art century "
+    "important major first new large small early modern public local national global"
+).split()
+
+
+class CorpusSize(BaseModel):
+    num_cases: int
+    num_contexts: int
+    num_retrieved: int
+    sentences_per_context: int
+
+
+corpus_sizes: Dict[str, CorpusSize] = {
+    "small": CorpusSize(num_cases=40, num_contexts=2, num_retrieved=5, sentences_per_context=2),
+    "medium": CorpusSize(num_cases=20, num_contexts=3, num_retrieved=10, sentences_per_context=4),
+    "large": CorpusSize(num_cases=5, num_contexts=5, num_retrieved=50, sentences_per_context=8),
+}
+
+
+class CorpusGenerator:
+    """Seeded synthetic RAG cases, the same `(size, language, seed)` always yields the same cases.
+
+    Retrieved contexts mix exact copies of the ground truth contexts, lightly edited copies and unrelated
+    distractors, answers reuse context sentences, so every metric exercises both its matching and non-matching paths.
+    """
+
+    def __init__(self, language: Language = "zh", seed: int = 0) -> None:
+        self.language = language
+        self.random = random.Random(seed)
+        self.words = zh_words if language == "zh" else en_words
+
+    def sentence_words(self) -> List[str]:
+        return self.random.choices(self.words, k=self.random.randint(6, 16))
+
+    def render(self, sentences: List[List[str]]) -> str:
+        if self.language == "zh":
+            return "".join("".join(words) + self.random.choice("。。。？！") for words in sentences)
+        return " ".join(" ".join(words).capitalize() + self.random.choice("...?!") for words in sentences)
+
+    def edit(self, words: List[str], rate: float = 0.15) -> List[str]:
+        return [self.random.choice(self.words) if self.random.random() < rate else word for word in words]
+
+    def generate_case(self, size: CorpusSize) -> RageCase:
+        contexts = [[self.sentence_words() for _ in range(size.sentences_per_context)] for _ in range(size.num_contexts)]
+        rendered_contexts = [self.render(context) for context in contexts]
+        retrieved_contexts = []
+        for index in range(size.num_retrieved):
+            kind = index % 3
+            if kind == 0:
+                retrieved_contexts.append(self.random.choice(rendered_contexts))
+            elif kind == 1:
+                retrieved_contexts.append(self.render([self.edit(words) for words in self.random.choice(contexts)]))
+            else:
+                retrieved_contexts.append(self.render([self.sentence_words() for _ in range(size.sentences_per_context)]))
+        self.random.shuffle(retrieved_contexts)
+        answer = [self.random.choice(context) for context in contexts]
+        generated_answer = [self.edit(words, rate=0.3) for words in answer] + [self.sentence_words()]
+        return RageCase(
+            question=self.render([self.sentence_words()]),
+            contexts=rendered_contexts,
+            answer=self.render(answer),
+            retrieved_contexts=retrieved_contexts,
+            generated_answer=self.render(generated_answer),
+        )
+
+    def generate(self, size: CorpusSize) -> List[RageCase]:
+        return [self.generate_case(size) for _ in range(size.num_cases)]
+
+
+def generate_corpus(size: str = "small", language: Language = "zh", seed: int = 0) -> List[RageCase]:
+    return CorpusGenerator(language, seed).generate(corpus_sizes[size])
@@ -0,0 +1,306 @@
+"""Local OpenAI-compatible chat completion server that answers like a judge model.
+
+Replies are schema-valid structured outputs for the prompts built by `rage.models.RageModel`: scores within the
+`Ge`/`Le` range of a `RageScorer`, labels from the `Literal` of a `RageClassifier`, statement lists for
+`AnswerStatements` and one output per case for packed requests. Outputs are generated from the JSON schema in the prompt,
+or from the schema registered with `FakeJudgeServer.register_model`, the command line registers the default generate
+based metrics. Latency, server errors and 429 rate limits are injected according to `JudgeServerConfig`.
+
+Usage:
+    python -m benchmarks.judge_server --port 8000 --latency 0.3 --rate-limit-rate 0.05
+    OPENAI_API_BASE=http://127.0.0.1:8000/v1 OPENAI_API_KEY=fake python your_eval.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+from rage.models import RageModel, packed_case_pattern
+from rage.scheduler import TokenBucket
+from rage.tokenizer import estimate_tokens
+from rage.utils import split_chinese_sentences
+
+json_schema_marker = "JSON Schema:\n"
+instruction_header = "# Instruction\n"
+output_format_header = "\n# Output Format\n"
+
+
+class JudgeServerConfig(BaseModel):
+    latency_distribution: Literal["constant", "uniform", "lognormal"] = "lognormal"
+    latency_seconds: float = 0.2
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    requests_per_minute: Optional[float] = None
+    retry_after_seconds: float = 1.0
+    seed: int = 0
+
+
+class JudgeServerStats(BaseModel):
+    num_requests: int = 0
+    num_errors: int = 0
+    num_rate_limited: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+
+def sample_latency(config: JudgeServerConfig, rng: random.Random) -> float:
+    """`latency_seconds` is the median, `latency_spread` the relative half-width (uniform) or sigma (lognormal)."""
+    if config.latency_distribution == "constant":
+        return config.latency_seconds
+    if config.latency_distribution == "uniform":
+        spread = config.latency_seconds * config.latency_spread
+        return max(0.0, rng.uniform(config.latency_seconds - spread, config.latency_seconds + spread))
+    return config.latency_seconds * rng.lognormvariate(0, config.latency_spread)
+
+
+def structured_reply(
+    system_content: str, user_content: str, rng: random.Random, output_schemas: Dict[str, List[Dict[str, Any]]]
+) -> Any:
+    if json_schema_marker in system_content:
+        schema = json.loads(system_content.split(json_schema_marker, 1)[1])
+        defs = schema.get("$defs", {})
+        if "outputs" in schema.get("properties", {}):
+            item_schema = schema["properties"]["outputs"]["items"]
+            cases = packed_case_pattern.split(user_content)[2::2]
+            return {"outputs": [_instance_from_schema(item_schema, defs, case, rng) for case in cases]}
+        return _instance_from_schema(schema, defs, user_content, rng)
+    schema = registered_schema(system_content, output_schemas)
+    return _instance_from_schema(schema, schema.get("$defs", {}), user_content, rng)
+
+
+def registered_schema(system_content: str, output_schemas: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """The registered output schema of the prompt's instruction.
+
+    Without `$defs` the prompt describes the output by its pydantic fields instead of a JSON schema, so the schema comes
+    from `FakeJudgeServer.register_model`. An instruction registered with several schemas (`cot` adds a `reason`) picks
+    the largest one whose fields are all named in the output format.
+    """
+    instruction, _, output_format = system_content.partition(output_format_header)
+    instruction = instruction.split(instruction_header, 1)[-1]
+    candidates = [
+        schema
+        for schema in output_schemas.get(instruction, [])
+        if all(f'"{name}"' in output_format for name in schema.get("properties", {}))
+    ]
+    if not candidates:
+        raise ValueError("Unknown output format, register the model with FakeJudgeServer.register_model")
+    return max(candidates, key=lambda schema: len(schema.get("properties", {})))
+
+
+def _instance_from_schema(  # noqa: PLR0911
+    schema: Dict[str, Any], defs: Dict[str, Any], user_content: str, rng: random.Random
+) -> Any:
+    if "$ref" in schema:
+        return _instance_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, user_content, rng)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    schema_type = schema.get("type")
+    if schema_type == "array":
+        # Statements are sentences of the case, without the "Question: " style labels of the case template.
+        text = "。".join(line.split(": ", 1)[-1] for line in user_content.splitlines())
+        statements = split_chinese_sentences(text) or [user_content]
+        return [
+            _instance_from_schema(schema["items"], defs, statement, rng)
+            for statement in rng.sample(statements, k=min(len(statements), rng.randint(1, 3)))
+        ]
+    if schema_type == "object":
+        return {name: _instance_from_schema(field, defs, user_content, rng) for name, field in schema["properties"].items()}
+    if schema_type in ("number", "integer"):
+        value = rng.uniform(schema.get("minimum", 0), schema.get("maximum", 1))
+        return round(value) if schema_type == "integer" else value
+    if schema_type == "boolean":
+        return rng.choice([True, False])
+    return user_content[:200]
+
+
+class FakeJudgeServer:
+    """Threaded HTTP server answering `POST .../chat/completions`, start it with `with FakeJudgeServer() as server`."""
+
+    def __init__(self, config: Optional[JudgeServerConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or JudgeServerConfig()
+        self.stats = JudgeServerStats()
+        self.rate_limit_bucket = TokenBucket(self.config.requests_per_minute) if self.config.requests_per_minute else None
+        self.output_schemas: Dict[str, List[Dict[str, Any]]] = {}
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_class(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def register_model(self, model: RageModel) -> None:
+        """Answer the prompts of `model` with its output schema."""
+        schemas = self.output_schemas.setdefault(model.instruction, [])
+        schema = model.output_pydantic_model.model_json_schema()
+        if schema not in schemas:
+            schemas.append(schema)
+
+    def start(self) -> FakeJudgeServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> FakeJudgeServer:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _admit(self) -> Optional[int]:
+        """Update the counters and pick the status code to inject, if any."""
+        with self._lock:
+            self.stats.num_requests += 1
+            if self.rate_limit_bucket is not None and self.rate_limit_bucket.reserve(1) > 0:
+                # A rejected request does not consume the provider's budget.
+                self.rate_limit_bucket.tokens += 1
+                self.stats.num_rate_limited += 1
+                return 429
+            draw = self._rng.random()
+            if draw < self.config.rate_limit_rate:
+                self.stats.num_rate_limited += 1
+                return 429
+            if draw < self.config.rate_limit_rate + self.config.error_rate:
+                self.stats.num_errors += 1
+                return 500
+            self.stats.in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+            return None
+
+    def _release(self) -> None:
+        with self._lock:
+            self.stats.in_flight -= 1
+
+    def completion(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[Dict[str, Any]] = request.get("messages", [])
+        system_content = next((str(m.get("content")) for m in messages if m.get("role") == "system"), "")
+        user_content = str(messages[-1].get("content", "")) if messages else ""
+        digest = hashlib.blake2b(f"{self.config.seed}:{user_content}".encode(), digest_size=8).digest()
+        rng = random.Random(int.from_bytes(digest, "big"))
+        content = json.dumps(structured_reply(system_content, user_content, rng, self.output_schemas), ensure_ascii=False)
+        prompt_tokens = sum(estimate_tokens(str(message.get("content", ""))) for message in messages)
+        completion_tokens = estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-{digest.hex()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-judge"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+def _handler_class(server: FakeJudgeServer) -> type:
+    class JudgeRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # noqa: N802
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._respond(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            status = server._admit()
+            if status == 429:  # noqa: PLR2004
+                headers = {"Retry-After": str(server.config.retry_after_seconds)}
+                self._respond(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}}, headers)
+                return
+            if status is not None:
+                self._respond(status, {"error": {"message": "Injected server error", "type": "server_error"}})
+                return
+            try:
+                with server._lock:
+                    latency = sample_latency(server.config, server._rng)
+                time.sleep(latency)
+                try:
+                    completion = server.completion(json.loads(body))
+                except ValueError as error:
+                    self._respond(400, {"error": {"message": str(error), "type": "invalid_request_error"}})
+                    return
+                self._respond(200, completion)
+            finally:
+                server._release()
+
+        def _respond(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+    return JudgeRequestHandler
+
+
+def register_default_metrics(server: FakeJudgeServer) -> None:
+    from rage import metrics
+
+    for name in metrics.__all__:
+        if name.startswith("GenerateBased"):
+            for cot in (False, True):
+                server.register_model(getattr(metrics, name).from_parameters(cot=cot).model)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-distribution", choices=["constant", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency", type=float, default=0.2, help="median latency in seconds")
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=None, help="reject requests above this rate with 429")
+    args = parser.parse_args()
+    config = JudgeServerConfig(
+        latency_distribution=args.latency_distribution,
+        latency_seconds=args.latency,
+        latency_spread=args.latency_spread,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_minute=args.rpm,
+    )
+    server = FakeJudgeServer(config, host=args.host, port=args.port)
+    register_default_metrics(server)
+    sys.stderr.write(f"Serving fake judge at {server.base_url}\n")
+    with contextlib.suppress(KeyboardInterrupt):
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Load test of the generate-based metrics against the local fake judge server.
+
+Every concurrency level evaluates the same seeded cases with a fresh connection pool and reports cases/sec, case and
+LLM tail latency, errors, 429s and memory.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1 4 16 64 --size medium --latency 0.2
+    python -m benchmarks.load_test --concurrency 8 32 --server-rpm 600 --client-rpm 550 --mode async
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from benchmarks.corpus import corpus_sizes, generate_corpus
+from benchmarks.judge_server import FakeJudgeServer, JudgeServerConfig
+from rage.case import RageCase
+from rage.client_registry import configure_connection_pool, default_registry
+from rage.instrumentation import instrument
+from rage.metrics import (
+    GenerateBasedAnswerCorrectness,
+    GenerateBasedAnswerFaithfulness,
+    GenerateBasedAnswerRelevance,
+    GenerateBasedContextCoverage,
+    GenerateBasedContextPrecision,
+)
+from rage.metrics.base import RageMetric
+from rage.scheduler import configure_rate_limit
+from rage.suite import EvaluationSuite, SuiteResult
+
+metric_factories: Dict[str, Callable[..., RageMetric]] = {
+    "relevance": GenerateBasedAnswerRelevance.from_parameters,
+    "correctness": GenerateBasedAnswerCorrectness.from_parameters,
+    "faithfulness": GenerateBasedAnswerFaithfulness.from_parameters,
+    "coverage": GenerateBasedContextCoverage.from_parameters,
+    "precision": GenerateBasedContextPrecision.from_parameters,
+}
+percentiles = (50, 95, 99)
+
+
+class LoadResult(BaseModel):
+    concurrency: int
+    mode: str
+    num_cases: int
+    elapsed_seconds: float
+    cases_per_sec: float
+    num_errors: int
+    num_llm_calls: int
+    num_rate_limited: int
+    case_latency: Dict[str, float]
+    llm_latency: Dict[str, float]
+    peak_rss_mib: float
+    peak_traced_mib: Optional[float] = None
+
+
+def point_openai_at(server: FakeJudgeServer) -> None:
+    os.environ["OPENAI_API_BASE"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "fake"
+
+
+def run_load(  # noqa: PLR0913
+    server: FakeJudgeServer,
+    cases: Sequence[RageCase],
+    concurrency: int,
+    metric_names: Sequence[str],
+    model_id: str = "openai/gpt-3.5-turbo",
+    mode: str = "sync",
+    trace_memory: bool = False,
+) -> LoadResult:
+    # A fresh registry per run, so every level starts with a cold pool sized for it and async clients never outlive
+    # the event loop that created them.
+    default_registry.clear()
+    configure_connection_pool(max_connections=concurrency * 4, max_keepalive_connections=concurrency * 4)
+    suite = EvaluationSuite(
+        {name: metric_factories[name](model_id=model_id) for name in metric_names}, max_concurrency=concurrency
+    )
+    for metric in suite.metrics.values():
+        server.register_model(metric.model)
+    num_rate_limited = server.stats.num_rate_limited
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with instrument() as collector:
+            if mode == "async":
+                result = asyncio.run(suite.arun(cases, max_concurrency=concurrency))
+            else:
+                result = suite.run(cases)
+        peak_traced_mib = tracemalloc.get_traced_memory()[1] / 2**20 if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    model_stats = collector.report().models.get(model_id)
+    return LoadResult(
+        concurrency=concurrency,
+        mode=mode,
+        num_cases=len(result.rows),
+        elapsed_seconds=result.elapsed_seconds,
+        cases_per_sec=result.throughput,
+        num_errors=sum(row.num_errors for row in result.rows),
+        num_llm_calls=model_stats.num_calls if model_stats is not None else 0,
+        num_rate_limited=server.stats.num_rate_limited - num_rate_limited,
+        case_latency=case_latency_percentiles(result),
+        llm_latency=model_stats.latency_quantiles if model_stats is not None else {},
+        peak_rss_mib=peak_rss_mib(),
+        peak_traced_mib=peak_traced_mib,
+    )
+
+
+def peak_rss_mib() -> float:
+    """`ru_maxrss` is in kilobytes on Linux but in bytes on macOS."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 1024
+
+
+def case_latency_percentiles(result: SuiteResult) -> Dict[str, float]:
+    """A case is done when its slowest metric is, so its latency is the longest metric wall time of the row."""
+    latencies = [
+        max(metric_result.extra.get("instrumentation", {}).get("wall_seconds", 0.0) for metric_result in row.results.values())
+        for row in result.rows
+        if row.results
+    ]
+    if not latencies:
+        return {}
+    values = np.percentile(np.asarray(latencies), percentiles)
+    return {f"p{percentile}": float(value) for percentile, value in zip(percentiles, values)}
+
+
+table_header = (
+    f"{'conc':>5}{'mode':>7}{'cases/s':>10}{'case p50':>10}{'case p99':>10}"
+    f"{'llm p50':>10}{'llm p99':>10}{'errors':>8}{'429s':>7}{'rss MiB':>9}"
+)
+
+
+def format_row(result: LoadResult) -> str:
+    return (
+        f"{result.concurrency:>5}{result.mode:>7}{result.cases_per_sec:>10.2f}"
+        f"{result.case_latency.get('p50', 0):>10.3f}{result.case_latency.get('p99', 0):>10.3f}"
+        f"{result.llm_latency.get('0.5', 0):>10.3f}{result.llm_latency.get('0.99', 0):>10.3f}"
+        f"{result.num_errors:>8}{result.num_rate_limited:>7}{result.peak_rss_mib:>9.1f}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--metrics", nargs="+", choices=list(metric_factories), default=list(metric_factories))
+    parser.add_argument("--size", choices=list(corpus_sizes), default="small")
+    parser.add_argument("--language", choices=["zh", "en"], default="zh")
+    parser.add_argument("--latency-distribution", choices=["constant", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency", type=float, default=0.2, help="median judge latency in seconds")
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--server-rpm", type=float, default=None, help="requests per minute the fake judge accepts")
+    parser.add_argument("--client-rpm", type=float, default=None, help="rate limit configured in the rage scheduler")
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peaks, slows the run down")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    config = JudgeServerConfig(
+        latency_distribution=args.latency_distribution,
+        latency_seconds=args.latency,
+        latency_spread=args.latency_spread,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_minute=args.server_rpm,
+    )
+    model_id = "openai/gpt-3.5-turbo"
+    if args.client_rpm is not None or args.rate_limit_rate > 0 or args.server_rpm is not None:
+        configure_rate_limit(model_id, requests_per_minute=args.client_rpm)
+    cases = generate_corpus(args.size, args.language)
+    results = []
+    sys.stdout.write(f"{table_header}\n{'-' * len(table_header)}\n")
+    with FakeJudgeServer(config) as server:
+        point_openai_at(server)
+        for concurrency in args.concurrency:
+            result = run_load(server, cases, concurrency, args.metrics, model_id, args.mode, args.trace_memory)
+            results.append(result)
+            sys.stdout.write(format_row(result) + "\n")
+            sys.stdout.flush()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([result.model_dump(mode="json") for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache(ABC):
+    """Key-value store for structured LLM responses, consulted by `RageModel` before calling the chat model.
+
+    Args:
+        max_entries: Maximum number of entries to keep, least recently used entries are evicted first.
+        ttl: Entries older than `ttl` seconds are treated as missing and evicted.
+        read_only: Never write or evict, useful for reproducible CI runs against a pre-built cache.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None, read_only: bool = False) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.read_only = read_only
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:  # noqa: A003
+        if self.read_only:
+            return
+        num_evicted = self._set(key, value)
+        with self._stats_lock:
+            self.stats.writes += 1
+            self.stats.evictions += num_evicted
+
+    def is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> int:
+        """Store the value and return the number of evicted entries."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class SQLiteResponseCache(ResponseCache):
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        read_only: bool = False,
+    ) -> None:
+        super().__init__(max_entries=max_entries, ttl=ttl, read_only=read_only)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        if read_only:
+            self._connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._connection.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.is_expired(created_at):
+                if not self.read_only:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._connection.commit()
+                return None
+            if not self.read_only:
+                self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._connection.commit()
+            return value
+
+    def _set(self, key: str, value: str) -> int:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            num_evicted = 0
+            if self.ttl is not None:
+                num_evicted += self._connection.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+                ).rowcount
+            if self.max_entries is not None:
+                (num_entries,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+                if num_entries > self.max_entries:
+                    num_evicted += self._connection.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                        (num_entries - self.max_entries,),
+                    ).rowcount
+            self._connection.commit()
+        return num_evicted
+
+    def clear(self) -> None:
+        if self.read_only:
+            return
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (num_entries,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return num_entries
+
+
+class DirectoryResponseCache(ResponseCache):
+    """Stores one JSON file per entry, file modification time tracks the last access for eviction."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        read_only: bool = False,
+    ) -> None:
+        super().__init__(max_entries=max_entries, ttl=ttl, read_only=read_only)
+        self.directory = Path(directory)
+        if not read_only:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._num_entries = sum(1 for _ in self._entry_files())
+
+    def _entry_file(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entry_files(self):
+        return self.directory.glob("*/*.json")
+
+    def _get(self, key: str) -> Optional[str]:
+        entry_file = self._entry_file(key)
+        try:
+            entry = json.loads(entry_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if self.is_expired(entry["created_at"]):
+            if not self.read_only:
+                self._remove(entry_file)
+            return None
+        if not self.read_only:
+            os.utime(entry_file)
+        return entry["value"]
+
+    def _set(self, key: str, value: str) -> int:
+        entry_file = self._entry_file(key)
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = entry_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_text(json.dumps({"created_at": time.time(), "value": value}, ensure_ascii=False), encoding="utf-8")
+        with self._lock:
+            is_new_entry = not entry_file.exists()
+            os.replace(tmp_file, entry_file)
+            if is_new_entry:
+                self._num_entries += 1
+            if self.max_entries is not None and self._num_entries > self.max_entries:
+                return self._evict()
+        return 0
+
+    def _evict(self) -> int:
+        entry_files = sorted(self._entry_files(), key=lambda path: path.stat().st_mtime)
+        num_evicted = 0
+        for entry_file in entry_files[: max(len(entry_files) - self.max_entries, 0)]:  # type: ignore
+            entry_file.unlink(missing_ok=True)
+            num_evicted += 1
+        self._num_entries = len(entry_files) - num_evicted
+        return num_evicted
+
+    def _remove(self, entry_file: Path) -> None:
+        with self._lock:
+            try:
+                entry_file.unlink()
+            except FileNotFoundError:
+                return
+            self._num_entries -= 1
+
+    def clear(self) -> None:
+        if self.read_only:
+            return
+        with self._lock:
+            for entry_file in self._entry_files():
+                entry_file.unlink(missing_ok=True)
+            self._num_entries = 0
+
+    def __len__(self) -> int:
+        return self._num_entries
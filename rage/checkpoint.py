@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+import types
+from pathlib import Path
+from typing import IO, Any, Dict, Optional, Set, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from rage.case import RageCase
+from rage.results import ErrorResult, RageResult
+from rage.tokenizer import CachedTokenizer
+
+RecordKey = Tuple[str, str]
+
+
+def case_id(case: RageCase) -> str:
+    """The `id` in `case.extra` if there is one, otherwise a hash of the case content."""
+    if (explicit_id := case.extra.get("id")) is not None:
+        return str(explicit_id)
+    return hashlib.sha256(case.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def describe_config(value: Any) -> Any:  # noqa: PLR0911
+    """JSON-compatible description of a metric configuration: public attributes, model fields and qualified names.
+
+    Names in a class's `fingerprint_exclude` are execution knobs such as concurrency or packing, they are left out.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [describe_config(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((describe_config(item) for item in value), key=repr)
+    if isinstance(value, dict):
+        return {str(key): describe_config(item) for key, item in value.items()}
+    if isinstance(value, CachedTokenizer):
+        # The cache does not change the tokens, only the wrapped tokenizer does.
+        return describe_config(value.tokenizer)
+    if isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType)):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, functools.partial):
+        return {"partial": describe_config(value.func), "args": describe_config(value.args), **describe_config(value.keywords)}
+    excluded = getattr(type(value), "fingerprint_exclude", frozenset())
+    if isinstance(value, BaseModel):
+        fields = type(value).model_fields
+        return {
+            "type": describe_config(type(value)),
+            **{
+                name: describe_config(getattr(value, name))
+                for name, field in fields.items()
+                if not field.exclude and name not in excluded
+            },
+        }
+    if hasattr(value, "__dict__"):
+        attributes = {name: item for name, item in vars(value).items() if not name.startswith("_") and name not in excluded}
+        return {"type": describe_config(type(value)), **describe_config(attributes)}
+    return repr(value)
+
+
+def config_fingerprint(value: Any) -> str:
+    text = json.dumps(describe_config(value), sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def input_key(metric_fingerprint: str, refined_case: RageCase) -> str:
+    """Content hash of everything a metric result depends on: the metric configuration and its projection of the case."""
+    text = metric_fingerprint + "\n" + refined_case.model_dump_json()
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def result_types() -> Dict[str, Type[RageResult]]:
+    types: Dict[str, Type[RageResult]] = {}
+    pending = [RageResult]
+    while pending:
+        result_type = pending.pop()
+        types[result_type.__name__] = result_type
+        pending.extend(result_type.__subclasses__())
+    return types
+
+
+class CheckpointRecord(BaseModel):
+    case_id: str
+    metric: str
+    status: str
+    result_type: str
+    result: Dict[str, Any]
+    created_at: float
+
+    @property
+    def is_error(self) -> bool:
+        return self.status == "error"
+
+    def to_result(self) -> RageResult:
+        return result_types().get(self.result_type, RageResult).model_validate(self.result)
+
+
+class Checkpoint:
+    """Append-only JSONL log of finished `(case id, metric)` results.
+
+    Every record is flushed and fsynced before `record` returns, so a crashed run loses at most the results that
+    were still in flight. Reopening the same path resumes from the log, the last record for a key wins.
+    """
+
+    def __init__(self, path: Union[str, Path], fsync: bool = True) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self._records: Dict[RecordKey, CheckpointRecord] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: IO[str] = open(self.path, "a", encoding="utf-8")  # noqa: SIM115
+
+    def _load(self) -> None:
+        complete_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                complete_size += len(line)
+                try:
+                    record = CheckpointRecord.model_validate_json(line)
+                except ValueError:
+                    continue
+                self._records[(record.case_id, record.metric)] = record
+        if complete_size < self.path.stat().st_size:
+            # A torn last line from a crash mid-write: cut it off so the next record starts on its own line, the
+            # result is simply recomputed.
+            with open(self.path, "r+b") as f:
+                f.truncate(complete_size)
+
+    def record(self, case_id: str, metric: str, result: RageResult) -> None:
+        record = CheckpointRecord(
+            case_id=case_id,
+            metric=metric,
+            status="error" if isinstance(result, ErrorResult) else "ok",
+            result_type=type(result).__name__,
+            result=result.model_dump(mode="json"),
+            created_at=time.time(),
+        )
+        line = record.model_dump_json() + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._records[(case_id, metric)] = record
+
+    def record_key(self, case_id: str, metric: str, metric_fingerprint: str, refined_case: RageCase) -> RecordKey:
+        """The key a result is recorded under, the case id and metric name."""
+        return case_id, metric
+
+    def get(self, case_id: str, metric: str, include_failed: bool = False) -> Optional[RageResult]:
+        record = self._records.get((case_id, metric))
+        if record is None or (record.is_error and not include_failed):
+            return None
+        return record.to_result()
+
+    def completed_keys(self) -> Set[RecordKey]:
+        return {key for key, record in self._records.items() if not record.is_error}
+
+    def failed_keys(self) -> Set[RecordKey]:
+        return {key for key, record in self._records.items() if record.is_error}
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __enter__(self) -> Checkpoint:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class IncrementalCheckpoint(Checkpoint):
+    """Checkpoint keyed by the inputs of each result instead of the case id.
+
+    A result is recorded under the hash of the metric configuration and of the case projected onto the metric's
+    `required_fields` and `optional_fields`. A later run with edited cases or metrics only recomputes the results
+    whose inputs changed: when only `generated_answer` changes, context metrics are reused as they are.
+    """
+
+    def __init__(self, path: Union[str, Path], fsync: bool = True) -> None:
+        super().__init__(path, fsync)
+        self.num_reused = 0
+        self.num_recorded = 0
+
+    def record_key(self, case_id: str, metric: str, metric_fingerprint: str, refined_case: RageCase) -> RecordKey:
+        return input_key(metric_fingerprint, refined_case), metric
+
+    def record(self, case_id: str, metric: str, result: RageResult) -> None:
+        super().record(case_id, metric, result)
+        with self._lock:
+            self.num_recorded += 1
+
+    def get(self, case_id: str, metric: str, include_failed: bool = False) -> Optional[RageResult]:
+        result = super().get(case_id, metric, include_failed)
+        if result is not None:
+            with self._lock:
+                self.num_reused += 1
+        return result
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from generate import load_chat_model
+from generate.chat_completion import ChatCompletionModel
+from generate.chat_completion.base import RemoteChatCompletionModel
+from generate.http import HttpClient
+from httpx import Limits
+from pydantic import BaseModel
+
+ChatModelKey = Tuple[str, int, float]
+
+
+class PoolConfig(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 600
+
+    @property
+    def limits(self) -> Limits:
+        return Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class PoolStats(BaseModel):
+    num_chat_models: int = 0
+    num_http_clients: int = 0
+    model_hits: int = 0
+    model_misses: int = 0
+    open_connections: int = 0
+    idle_connections: int = 0
+    waiting_requests: int = 0
+
+    @property
+    def active_connections(self) -> int:
+        return self.open_connections - self.idle_connections
+
+    @property
+    def utilization(self) -> float:
+        return self.active_connections / self.open_connections if self.open_connections else 0.0
+
+
+class ChatClientRegistry:
+    """Process-wide chat models keyed by `(model_id, timeout, temperature)`.
+
+    Remote models with the same timeout and transport settings share one `HttpClient`, so every metric that talks
+    to the same endpoint reuses the same pooled, kept-alive connections.
+    """
+
+    def __init__(self, pool_config: Optional[PoolConfig] = None) -> None:
+        self.pool_config = pool_config or PoolConfig()
+        self._chat_models: Dict[ChatModelKey, ChatCompletionModel] = {}
+        self._http_clients: Dict[Tuple[Any, ...], HttpClient] = {}
+        self._model_hits = 0
+        self._model_misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str, timeout: int, temperature: float) -> ChatCompletionModel:
+        key = (model_id, timeout, temperature)
+        with self._lock:
+            chat_model = self._chat_models.get(key)
+            if chat_model is not None:
+                self._model_hits += 1
+                return chat_model
+            self._model_misses += 1
+            chat_model = load_chat_model(model_id)
+            if isinstance(chat_model, RemoteChatCompletionModel):
+                chat_model.http_client = self._shared_http_client(chat_model.http_client, timeout)
+                chat_model.parameters.model_update(temperature=temperature)
+            self._chat_models[key] = chat_model
+            return chat_model
+
+    def _shared_http_client(self, http_client: HttpClient, timeout: int) -> HttpClient:
+        key = (timeout, http_client.stream_strategy, repr(http_client.retry), repr(http_client.proxies))
+        shared_http_client = self._http_clients.get(key)
+        if shared_http_client is None:
+            shared_http_client = HttpClient(
+                retry=http_client.retry or False,
+                timeout=timeout,
+                proxies=http_client.proxies,
+                stream_strategy=http_client.stream_strategy,
+                limits=self.pool_config.limits,
+            )
+            self._http_clients[key] = shared_http_client
+        return shared_http_client
+
+    def configure(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+    ) -> None:
+        updates = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry,
+        }
+        with self._lock:
+            self.pool_config = self.pool_config.model_copy(update={k: v for k, v in updates.items() if v is not None})
+            for http_client in self._http_clients.values():
+                http_client.limits = self.pool_config.limits
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            stats = PoolStats(
+                num_chat_models=len(self._chat_models),
+                num_http_clients=len(self._http_clients),
+                model_hits=self._model_hits,
+                model_misses=self._model_misses,
+            )
+            for http_client in self._http_clients.values():
+                for pool in _connection_pools(http_client):
+                    connections = list(getattr(pool, "connections", []))
+                    stats.open_connections += len(connections)
+                    stats.idle_connections += sum(1 for connection in connections if connection.is_idle())
+                    stats.waiting_requests += sum(
+                        1 for request in getattr(pool, "_requests", []) if getattr(request, "connection", None) is None
+                    )
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chat_models.clear()
+            self._http_clients.clear()
+            self._model_hits = 0
+            self._model_misses = 0
+
+
+def _connection_pools(http_client: HttpClient) -> Iterable[Any]:
+    for client in (http_client.client, http_client.async_client):
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        if pool is not None:
+            yield pool
+
+
+default_registry = ChatClientRegistry()
+
+
+def get_chat_model(model_id: str, timeout: int, temperature: float) -> ChatCompletionModel:
+    return default_registry.get(model_id, timeout, temperature)
+
+
+def configure_connection_pool(
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+) -> None:
+    default_registry.configure(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def connection_pool_stats() -> PoolStats:
+    return default_registry.stats()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import cached_property
+from itertools import accumulate, chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rage.tokenizer import Tokenizer, default_tokenizer
+
+
+class ContextIndex:
+    """The retrieved contexts of one case, tokenized once and indexed for sentence-level scoring.
+
+    The token sequence is the concatenation of the tokens of every context, the same tokens as tokenizing the contexts
+    joined by newlines. `token_contexts` maps every token to the contexts it occurs in and `positions` to its sorted
+    positions in the sequence, so a sentence is scored by looking up its own tokens instead of scanning the contexts.
+    """
+
+    def __init__(self, contexts: Sequence[str], tokenizer: Optional[Tokenizer] = None) -> None:
+        tokenizer = tokenizer or default_tokenizer
+        self.contexts = list(contexts)
+        self.context_tokens = [tokenizer(context) for context in self.contexts]
+        self.context_starts = [0, *accumulate(len(tokens) for tokens in self.context_tokens)][:-1]
+        self.num_tokens = sum(len(tokens) for tokens in self.context_tokens)
+        self.token_contexts: Dict[str, List[int]] = {}
+        for context_index, tokens in enumerate(self.context_tokens):
+            for token in set(tokens):
+                self.token_contexts.setdefault(token, []).append(context_index)
+
+    @cached_property
+    def positions(self) -> Dict[str, List[int]]:
+        """Built on first use, only ROUGE needs token positions."""
+        positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(chain.from_iterable(self.context_tokens)):
+            positions.setdefault(token, []).append(position)
+        return positions
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.token_contexts
+
+    def context_of(self, position: int) -> int:
+        return bisect_right(self.context_starts, position) - 1
+
+    def word_overlap(self, tokens: Sequence[str]) -> Tuple[float, Optional[int]]:
+        """Share of the distinct `tokens` found in the contexts, and the context containing most of them."""
+        distinct_tokens = set(tokens)
+        if not distinct_tokens or not self.num_tokens:
+            return 0.0, None
+        num_overlap = 0
+        context_overlap: Counter = Counter()
+        for token in distinct_tokens:
+            context_indices = self.token_contexts.get(token)
+            if context_indices is not None:
+                num_overlap += 1
+                context_overlap.update(context_indices)
+        best_context = context_overlap.most_common(1)[0][0] if context_overlap else None
+        return num_overlap / len(distinct_tokens), best_context
+
+    def lcs(self, tokens: Sequence[str]) -> Tuple[int, Optional[int]]:
+        """Longest common subsequence of `tokens` and the context tokens, and the context holding most of its matches.
+
+        Hunt-Szymanski: the LCS is the longest increasing run of matched context positions, found with a binary search
+        per match, so the cost depends on how often the sentence tokens occur in the contexts, not on the context length.
+        """
+        # `tails[k]` is the smallest context position ending a common subsequence of length k + 1, `nodes` keeps the
+        # match chains as (position, previous node) to recover one alignment.
+        tails: List[int] = []
+        tail_nodes: List[int] = []
+        nodes: List[Tuple[int, int]] = []
+        for token in tokens:
+            # Descending order keeps a sentence token from matching two context positions.
+            for position in reversed(self.positions.get(token, ())):
+                k = bisect_left(tails, position)
+                nodes.append((position, tail_nodes[k - 1] if k else -1))
+                if k == len(tails):
+                    tails.append(position)
+                    tail_nodes.append(len(nodes) - 1)
+                else:
+                    tails[k] = position
+                    tail_nodes[k] = len(nodes) - 1
+        if not tails:
+            return 0, None
+        matched_contexts: Counter = Counter()
+        node = tail_nodes[-1]
+        while node != -1:
+            position, node = nodes[node]
+            matched_contexts[self.context_of(position)] += 1
+        return len(tails), matched_contexts.most_common(1)[0][0]
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Union
+
+from rage.case import RageCase
+from rage.checkpoint import Checkpoint
+from rage.results import RageResult
+from rage.suite import EvaluationSuite, SuiteRow
+
+PathLike = Union[str, Path]
+list_fields = ("contexts", "retrieved_contexts")
+
+
+def record_to_case(record: Dict[str, Any]) -> RageCase:
+    """Build a case from a flat record, keys that are not `RageCase` fields are kept in `extra`."""
+    values: Dict[str, Any] = {}
+    extra = dict(record.get("extra") or {})
+    for key, value in record.items():
+        if key == "extra":
+            continue
+        if key in RageCase.model_fields:
+            values[key] = value
+        else:
+            extra[key] = value
+    return RageCase(**values, extra=extra)
+
+
+def read_jsonl(path: PathLike) -> Iterator[RageCase]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield record_to_case(json.loads(line))
+
+
+def read_csv(path: PathLike) -> Iterator[RageCase]:
+    """List fields are stored as JSON arrays, a cell that is not a JSON array is read as a single context."""
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            record: Dict[str, Any] = dict(row)
+            for field in list_fields:
+                if field in record:
+                    record[field] = _parse_list_cell(record[field])
+            yield record_to_case(record)
+
+
+def read_parquet(path: PathLike, batch_size: int = 1024) -> Iterator[RageCase]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading parquet files requires pyarrow, please install it with `pip install pyarrow`") from e
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        for record in batch.to_pylist():
+            yield record_to_case(record)
+
+
+def read_cases(path: PathLike) -> Iterator[RageCase]:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".jsonl":
+        return read_jsonl(path)
+    if suffix == ".csv":
+        return read_csv(path)
+    if suffix == ".parquet":
+        return read_parquet(path)
+    raise ValueError(f"Unsupported dataset format: {suffix}")
+
+
+def _parse_list_cell(cell: Optional[str]) -> list:
+    if not cell:
+        return []
+    if cell.startswith("["):
+        try:
+            return json.loads(cell)
+        except json.JSONDecodeError:
+            pass
+    return [cell]
+
+
+def row_to_record(row: SuiteRow) -> Dict[str, Any]:
+    return {
+        "case_index": row.case_index,
+        "case_id": row.case_id,
+        "results": {name: _dump_result(result) for name, result in row.results.items()},
+    }
+
+
+def _dump_result(result: RageResult) -> Dict[str, Any]:
+    return {"type": type(result).__name__, **result.model_dump(mode="json")}
+
+
+class JsonlResultWriter:
+    """Appends one JSON line per row, flushing every `flush_every` rows so partial runs are readable."""
+
+    def __init__(self, path: PathLike, flush_every: int = 1, append: bool = False) -> None:
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.num_written = 0
+        self._file: IO[str] = open(self.path, "a" if append else "w", encoding="utf-8")  # noqa: SIM115
+
+    def write(self, row: SuiteRow) -> None:
+        self._file.write(json.dumps(row_to_record(row), ensure_ascii=False) + "\n")
+        self.num_written += 1
+        if self.num_written % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> JsonlResultWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def evaluate_stream(  # noqa: PLR0913
+    cases: Iterable[RageCase],
+    suite: EvaluationSuite,
+    output_path: Optional[PathLike] = None,
+    max_pending: Optional[int] = None,
+    flush_every: int = 1,
+    checkpoint: Optional[Checkpoint] = None,
+    retry_failed: bool = True,
+    writer: Optional[JsonlResultWriter] = None,
+) -> Iterator[SuiteRow]:
+    """Evaluate lazily, optionally writing every row as JSONL to `output_path`, or to an open `writer`, as soon as it
+    is ready."""
+    if output_path is not None and writer is not None:
+        raise ValueError("Pass either output_path or writer, not both")
+    rows = suite.iter_run(cases, max_pending=max_pending, checkpoint=checkpoint, retry_failed=retry_failed)
+    if output_path is not None:
+        with JsonlResultWriter(output_path, flush_every=flush_every) as path_writer:
+            for row in rows:
+                path_writer.write(row)
+                yield row
+        return
+    for row in rows:
+        if writer is not None:
+            writer.write(row)
+        yield row
+
+
+def evaluate_file(  # noqa: PLR0913
+    input_path: PathLike,
+    output_path: PathLike,
+    suite: EvaluationSuite,
+    max_pending: Optional[int] = None,
+    flush_every: int = 100,
+    checkpoint: Optional[Checkpoint] = None,
+    retry_failed: bool = True,
+) -> int:
+    rows = evaluate_stream(
+        read_cases(input_path),
+        suite,
+        output_path,
+        max_pending=max_pending,
+        flush_every=flush_every,
+        checkpoint=checkpoint,
+        retry_failed=retry_failed,
+    )
+    return sum(1 for _ in rows)
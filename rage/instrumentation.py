@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional
+
+from pydantic import BaseModel
+
+from rage.results import ErrorResult, RageResult
+
+latency_quantiles = (0.5, 0.9, 0.99)
+
+
+class CallRecord(BaseModel):
+    """One `RageModel` inference, `estimated_usage` is set when the chat model did not report token usage."""
+
+    model_id: str
+    latency_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+    estimated_usage: bool = False
+
+
+class CallSummary(BaseModel):
+    num_calls: int = 0
+    num_cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    retries: int = 0
+    llm_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @classmethod
+    def from_records(cls, records: List[CallRecord], wall_seconds: float = 0.0) -> CallSummary:
+        return cls(
+            num_calls=len(records),
+            num_cache_hits=sum(record.cache_hit for record in records),
+            prompt_tokens=sum(record.prompt_tokens for record in records),
+            completion_tokens=sum(record.completion_tokens for record in records),
+            cost=sum(record.cost for record in records),
+            retries=sum(record.retries for record in records),
+            llm_seconds=sum(record.latency_seconds for record in records),
+            wall_seconds=wall_seconds,
+        )
+
+
+class MetricStats(BaseModel):
+    num_calls: int = 0
+    num_errors: int = 0
+    wall_seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+
+class ModelStats(BaseModel):
+    num_calls: int = 0
+    num_cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    retries: int = 0
+    latency_seconds: float = 0.0
+    latency_quantiles: Dict[str, float] = {}
+
+
+class InstrumentationReport(BaseModel):
+    metrics: Dict[str, MetricStats] = {}
+    models: Dict[str, ModelStats] = {}
+
+    def to_prometheus(self, prefix: str = "rage") -> str:
+        lines: List[str] = []
+
+        def add(name: str, kind: str, samples: Mapping[str, Any], label: str) -> None:
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for key, value in samples.items():
+                lines.append(f'{prefix}_{name}{{{label}="{_escape_label(key)}"}} {value}')
+
+        metric_fields = {
+            "metric_calls_total": "num_calls",
+            "metric_errors_total": "num_errors",
+            "metric_wall_seconds_total": "wall_seconds",
+        }
+        for name, field in metric_fields.items():
+            add(name, "counter", {key: getattr(stats, field) for key, stats in self.metrics.items()}, "metric")
+        model_fields = {
+            "llm_calls_total": "num_calls",
+            "llm_cache_hits_total": "num_cache_hits",
+            "llm_prompt_tokens_total": "prompt_tokens",
+            "llm_completion_tokens_total": "completion_tokens",
+            "llm_cost_total": "cost",
+            "llm_retries_total": "retries",
+        }
+        for name, field in model_fields.items():
+            add(name, "counter", {key: getattr(stats, field) for key, stats in self.models.items()}, "model")
+        lines.append(f"# TYPE {prefix}_llm_latency_seconds summary")
+        for key, stats in self.models.items():
+            model_label = f'model="{_escape_label(key)}"'
+            for quantile, value in stats.latency_quantiles.items():
+                lines.append(f'{prefix}_llm_latency_seconds{{{model_label},quantile="{quantile}"}} {value}')
+            lines.append(f"{prefix}_llm_latency_seconds_sum{{{model_label}}} {stats.latency_seconds}")
+            lines.append(f"{prefix}_llm_latency_seconds_count{{{model_label}}} {stats.num_calls - stats.num_cache_hits}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class InstrumentationCollector:
+    """Thread-safe aggregation of metric and model call measurements.
+
+    Latency percentiles are computed over the most recent `max_latency_samples` calls of each model.
+    """
+
+    def __init__(self, max_latency_samples: int = 100_000) -> None:
+        self.max_latency_samples = max_latency_samples
+        self._metrics: Dict[str, MetricStats] = defaultdict(MetricStats)
+        self._models: Dict[str, ModelStats] = defaultdict(ModelStats)
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.max_latency_samples))
+        self._lock = threading.Lock()
+
+    def record_call(self, record: CallRecord) -> None:
+        with self._lock:
+            stats = self._models[record.model_id]
+            stats.num_calls += 1
+            stats.prompt_tokens += record.prompt_tokens
+            stats.completion_tokens += record.completion_tokens
+            stats.cost += record.cost
+            stats.retries += record.retries
+            if record.cache_hit:
+                stats.num_cache_hits += 1
+            else:
+                stats.latency_seconds += record.latency_seconds
+                self._latencies[record.model_id].append(record.latency_seconds)
+
+    def record_metric(self, metric: str, summary: CallSummary, is_error: bool = False) -> None:
+        with self._lock:
+            stats = self._metrics[metric]
+            stats.num_calls += 1
+            stats.num_errors += is_error
+            stats.wall_seconds += summary.wall_seconds
+            stats.llm_calls += summary.num_calls
+            stats.prompt_tokens += summary.prompt_tokens
+            stats.completion_tokens += summary.completion_tokens
+            stats.cost += summary.cost
+
+    def report(self) -> InstrumentationReport:
+        import numpy as np
+
+        with self._lock:
+            models = {}
+            for model_id, stats in self._models.items():
+                models[model_id] = stats.model_copy()
+                latencies = self._latencies.get(model_id)
+                if latencies:
+                    values = np.quantile(np.fromiter(latencies, dtype=np.float64), latency_quantiles)
+                    models[model_id].latency_quantiles = {
+                        str(quantile): float(value) for quantile, value in zip(latency_quantiles, values)
+                    }
+            metrics = {name: stats.model_copy() for name, stats in self._metrics.items()}
+        return InstrumentationReport(metrics=metrics, models=models)
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.report().model_dump(mode="json"), indent=indent)
+
+    def to_prometheus(self, prefix: str = "rage") -> str:
+        return self.report().to_prometheus(prefix)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+            self._models.clear()
+            self._latencies.clear()
+
+
+_collector: Optional[InstrumentationCollector] = None
+_call_records: ContextVar[Optional[List[CallRecord]]] = ContextVar("rage_call_records", default=None)
+
+
+def enable_instrumentation(collector: Optional[InstrumentationCollector] = None) -> InstrumentationCollector:
+    global _collector  # noqa: PLW0603
+    _collector = collector or InstrumentationCollector()
+    return _collector
+
+
+def disable_instrumentation() -> None:
+    global _collector  # noqa: PLW0603
+    _collector = None
+
+
+def current_collector() -> Optional[InstrumentationCollector]:
+    return _collector
+
+
+@contextmanager
+def instrument(collector: Optional[InstrumentationCollector] = None) -> Iterator[InstrumentationCollector]:
+    global _collector  # noqa: PLW0603
+    previous_collector = _collector
+    try:
+        yield enable_instrumentation(collector)
+    finally:
+        _collector = previous_collector
+
+
+def is_instrumenting() -> bool:
+    return _collector is not None
+
+
+def record_call(record: CallRecord) -> None:
+    collector = _collector
+    if collector is None:
+        return
+    collector.record_call(record)
+    records = _call_records.get()
+    if records is not None:
+        records.append(record)
+
+
+class MetricMeasurement:
+    def __init__(self, metric: str) -> None:
+        self.metric = metric
+        self.records: List[CallRecord] = []
+        self.start_time = time.perf_counter()
+
+    def finish(self, result: RageResult) -> RageResult:
+        """Record the measurement and attach the call summary to `result.extra["instrumentation"]`."""
+        collector = _collector
+        if collector is None:
+            return result
+        summary = CallSummary.from_records(self.records, wall_seconds=time.perf_counter() - self.start_time)
+        collector.record_metric(self.metric, summary, is_error=isinstance(result, ErrorResult))
+        result.extra["instrumentation"] = summary.model_dump()
+        return result
+
+    def finish_pack(self, results: List[RageResult]) -> List[RageResult]:
+        """Like `finish` for the results of one packed request, its calls are attributed to the first result only."""
+        if _collector is None or not results:
+            return results
+        self.finish(results[0])
+        for result in results[1:]:
+            MetricMeasurement(self.metric).finish(result)
+        return results
+
+
+@contextmanager
+def measure_metric(metric: str) -> Iterator[MetricMeasurement]:
+    """Collect the model calls made while computing one metric result, a no-op unless instrumentation is enabled."""
+    measurement = MetricMeasurement(metric)
+    if _collector is None:
+        yield measurement
+        return
+    token = _call_records.set(measurement.records)
+    try:
+        yield measurement
+    finally:
+        _call_records.reset(token)
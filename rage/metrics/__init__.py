@@ -1,13 +1,49 @@
-from rage.metrics.deterministic.answer_correctness import RougeLAnswerCorrectness, WorldOverlapAnswerCorrectness
-from rage.metrics.deterministic.answer_faithfulness import RougeLAnswerFaithfulness, WorldOverlapAnswerFaithfulness
-from rage.metrics.deterministic.context_precision_recall_f1 import ContextPrecisionRecallF1
-from rage.metrics.generate_based.answer_correctness import GenerateBasedAnswerCorrectness
-from rage.metrics.generate_based.answer_faithfulness import GenerateBasedAnswerFaithfulness
-from rage.metrics.generate_based.answer_relevance import GenerateBasedAnswerRelevance
-from rage.metrics.generate_based.context_coverage import GenerateBasedContextCoverage
-from rage.metrics.generate_based.context_precision import GenerateBasedContextPrecision
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from rage.metrics.cascade import CascadeMetric
+    from rage.metrics.deterministic.answer_correctness import RougeLAnswerCorrectness, WorldOverlapAnswerCorrectness
+    from rage.metrics.deterministic.answer_faithfulness import RougeLAnswerFaithfulness, WorldOverlapAnswerFaithfulness
+    from rage.metrics.deterministic.context_precision_recall_f1 import ContextPrecisionRecallF1
+    from rage.metrics.generate_based.answer_correctness import GenerateBasedAnswerCorrectness
+    from rage.metrics.generate_based.answer_faithfulness import GenerateBasedAnswerFaithfulness
+    from rage.metrics.generate_based.answer_relevance import GenerateBasedAnswerRelevance
+    from rage.metrics.generate_based.context_coverage import GenerateBasedContextCoverage
+    from rage.metrics.generate_based.context_precision import GenerateBasedContextPrecision
+
+# Metric modules, and with them generate, numpy and jieba, are imported on first attribute access.
+_metric_modules = {
+    "CascadeMetric": "rage.metrics.cascade",
+    "ContextPrecisionRecallF1": "rage.metrics.deterministic.context_precision_recall_f1",
+    "GenerateBasedContextCoverage": "rage.metrics.generate_based.context_coverage",
+    "GenerateBasedContextPrecision": "rage.metrics.generate_based.context_precision",
+    "GenerateBasedAnswerCorrectness": "rage.metrics.generate_based.answer_correctness",
+    "GenerateBasedAnswerFaithfulness": "rage.metrics.generate_based.answer_faithfulness",
+    "GenerateBasedAnswerRelevance": "rage.metrics.generate_based.answer_relevance",
+    "WorldOverlapAnswerFaithfulness": "rage.metrics.deterministic.answer_faithfulness",
+    "RougeLAnswerFaithfulness": "rage.metrics.deterministic.answer_faithfulness",
+    "WorldOverlapAnswerCorrectness": "rage.metrics.deterministic.answer_correctness",
+    "RougeLAnswerCorrectness": "rage.metrics.deterministic.answer_correctness",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _metric_modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_metric_modules[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted([*globals(), *_metric_modules])
+
 
 __all__ = [
+    "CascadeMetric",
     "ContextPrecisionRecallF1",
     "GenerateBasedContextCoverage",
     "GenerateBasedContextPrecision",
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import ClassVar, Generic, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import TYPE_CHECKING, Any, ClassVar, Generic, Iterable, List, Literal, Optional, Sequence, Tuple, TypeVar, Union
 
 from rage.case import RageCase
-from rage.models import RageModel
-from rage.results import RageResult
+from rage.checkpoint import config_fingerprint
+from rage.instrumentation import measure_metric
+from rage.process_pool import default_chunk_size, process_map
+from rage.results import BatchResult, ErrorResult, RageResult
+from rage.template import context_packing_report
+
+if TYPE_CHECKING:
+    from rage.models import RageModel
 
 T = TypeVar("T", bound=RageResult)
 
@@ -13,12 +23,88 @@ T = TypeVar("T", bound=RageResult)
 class RageMetric(Generic[T], ABC):
     required_fields: ClassVar[set[str]] = set()
     optional_fields: ClassVar[set[str]] = set()
+    default_max_concurrency: ClassVar[int] = 1
+    process_safe: ClassVar[bool] = True
+    # Attributes that only change how the metric runs, not its results, `fingerprint` ignores them.
+    fingerprint_exclude: ClassVar[frozenset[str]] = frozenset({"default_max_concurrency"})
 
     @abstractmethod
     def calculate(self, case: RageCase) -> T:
         ...
 
+    def calculate_batch(
+        self,
+        cases: Iterable[RageCase],
+        max_concurrency: Optional[int] = None,
+        executor: Literal["thread", "process"] = "thread",
+        chunk_size: int = default_chunk_size,
+    ) -> BatchResult[T]:
+        """`executor="process"` spreads CPU-bound metrics over `max_concurrency` worker processes (all cores by default)."""
+        cases = list(cases)
+        start_time = time.perf_counter()
+        if executor == "process":
+            if max_concurrency is not None:
+                self._max_concurrency(max_concurrency)
+            if not self.process_safe:
+                raise ValueError(f"{type(self).__name__} can not be calculated in worker processes")
+            results = list(process_map(self, cases, processes=max_concurrency, chunk_size=chunk_size))
+            return BatchResult(results=results, elapsed_seconds=time.perf_counter() - start_time)
+        max_concurrency = self._max_concurrency(max_concurrency)
+        if max_concurrency <= 1 or len(cases) <= 1:
+            results = [self.safe_calculate(case) for case in cases]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(cases))) as executor:
+                results = list(executor.map(self.safe_calculate, cases))
+        return BatchResult(results=results, elapsed_seconds=time.perf_counter() - start_time)
+
+    def safe_calculate(self, case: RageCase) -> Union[T, ErrorResult]:
+        with measure_metric(type(self).__name__) as measurement:
+            try:
+                result = self.calculate(case)
+            except Exception as e:
+                result = ErrorResult(error=str(e), error_type=type(e).__name__)
+            return measurement.finish(result)
+
+    async def acalculate(self, case: RageCase) -> T:
+        return self.calculate(case)
+
+    async def acalculate_many(self, cases: Iterable[RageCase], max_concurrency: Optional[int] = None) -> BatchResult[T]:
+        cases = list(cases)
+        semaphore = asyncio.Semaphore(self._max_concurrency(max_concurrency))
+
+        async def _bounded_calculate(case: RageCase) -> Union[T, ErrorResult]:
+            async with semaphore:
+                return await self.safe_acalculate(case)
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*[_bounded_calculate(case) for case in cases])
+        return BatchResult(results=list(results), elapsed_seconds=time.perf_counter() - start_time)
+
+    async def safe_acalculate(self, case: RageCase) -> Union[T, ErrorResult]:
+        with measure_metric(type(self).__name__) as measurement:
+            try:
+                result = await self.acalculate(case)
+            except Exception as e:
+                result = ErrorResult(error=str(e), error_type=type(e).__name__)
+            return measurement.finish(result)
+
+    def _max_concurrency(self, max_concurrency: Optional[int]) -> int:
+        if max_concurrency is None:
+            return self.default_max_concurrency
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        return max_concurrency
+
+    def fingerprint(self) -> str:
+        """Hash of the metric class and its configuration, results are only reused across equal fingerprints."""
+        return config_fingerprint(self)
+
     def refine_case(self, case: RageCase) -> RageCase:
+        """`case` projected onto the metric's fields.
+
+        A case that already is such a projection, like the one an `EvaluationSuite` shares between metrics, is returned
+        as is instead of being copied again.
+        """
         values = {}
         for field in self.required_fields:
             if getattr(case, field) is None:
@@ -26,11 +112,125 @@ class RageMetric(Generic[T], ABC):
             values[field] = getattr(case, field)
         for field in self.optional_fields:
             values[field] = getattr(case, field)
+        if all(not getattr(case, field) for field in RageCase.model_fields if field not in values):
+            return case
         return RageCase(**values)
 
 
 class GenerateBasedMetric(RageMetric[T], ABC):
+    default_max_concurrency: ClassVar[int] = 8
+    process_safe: ClassVar[bool] = False
+
     def __init__(self, model: RageModel) -> None:
         self.model = model
         for example in self.model.examples:
             example.rage_case = self.refine_case(example.rage_case)
+
+    def _packs(self, cases: Iterable[RageCase]) -> List[List[RageCase]]:
+        cases = list(cases)
+        pack_size = self.model.pack_size
+        return [cases[start : start + pack_size] for start in range(0, len(cases), pack_size)]
+
+    def record_context_packing(self, result: T, case: RageCase) -> T:
+        """Note in `result.extra` which contexts a budgeted case template kept, truncated or dropped."""
+        report = context_packing_report(self.model.case_template, case)
+        if report is not None:
+            result.extra["context_packing"] = report.model_dump()
+        return result
+
+
+class PackableMetric(GenerateBasedMetric[T], ABC):
+    """A generate based metric whose result is `_to_result` of one model output per case.
+
+    Its batches can pack cases into requests: with `model.pack_size > 1`, `calculate_batch` and `acalculate_many` send
+    `pack_size` cases per request.
+    """
+
+    def calculate_batch(
+        self,
+        cases: Iterable[RageCase],
+        max_concurrency: Optional[int] = None,
+        executor: Literal["thread", "process"] = "thread",
+        chunk_size: int = default_chunk_size,
+    ) -> BatchResult[T]:
+        """With `model.pack_size > 1`, cases are sent `pack_size` per request, `max_concurrency` packs at once."""
+        if not self.is_packed or executor == "process":
+            return super().calculate_batch(cases, max_concurrency, executor, chunk_size)
+        packs = self._packs(cases)
+        start_time = time.perf_counter()
+        max_concurrency = self._max_concurrency(max_concurrency)
+        if max_concurrency <= 1 or len(packs) <= 1:
+            pack_results = [self.safe_calculate_pack(pack) for pack in packs]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(packs))) as pool:
+                pack_results = list(pool.map(self.safe_calculate_pack, packs))
+        return BatchResult(results=list(chain.from_iterable(pack_results)), elapsed_seconds=time.perf_counter() - start_time)
+
+    async def acalculate_many(self, cases: Iterable[RageCase], max_concurrency: Optional[int] = None) -> BatchResult[T]:
+        if not self.is_packed:
+            return await super().acalculate_many(cases, max_concurrency)
+        packs = self._packs(cases)
+        semaphore = asyncio.Semaphore(self._max_concurrency(max_concurrency))
+
+        async def _bounded_calculate(pack: List[RageCase]) -> List[Union[T, ErrorResult]]:
+            async with semaphore:
+                return await self.safe_acalculate_pack(pack)
+
+        start_time = time.perf_counter()
+        pack_results = await asyncio.gather(*[_bounded_calculate(pack) for pack in packs])
+        return BatchResult(results=list(chain.from_iterable(pack_results)), elapsed_seconds=time.perf_counter() - start_time)
+
+    @property
+    def is_packed(self) -> bool:
+        return self.model.pack_size > 1
+
+    def safe_calculate_pack(self, cases: Sequence[RageCase]) -> List[Union[T, ErrorResult]]:
+        """Results of cases sent in one request, the model falls back to one request per case if the pack fails."""
+        with measure_metric(type(self).__name__) as measurement:
+            results, refined_cases = self._refine_pack(cases)
+            try:
+                outputs = self.model.inference_many([case for _, case in refined_cases], return_exceptions=True)
+            except Exception as e:
+                outputs = [e] * len(refined_cases)
+            return measurement.finish_pack(self._pack_results(results, refined_cases, outputs))
+
+    async def safe_acalculate_pack(self, cases: Sequence[RageCase]) -> List[Union[T, ErrorResult]]:
+        with measure_metric(type(self).__name__) as measurement:
+            results, refined_cases = self._refine_pack(cases)
+            try:
+                outputs = await self.model.async_inference_many([case for _, case in refined_cases], return_exceptions=True)
+            except Exception as e:
+                outputs = [e] * len(refined_cases)
+            return measurement.finish_pack(self._pack_results(results, refined_cases, outputs))
+
+    @abstractmethod
+    def _to_result(self, output: Any) -> T:
+        ...
+
+    def _refine_pack(self, cases: Sequence[RageCase]) -> Tuple[List[Any], List[Tuple[int, RageCase]]]:
+        """Refine every case, cases missing a required field get their `ErrorResult` right away."""
+        results: List[Any] = [None] * len(cases)
+        refined_cases = []
+        for index, case in enumerate(cases):
+            refined_case = self._safe_refine_case(case)
+            if isinstance(refined_case, ErrorResult):
+                results[index] = refined_case
+            else:
+                refined_cases.append((index, refined_case))
+        return results, refined_cases
+
+    def _safe_refine_case(self, case: RageCase) -> Union[RageCase, ErrorResult]:
+        try:
+            return self.refine_case(case)
+        except Exception as e:
+            return ErrorResult(error=str(e), error_type=type(e).__name__)
+
+    def _pack_results(
+        self, results: List[Any], refined_cases: List[Tuple[int, RageCase]], outputs: List[Any]
+    ) -> List[Union[T, ErrorResult]]:
+        for (index, case), output in zip(refined_cases, outputs):
+            if isinstance(output, Exception):
+                results[index] = ErrorResult(error=str(output), error_type=type(output).__name__)
+            else:
+                results[index] = self.record_context_packing(self._to_result(output), case)
+        return results
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import time
+from typing import Any, ClassVar, Iterable, List, Literal, Optional, Tuple, Union
+
+from rage.case import RageCase
+from rage.metrics.base import GenerateBasedMetric, RageMetric
+from rage.process_pool import default_chunk_size
+from rage.results import BatchResult, ErrorResult, RageResult
+
+Band = Literal["reject", "accept", "uncertain"]
+
+
+class CascadeMetric(RageMetric[RageResult]):
+    """A cheap deterministic `screen` decides the clear cases, only the uncertain ones are sent to the LLM `judge`.
+
+    The screen's `score_field` is compared against the confidence band: a score `<= low` rejects the case, a score
+    `>= high` accepts it, and anything in between is escalated to the judge, as is every case the screen fails on.
+    Screen decisions score `decided_scores` (`(0.0, 1.0)`, the ends of the judge's normalized range) so that both tiers
+    share one scale, `decided_scores=None` keeps the raw screen score. `result.extra["cascade"]` records the tier that
+    decided the case, the screen score and its band.
+
+    ```python
+    metric = CascadeMetric(RougeLAnswerCorrectness(), GenerateBasedAnswerCorrectness.defaults(), "correctness")
+    ```
+    """
+
+    process_safe: ClassVar[bool] = False
+
+    def __init__(  # noqa: PLR0913
+        self,
+        screen: RageMetric,
+        judge: GenerateBasedMetric,
+        score_field: str,
+        low: float = 0.1,
+        high: float = 0.95,
+        decided_scores: Optional[Tuple[float, float]] = (0.0, 1.0),
+    ) -> None:
+        if low >= high:
+            raise ValueError(f"The confidence band needs low < high, got ({low}, {high})")
+        self.screen = screen
+        self.judge = judge
+        self.score_field = score_field
+        self.low = low
+        self.high = high
+        self.decided_scores = decided_scores
+        self.required_fields = screen.required_fields | judge.required_fields
+        self.optional_fields = (screen.optional_fields | judge.optional_fields) - self.required_fields
+        self.default_max_concurrency = judge.default_max_concurrency
+
+    def calculate(self, case: RageCase) -> RageResult:
+        screen_result = self.screen.safe_calculate(case)
+        if (result := self._decide(screen_result)) is not None:
+            return result
+        return self._escalated(self.judge.calculate(case), screen_result)
+
+    async def acalculate(self, case: RageCase) -> RageResult:
+        screen_result = self.screen.safe_calculate(case)
+        if (result := self._decide(screen_result)) is not None:
+            return result
+        return self._escalated(await self.judge.acalculate(case), screen_result)
+
+    def calculate_batch(
+        self,
+        cases: Iterable[RageCase],
+        max_concurrency: Optional[int] = None,
+        executor: Literal["thread", "process"] = "thread",
+        chunk_size: int = default_chunk_size,
+    ) -> BatchResult[RageResult]:
+        """Screen every case, `executor="process"` spreads the screen over worker processes, then judge the uncertain
+        cases in one judge batch, so packing and the judge's concurrency apply to them."""
+        cases = list(cases)
+        start_time = time.perf_counter()
+        screen_concurrency = max_concurrency if executor == "process" else None
+        screen_results = self.screen.calculate_batch(cases, screen_concurrency, executor, chunk_size).results
+        results, escalated = self._decide_batch(screen_results)
+        judge_results = self.judge.calculate_batch([cases[index] for index in escalated], max_concurrency).results
+        self._merge_escalated(results, screen_results, escalated, judge_results)
+        return BatchResult(results=results, elapsed_seconds=time.perf_counter() - start_time)
+
+    async def acalculate_many(
+        self, cases: Iterable[RageCase], max_concurrency: Optional[int] = None
+    ) -> BatchResult[RageResult]:
+        cases = list(cases)
+        start_time = time.perf_counter()
+        screen_results = [self.screen.safe_calculate(case) for case in cases]
+        results, escalated = self._decide_batch(screen_results)
+        judge_batch = await self.judge.acalculate_many([cases[index] for index in escalated], max_concurrency)
+        self._merge_escalated(results, screen_results, escalated, judge_batch.results)
+        return BatchResult(results=results, elapsed_seconds=time.perf_counter() - start_time)
+
+    def band(self, score: float) -> Band:
+        if score <= self.low:
+            return "reject"
+        if score >= self.high:
+            return "accept"
+        return "uncertain"
+
+    def _decide(self, screen_result: RageResult) -> Optional[RageResult]:
+        """The screen's result when it settles the case, `None` when the case goes to the judge."""
+        if isinstance(screen_result, ErrorResult):
+            return None
+        score = getattr(screen_result, self.score_field)
+        band = self.band(score)
+        if band == "uncertain":
+            return None
+        result = screen_result.model_copy(deep=True)
+        if self.decided_scores is not None:
+            setattr(result, self.score_field, self.decided_scores[band == "accept"])
+        result.extra["cascade"] = {"tier": "screen", "screen_score": score, "band": band}
+        return result
+
+    def _escalated(self, judge_result: RageResult, screen_result: RageResult) -> RageResult:
+        if isinstance(judge_result, ErrorResult):
+            return judge_result
+        if isinstance(screen_result, ErrorResult):
+            judge_result.extra["cascade"] = {"tier": "judge", "screen_score": None, "band": None}
+        else:
+            score = getattr(screen_result, self.score_field)
+            judge_result.extra["cascade"] = {"tier": "judge", "screen_score": score, "band": self.band(score)}
+        return judge_result
+
+    def _decide_batch(self, screen_results: List[RageResult]) -> Tuple[List[Any], List[int]]:
+        results: List[Any] = []
+        escalated = []
+        for index, screen_result in enumerate(screen_results):
+            result = self._decide(screen_result)
+            if result is None:
+                escalated.append(index)
+            results.append(result)
+        return results, escalated
+
+    def _merge_escalated(
+        self,
+        results: List[Any],
+        screen_results: List[RageResult],
+        escalated: List[int],
+        judge_results: List[Union[RageResult, ErrorResult]],
+    ) -> None:
+        for index, judge_result in zip(escalated, judge_results):
+            results[index] = self._escalated(judge_result, screen_results[index])
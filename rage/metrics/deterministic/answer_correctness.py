@@ -1,22 +1,33 @@
+from __future__ import annotations
+
+from typing import Optional
+
 from rage.case import RageCase
 from rage.metrics.base import RageMetric
 from rage.results import CorrectnessResult
+from rage.tokenizer import Tokenizer
 from rage.utils import caculate_rouge_l_score, calculate_word_overlap
 
 
 class WorldOverlapAnswerCorrectness(RageMetric[CorrectnessResult]):
     required_fields = {"answer", "generated_answer"}
 
+    def __init__(self, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.tokenizer = tokenizer
+
     def calculate(self, case: RageCase) -> CorrectnessResult:
         case = self.refine_case(case)
-        correctness = calculate_word_overlap(case.answer, case.generated_answer).f1
+        correctness = calculate_word_overlap(case.answer, case.generated_answer, tokenizer=self.tokenizer).f1
         return CorrectnessResult(correctness=correctness)
 
 
 class RougeLAnswerCorrectness(RageMetric[CorrectnessResult]):
     required_fields = {"answer", "generated_answer"}
 
+    def __init__(self, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.tokenizer = tokenizer
+
     def calculate(self, case: RageCase) -> CorrectnessResult:
         case = self.refine_case(case)
-        rouge_l_score = caculate_rouge_l_score(case.answer, case.generated_answer).f1
+        rouge_l_score = caculate_rouge_l_score(case.answer, case.generated_answer, tokenizer=self.tokenizer).f1
         return CorrectnessResult(correctness=rouge_l_score)
@@ -1,27 +1,37 @@
+from __future__ import annotations
+
+from typing import Optional
+
 from rage.case import RageCase
+from rage.context_index import ContextIndex
 from rage.metrics.base import RageMetric
 from rage.results import FaithfulnessResult
-from rage.utils import caculate_rouge_l_score, calculate_word_overlap, split_chinese_sentences
+from rage.tokenizer import Tokenizer, default_tokenizer
+from rage.utils import split_chinese_sentences
 
 
 class WorldOverlapAnswerFaithfulness(RageMetric[FaithfulnessResult]):
     required_fields = {"answer", "retrieved_contexts"}
 
-    def __init__(self, threshold: float = 0.5) -> None:
+    def __init__(self, threshold: float = 0.5, tokenizer: Optional[Tokenizer] = None) -> None:
         self.threshold = threshold
+        self.tokenizer = tokenizer
 
     def calculate(self, case: RageCase) -> FaithfulnessResult:
         case = self.refine_case(case)
-        context = "\n".join(case.retrieved_contexts)
         answer_sentences = split_chinese_sentences(case.answer)
         if not answer_sentences:
             return FaithfulnessResult(faithfulness=0)
+        tokenizer = self.tokenizer or default_tokenizer
+        context_index = ContextIndex(case.retrieved_contexts, tokenizer)
         faithful_sentences = []
         non_faithful_sentences = []
         scores = []
+        best_contexts = []
         for sentence in answer_sentences:
-            word_overlap_p = calculate_word_overlap(sentence, context).precision
+            word_overlap_p, best_context = context_index.word_overlap(tokenizer(sentence))
             scores.append(word_overlap_p)
+            best_contexts.append(best_context)
             if word_overlap_p > self.threshold:
                 faithful_sentences.append(sentence)
             else:
@@ -33,6 +43,7 @@ class WorldOverlapAnswerFaithfulness(RageMetric[FaithfulnessResult]):
                 "faithful_sentences": faithful_sentences,
                 "non_faithful_sentences": non_faithful_sentences,
                 "answer_sentence_with_word_overlap_score": list(zip(answer_sentences, scores)),
+                "answer_sentence_best_context": best_contexts,
             },
         )
 
@@ -40,21 +51,27 @@ class WorldOverlapAnswerFaithfulness(RageMetric[FaithfulnessResult]):
 class RougeLAnswerFaithfulness(RageMetric[FaithfulnessResult]):
     required_fields = {"answer", "retrieved_contexts"}
 
-    def __init__(self, threshold: float = 0.5) -> None:
+    def __init__(self, threshold: float = 0.5, tokenizer: Optional[Tokenizer] = None) -> None:
         self.threshold = threshold
+        self.tokenizer = tokenizer
 
     def calculate(self, case: RageCase) -> FaithfulnessResult:
         case = self.refine_case(case)
-        context = "\n".join(case.retrieved_contexts)
         answer_sentences = split_chinese_sentences(case.answer)
         if not answer_sentences:
             return FaithfulnessResult(faithfulness=0)
+        tokenizer = self.tokenizer or default_tokenizer
+        context_index = ContextIndex(case.retrieved_contexts, tokenizer)
         faithful_sentences = []
         non_faithful_sentences = []
         scores = []
+        best_contexts = []
         for sentence in answer_sentences:
-            rouge_l_score = caculate_rouge_l_score(sentence, context).precision
+            tokens = tokenizer(sentence)
+            lcs, best_context = context_index.lcs(tokens)
+            rouge_l_score = lcs / len(tokens) if tokens else 0.0
             scores.append(rouge_l_score)
+            best_contexts.append(best_context)
             if rouge_l_score > self.threshold:
                 faithful_sentences.append(sentence)
             else:
@@ -66,5 +83,6 @@ class RougeLAnswerFaithfulness(RageMetric[FaithfulnessResult]):
                 "faithful_sentences": faithful_sentences,
                 "non_faithful_sentences": non_faithful_sentences,
                 "answer_sentence_with_rouge_l_score": list(zip(answer_sentences, scores)),
+                "answer_sentence_best_context": best_contexts,
             },
         )
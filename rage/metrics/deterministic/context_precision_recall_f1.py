@@ -1,17 +1,20 @@
 from __future__ import annotations
 
-from functools import partial
-from typing import Callable, Literal
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Literal, Optional, Sequence, Set, Tuple
 
-from rouge import Rouge
 from typing_extensions import Self
 
 from rage.case import RageCase
 from rage.metrics.base import RageMetric
 from rage.results import PrecisionRecallF1Result
-from rage.utils import split_chinese_sentences
+from rage.rouge import batch_lcs_length, default_rouge_l
+from rage.segmenter import split_sentences_batch
+from rage.tokenizer import Tokenizer, default_tokenizer
 
 MatchFunction = Callable[[str, str], bool]
+MatchPairs = Set[Tuple[int, int]]
 
 
 def exact_match(retrieved_text: str, ground_truth_text: str) -> bool:
@@ -19,25 +22,114 @@ def exact_match(retrieved_text: str, ground_truth_text: str) -> bool:
 
 
 def rouge_match(retrieved_text: str, ground_truth_text: str, threshold: float = 0.8) -> bool:
-    rouge = Rouge()
-    scores = rouge.get_scores(retrieved_text, ground_truth_text)[0]
-    return scores["rouge-l"]["r"] >= threshold  # type: ignore
+    return default_rouge_l.score(retrieved_text, ground_truth_text).recall >= threshold
+
+
+class ContextMatcher(ABC):
+    @abstractmethod
+    def match(self, retrieved_contexts: Sequence[str], contexts: Sequence[str]) -> MatchPairs:
+        """Return the matching `(retrieved_context_index, context_index)` pairs."""
+
+
+class FunctionMatcher(ContextMatcher):
+    def __init__(self, match_function: MatchFunction) -> None:
+        self.match_function = match_function
+
+    def match(self, retrieved_contexts: Sequence[str], contexts: Sequence[str]) -> MatchPairs:
+        return {
+            (retrieved_index, context_index)
+            for retrieved_index, retrieved_context in enumerate(retrieved_contexts)
+            for context_index, context in enumerate(contexts)
+            if self.match_function(retrieved_context, context)
+        }
+
+
+class ExactMatcher(ContextMatcher):
+    def match(self, retrieved_contexts: Sequence[str], contexts: Sequence[str]) -> MatchPairs:
+        context_indexes: Dict[str, List[int]] = defaultdict(list)
+        for context_index, context in enumerate(contexts):
+            context_indexes[context].append(context_index)
+        return {
+            (retrieved_index, context_index)
+            for retrieved_index, retrieved_context in enumerate(retrieved_contexts)
+            for context_index in context_indexes.get(retrieved_context, ())
+        }
+
+
+class RougeMatcher(ContextMatcher):
+    """Matches when the ROUGE-L recall of the ground truth context reaches `threshold`.
+
+    The LCS is bounded by the clipped token overlap, so an inverted index over the retrieved tokens prunes every
+    retrieved context that cannot reach the threshold before any LCS is computed.
+    """
+
+    def __init__(self, threshold: float = 0.8, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.threshold = threshold
+        self.tokenizer = tokenizer or default_tokenizer
+
+    def match(self, retrieved_contexts: Sequence[str], contexts: Sequence[str]) -> MatchPairs:
+        retrieved_tokens = [self.tokenizer(retrieved_context) for retrieved_context in retrieved_contexts]
+        inverted_index: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for retrieved_index, tokens in enumerate(retrieved_tokens):
+            for token, count in Counter(tokens).items():
+                inverted_index[token].append((retrieved_index, count))
+
+        matched_indexes_by_context: Dict[str, List[int]] = {}
+        pairs: MatchPairs = set()
+        for context_index, context in enumerate(contexts):
+            if context not in matched_indexes_by_context:
+                matched_indexes_by_context[context] = self._match_context(context, retrieved_tokens, inverted_index)
+            pairs.update((retrieved_index, context_index) for retrieved_index in matched_indexes_by_context[context])
+        return pairs
+
+    def _match_context(
+        self,
+        context: str,
+        retrieved_tokens: List[Sequence[str]],
+        inverted_index: Dict[str, List[Tuple[int, int]]],
+    ) -> List[int]:
+        if self.threshold <= 0:
+            # Any recall reaches a non-positive threshold, pairs without a shared token included.
+            return list(range(len(retrieved_tokens)))
+        context_tokens = self.tokenizer(context)
+        if not context_tokens:
+            return []
+        num_tokens = len(context_tokens)
+        overlap_bounds: Dict[int, int] = defaultdict(int)
+        for token, count in Counter(context_tokens).items():
+            for retrieved_index, retrieved_count in inverted_index.get(token, ()):
+                overlap_bounds[retrieved_index] += min(count, retrieved_count)
+        candidates = [
+            retrieved_index
+            for retrieved_index, overlap_bound in overlap_bounds.items()
+            if overlap_bound / num_tokens >= self.threshold
+        ]
+        if not candidates:
+            return []
+        lcs_lengths = batch_lcs_length(context_tokens, [retrieved_tokens[index] for index in candidates])
+        return [index for index, lcs in zip(candidates, lcs_lengths) if lcs / num_tokens >= self.threshold]
 
 
 class ContextPrecisionRecallF1(RageMetric[PrecisionRecallF1Result]):
-    match_function: MatchFunction
+    matcher: ContextMatcher
     required_fields = {"retrieved_contexts", "contexts"}
 
     def __init__(
-        self, split_to_sentence: bool = False, match_function: MatchFunction | Literal["exact", "rouge"] = "rouge"
+        self,
+        split_to_sentence: bool = False,
+        match_function: MatchFunction | ContextMatcher | Literal["exact", "rouge"] = "rouge",
     ) -> None:
         self.split_to_sentence = split_to_sentence
         if match_function == "exact":
-            self.match_function = exact_match
+            self.matcher = ExactMatcher()
         elif match_function == "rouge":
-            self.match_function = partial(rouge_match, threshold=0.8)
+            self.matcher = RougeMatcher(threshold=0.8)
+        elif isinstance(match_function, ContextMatcher):
+            self.matcher = match_function
+        elif match_function is exact_match:
+            self.matcher = ExactMatcher()
         else:
-            self.match_function = match_function
+            self.matcher = FunctionMatcher(match_function)  # type: ignore
 
     @classmethod
     def from_parameters(
@@ -45,35 +137,31 @@ class ContextPrecisionRecallF1(RageMetric[PrecisionRecallF1Result]):
         split_to_sentence: bool = False,
         match_strategy: Literal["exact", "rouge"] = "exact",
         rouge_threshold: float = 0.8,
+        tokenizer: Optional[Tokenizer] = None,
     ) -> Self:
         if match_strategy == "exact":
-            match_function = exact_match
+            matcher = ExactMatcher()
         elif match_strategy == "rouge":
-            match_function = partial(rouge_match, threshold=rouge_threshold)
+            matcher = RougeMatcher(threshold=rouge_threshold, tokenizer=tokenizer)
         else:
             raise ValueError(f"Invalid match_strategy: {match_strategy}")
-        return cls(split_to_sentence=split_to_sentence, match_function=match_function)
+        return cls(split_to_sentence=split_to_sentence, match_function=matcher)
 
     def calculate(self, case: RageCase) -> PrecisionRecallF1Result:
         assert case.retrieved_contexts is not None
         assert case.contexts is not None
         if self.split_to_sentence:
             retrieved_contexts = [
-                sentence for context in case.retrieved_contexts for sentence in split_chinese_sentences(context)
+                sentence for sentences in split_sentences_batch(case.retrieved_contexts) for sentence in sentences
             ]
-            contexts = [sentence for context in case.contexts for sentence in split_chinese_sentences(context)]
+            contexts = [sentence for sentences in split_sentences_batch(case.contexts) for sentence in sentences]
         else:
             retrieved_contexts = case.retrieved_contexts
             contexts = case.contexts
 
-        num_match = 0
-        match_contexts = set()
-        for retrieved_context in retrieved_contexts:
-            for context in contexts:
-                if self.match_function(retrieved_context, context):
-                    match_contexts.add(context)
-                    num_match += 1
-                    continue
+        match_pairs = self.matcher.match(retrieved_contexts, contexts)
+        num_match = len({retrieved_index for retrieved_index, _ in match_pairs})
+        match_contexts = {contexts[context_index] for _, context_index in match_pairs}
         precision = num_match / len(retrieved_contexts)
         recall = len(match_contexts) / len(set(contexts))
         if precision == 0 and recall == 0:
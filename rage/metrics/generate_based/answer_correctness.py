@@ -1,8 +1,8 @@
 from typing_extensions import Self, Unpack
 
 from rage.case import RageCase
-from rage.metrics.base import GenerateBasedMetric
-from rage.models import RageScorer, RageScorerKwargs
+from rage.metrics.base import PackableMetric
+from rage.models import RageScorer, RageScorerKwargs, ScorerOutput
 from rage.results import CorrectnessResult
 
 default_correctness_instruction = """You are an expert evaluator system for a question answering system.
@@ -18,7 +18,7 @@ Use the following guidelines for evaluation:
 """
 
 
-class GenerateBasedAnswerCorrectness(GenerateBasedMetric[CorrectnessResult]):
+class GenerateBasedAnswerCorrectness(PackableMetric[CorrectnessResult]):
     required_fields = {"question", "answer", "generated_answer"}
 
     model: RageScorer
@@ -42,4 +42,12 @@ class GenerateBasedAnswerCorrectness(GenerateBasedMetric[CorrectnessResult]):
     def calculate(self, case: RageCase) -> CorrectnessResult:
         case = self.refine_case(case)
         score_result = self.model.inference(case)
+        return self.record_context_packing(self._to_result(score_result), case)
+
+    async def acalculate(self, case: RageCase) -> CorrectnessResult:
+        case = self.refine_case(case)
+        score_result = await self.model.async_inference(case)
+        return self.record_context_packing(self._to_result(score_result), case)
+
+    def _to_result(self, score_result: ScorerOutput) -> CorrectnessResult:
         return CorrectnessResult(correctness=score_result.score, extra={"reason": getattr(score_result, "reason", None)})
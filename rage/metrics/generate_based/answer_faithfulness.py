@@ -3,8 +3,8 @@ from __future__ import annotations
 from typing_extensions import Self, Unpack
 
 from rage.case import RageCase
-from rage.metrics.base import GenerateBasedMetric
-from rage.models import RageClassifier, RageClassifierKwargs
+from rage.metrics.base import PackableMetric
+from rage.models import ClassifierOutput, RageClassifier, RageClassifierKwargs
 from rage.results import FaithfulnessResult
 
 default_faithfulness_instruction = (
@@ -12,7 +12,7 @@ default_faithfulness_instruction = (
 )
 
 
-class GenerateBasedAnswerFaithfulness(GenerateBasedMetric[FaithfulnessResult]):
+class GenerateBasedAnswerFaithfulness(PackableMetric[FaithfulnessResult]):
     required_fields = {"question", "retrieved_contexts", "generated_answer"}
 
     model: RageClassifier
@@ -62,6 +62,14 @@ class GenerateBasedAnswerFaithfulness(GenerateBasedMetric[FaithfulnessResult]):
     def calculate(self, case: RageCase) -> FaithfulnessResult:
         case = self.refine_case(case)
         classifier_output = self.model.inference(case)
+        return self.record_context_packing(self._to_result(classifier_output), case)
+
+    async def acalculate(self, case: RageCase) -> FaithfulnessResult:
+        case = self.refine_case(case)
+        classifier_output = await self.model.async_inference(case)
+        return self.record_context_packing(self._to_result(classifier_output), case)
+
+    def _to_result(self, classifier_output: ClassifierOutput) -> FaithfulnessResult:
         return FaithfulnessResult(
             faithfulness=self.label_score_mapping[classifier_output.label],
             extra={
@@ -1,8 +1,8 @@
 from typing_extensions import Self, Unpack
 
 from rage.case import RageCase
-from rage.metrics.base import GenerateBasedMetric
-from rage.models import RageScorer, RageScorerKwargs
+from rage.metrics.base import PackableMetric
+from rage.models import RageScorer, RageScorerKwargs, ScorerOutput
 from rage.results import RelevanceResult
 
 default_answer_relevance_instruction = """You are an expert evaluator system for a question answering system.
@@ -15,7 +15,7 @@ Use the following guidelines for evaluation:
 """
 
 
-class GenerateBasedAnswerRelevance(GenerateBasedMetric[RelevanceResult]):
+class GenerateBasedAnswerRelevance(PackableMetric[RelevanceResult]):
     required_fields = {"question", "generated_answer"}
 
     model: RageScorer
@@ -39,4 +39,12 @@ class GenerateBasedAnswerRelevance(GenerateBasedMetric[RelevanceResult]):
     def calculate(self, case: RageCase) -> RelevanceResult:
         case = self.refine_case(case)
         score_result = self.model.inference(case)
+        return self.record_context_packing(self._to_result(score_result), case)
+
+    async def acalculate(self, case: RageCase) -> RelevanceResult:
+        case = self.refine_case(case)
+        score_result = await self.model.async_inference(case)
+        return self.record_context_packing(self._to_result(score_result), case)
+
+    def _to_result(self, score_result: ScorerOutput) -> RelevanceResult:
         return RelevanceResult(relevance=score_result.score, extra={"reason": getattr(score_result, "reason", None)})
@@ -48,12 +48,26 @@ class GenerateBasedContextCoverage(GenerateBasedMetric[CoverageResult]):
     @override
     def calculate(self, case: RageCase) -> CoverageResult:
         if not case.retrieved_contexts:
-            return CoverageResult(
-                extra={"answer_statements": []},
-                coverage=0,
-            )
+            return self._empty_result()
         case = self.refine_case(case)
         answer_statements = self.model.inference(case)
+        return self.record_context_packing(self._to_result(answer_statements), case)
+
+    @override
+    async def acalculate(self, case: RageCase) -> CoverageResult:
+        if not case.retrieved_contexts:
+            return self._empty_result()
+        case = self.refine_case(case)
+        answer_statements = await self.model.async_inference(case)
+        return self.record_context_packing(self._to_result(answer_statements), case)
+
+    def _empty_result(self) -> CoverageResult:
+        return CoverageResult(
+            extra={"answer_statements": []},
+            coverage=0,
+        )
+
+    def _to_result(self, answer_statements: AnswerStatements) -> CoverageResult:
         coverage = sum([i.supported == "Yes" for i in answer_statements.root]) / len(answer_statements.root)
         return CoverageResult(
             extra={"answer_statements": answer_statements},
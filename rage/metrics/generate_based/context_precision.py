@@ -1,9 +1,16 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from itertools import chain
+from typing import Any, Awaitable, Callable, List
+
 from typing_extensions import Self, Unpack
 
 from rage.case import RageCase
 from rage.metrics.base import GenerateBasedMetric
-from rage.models import RageClassifier, RageClassifierKwargs
+from rage.models import ClassifierOutput, RageClassifier, RageClassifierKwargs
 from rage.results import PresicionResult
+from rage.template import context_packing_report
 
 default_context_precision_instruction = """\
 Verify if the information in the given context is useful in answering the question.
@@ -13,13 +20,17 @@ if the information is useful, label is "Yes", otherwise "No".
 
 class GenerateBasedContextPrecision(GenerateBasedMetric[PresicionResult]):
     required_fields = {"question", "retrieved_contexts"}
+    fingerprint_exclude = GenerateBasedMetric.fingerprint_exclude | {"max_context_concurrency"}
 
     model: RageClassifier
 
-    def __init__(self, model: RageClassifier) -> None:
+    def __init__(self, model: RageClassifier, max_context_concurrency: int = 4) -> None:
         if model.label_set != {"Yes", "No"}:
             raise ValueError("The label set of the model must be {'Yes', 'No'}")
+        if max_context_concurrency < 1:
+            raise ValueError("max_context_concurrency must be at least 1")
         super().__init__(model)
+        self.max_context_concurrency = max_context_concurrency
 
     @classmethod
     def defaults(cls) -> Self:
@@ -30,35 +41,82 @@ class GenerateBasedContextPrecision(GenerateBasedMetric[PresicionResult]):
         return cls(classifier)
 
     @classmethod
-    def from_parameters(cls, **kwargs: Unpack[RageClassifierKwargs]) -> Self:
+    def from_parameters(cls, max_context_concurrency: int = 4, **kwargs: Unpack[RageClassifierKwargs]) -> Self:
         default_classifier_kwargs = {
             "instruction": default_context_precision_instruction,
             "label_set": {"Yes", "No"},
         }
         classifier_kwargs = {**default_classifier_kwargs, **kwargs}
-        return cls(model=RageClassifier(**classifier_kwargs))
+        return cls(model=RageClassifier(**classifier_kwargs), max_context_concurrency=max_context_concurrency)
 
     def calculate(self, case: RageCase) -> PresicionResult:
         case = self.refine_case(case)
-        verifications: list = []
+        context_cases = self._split_by_context(case)
+        if self.model.pack_size > 1:
+            # The contexts of a case are judged together, `pack_size` contexts per request.
+            packed_verifications = self._map_contexts(self.model.inference_many, self._packs(context_cases))
+            verifications = list(chain.from_iterable(packed_verifications))
+        else:
+            verifications = self._map_contexts(self.model.inference, context_cases)
+        return self._record_context_packing(self._to_result(verifications), context_cases)
+
+    async def acalculate(self, case: RageCase) -> PresicionResult:
+        case = self.refine_case(case)
+        context_cases = self._split_by_context(case)
+        if self.model.pack_size > 1:
+            packed_verifications = await self._amap_contexts(self.model.async_inference_many, self._packs(context_cases))
+            verifications = list(chain.from_iterable(packed_verifications))
+        else:
+            verifications = await self._amap_contexts(self.model.async_inference, context_cases)
+        return self._record_context_packing(self._to_result(verifications), context_cases)
+
+    def _map_contexts(self, function: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """`function` over the context cases or packs of a case, `max_context_concurrency` at once."""
+        if self.max_context_concurrency == 1 or len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_context_concurrency, len(items))) as executor:
+            # Each task runs in a copy of the caller's context, so request sharing and instrumentation scopes carry over.
+            futures = [executor.submit(copy_context().run, function, item) for item in items]
+            return [future.result() for future in futures]
+
+    async def _amap_contexts(self, function: Callable[[Any], Awaitable[Any]], items: List[Any]) -> List[Any]:
+        semaphore = asyncio.Semaphore(self.max_context_concurrency)
+
+        async def _bounded(item: Any) -> Any:
+            async with semaphore:
+                return await function(item)
+
+        return list(await asyncio.gather(*[_bounded(item) for item in items]))
+
+    def _split_by_context(self, case: RageCase) -> List[RageCase]:
+        context_cases = []
+        for context in case.retrieved_contexts:
+            new_case = case.model_copy(deep=True)
+            new_case.retrieved_contexts = [context]
+            context_cases.append(new_case)
+        return context_cases
+
+    def _record_context_packing(self, result: PresicionResult, context_cases: List[RageCase]) -> PresicionResult:
+        reports = [context_packing_report(self.model.case_template, context_case) for context_case in context_cases]
+        if any(report is not None for report in reports):
+            result.extra["context_packing"] = [report.model_dump() for report in reports if report is not None]
+        return result
+
+    def _to_result(self, verifications: List[ClassifierOutput]) -> PresicionResult:
         num_positive = 0
         precision_at_k: list[float] = []
-        if not case.retrieved_contexts:
+        if not verifications:
             return PresicionResult(
                 precision_at_k=precision_at_k,
                 average_precision=0,
                 precision=0,
                 extra={"verifications": verifications},
             )
-        for num_context, context in enumerate(case.retrieved_contexts, start=1):
-            new_case = case.model_copy(deep=True)
-            new_case.retrieved_contexts = [context]
-            vertification = self.model.inference(new_case)
-            verifications.append(vertification)
+        for num_context, vertification in enumerate(verifications, start=1):
             if vertification.label == "Yes":
                 num_positive += 1
             precision_at_k.append(num_positive / num_context)
-        precision = num_positive / len(case.retrieved_contexts)
+        precision = num_positive / len(verifications)
         average_precision = sum(precision_at_k) / len(precision_at_k)
         return PresicionResult(
             precision_at_k=precision_at_k,
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import re
+import time
 from abc import ABC
-from typing import Any, Generic, List, Literal, Optional, Set, Tuple, Type, TypeVar
-from typing_extensions import TypedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, ClassVar, FrozenSet, Generic, List, Literal, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
 
-from generate import load_chat_model
-from generate.chat_completion.base import RemoteChatCompletionModel
 from generate.chat_completion.message import (
     UserMessage,
 )
-from generate.modifiers.structure import Example, Structure
-from pydantic import BaseModel, Field, create_model
-from typing_extensions import override
+from generate.modifiers.structure import Example, Structure, StructureModelOutput
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from typing_extensions import TypedDict, override
 
+from rage.cache import ResponseCache
 from rage.case import RageCase, RageExample
+from rage.client_registry import get_chat_model
+from rage.instrumentation import CallRecord, is_instrumenting, record_call
+from rage.request_sharing import current_shared_requests
+from rage.scheduler import RateLimitScheduler, get_scheduler
 from rage.template import RageCaseTemplate, SimpleCaseTemplate
+from rage.tokenizer import estimate_tokens
 
 cot_reason_description = "Think Step by Step, [!IMPORTANT] First write your reason and then give a score. [!IMPORTANT]"
 system_template = """\
@@ -24,6 +34,15 @@ system_template = """\
 {output_format_description}
 """
 
+packed_instruction_template = """\
+{instruction}
+# Multiple Cases
+The input holds several cases, each one starts with a `# Case <number>` header. Evaluate every case on its own and \
+answer with one output per case in `outputs`, in the order of the cases.
+"""
+packed_case_header = "# Case {number}"
+packed_case_pattern = re.compile(r"^# Case (\d+)\n", re.MULTILINE)
+
 T = TypeVar("T", bound=BaseModel)
 
 
@@ -36,9 +55,14 @@ class RageModelKwargs(Generic[T], TypedDict, total=False):
     case_template: RageCaseTemplate
     system_template: str
     output_structure: Optional[Type[T]]
+    cache: Optional[ResponseCache]
+    scheduler: Optional[RateLimitScheduler]
+    pack_size: int
 
 
 class RageModel(BaseModel, Generic[T], ABC):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     instruction: str
     examples: List[RageExample[T]] = []
     case_template: RageCaseTemplate = Field(default_factory=SimpleCaseTemplate)
@@ -47,20 +71,55 @@ class RageModel(BaseModel, Generic[T], ABC):
     timeout: int = 120
     system_template: str = system_template
     output_structure: Optional[Type[T]] = None
+    cache: Optional[ResponseCache] = Field(default=None, exclude=True)
+    scheduler: Optional[RateLimitScheduler] = Field(default=None, exclude=True)
+    pack_size: int = Field(default=1, ge=1)
+
+    # Left out of metric fingerprints, like they are left out of `cache_key`.
+    fingerprint_exclude: ClassVar[FrozenSet[str]] = frozenset({"timeout", "pack_size"})
 
     @property
     def structure_model(self) -> Structure[Any, T]:
-        if not hasattr(self, "_structure_model") or self._structure_model.model.model_id != self.model_id:
-            _chat_model = load_chat_model(self.model_id)
-            if isinstance(_chat_model, RemoteChatCompletionModel):
-                _chat_model.http_client.timeout = self.timeout
-                _chat_model.parameters.model_update(temperature=self.temperature)
+        chat_model_key = (self.model_id, self.timeout, self.temperature)
+        if getattr(self, "_chat_model_key", None) != chat_model_key:
+            _chat_model = get_chat_model(self.model_id, timeout=self.timeout, temperature=self.temperature)
             examples = [
                 Example(prompt=self.case_template.format(example.rage_case), output=example.output) for example in self.examples
             ]
-            self._structure_model = _chat_model.structure(self.instruction, self.output_pydantic_model, examples=examples)
+            structure_model = _chat_model.structure(self.instruction, self.output_pydantic_model, examples=examples)
+            self._prefix_tokens = _count_prefix_tokens(structure_model)
+            self._structure_model = structure_model
+            # Set last, concurrent callers only reuse the structure model once it is fully built.
+            self._chat_model_key = chat_model_key
         return self._structure_model
 
+    @property
+    def packed_structure_model(self) -> Structure[Any, Any]:
+        """Structure model answering several cases per request, with a list of outputs in `outputs`.
+
+        The few-shot examples are packed into one example. Invalid replies are not re-asked, the cases of a failed
+        pack are sent one by one instead.
+        """
+        chat_model_key = (self.model_id, self.timeout, self.temperature)
+        if getattr(self, "_packed_chat_model_key", None) != chat_model_key:
+            _chat_model = get_chat_model(self.model_id, timeout=self.timeout, temperature=self.temperature)
+            packed_output_model = create_model("PackedOutputs", outputs=(List[self.output_pydantic_model], ...))  # type: ignore
+            examples = []
+            if self.examples:
+                prompt = format_packed_prompt([self.case_template.format(example.rage_case) for example in self.examples])
+                output = packed_output_model.model_construct(outputs=[example.output for example in self.examples])
+                examples.append(Example(prompt=prompt, output=output))
+            structure_model = _chat_model.structure(
+                packed_instruction_template.format(instruction=self.instruction),
+                packed_output_model,
+                examples=examples,
+                max_num_reask=0,
+            )
+            self._packed_prefix_tokens = _count_prefix_tokens(structure_model)
+            self._packed_structure_model = structure_model
+            self._packed_chat_model_key = chat_model_key
+        return self._packed_structure_model
+
     @property
     def output_pydantic_model(self):
         if self.output_structure is not None:
@@ -68,7 +127,250 @@ class RageModel(BaseModel, Generic[T], ABC):
         raise NotImplementedError
 
     def inference(self, case: RageCase) -> T:
-        return self.structure_model.generate(UserMessage(content=self.case_template.format(case))).structure
+        return self._normalize_output(self._shared_inference(self.case_template.format(case)))
+
+    async def async_inference(self, case: RageCase) -> T:
+        return self._normalize_output(await self._async_shared_inference(self.case_template.format(case)))
+
+    def inference_many(self, cases: Sequence[RageCase], return_exceptions: bool = False) -> List[Union[T, Exception]]:
+        """Outputs of `cases` in order, sent `pack_size` cases per request.
+
+        Cached cases are not sent. A pack whose request fails, or whose reply does not hold one valid output per case, is
+        sent again one case per request, all cases of the pack at once. With `return_exceptions=True` the error of a
+        failed case takes its place in the list instead of being raised.
+        """
+        prompts = [self.case_template.format(case) for case in cases]
+        outputs, pending = self._cached_outputs(prompts)
+        for start in range(0, len(pending), self.pack_size):
+            pack = pending[start : start + self.pack_size]
+            pack_prompts = [prompts[index] for index in pack]
+            packed_outputs = self._packed_inference(pack_prompts) if len(pack) > 1 else None
+            if packed_outputs is None:
+                packed_outputs = self._single_outputs(pack_prompts, return_exceptions)
+            for index, output in zip(pack, packed_outputs):
+                outputs[index] = output
+        return [output if isinstance(output, Exception) else self._normalize_output(output) for output in outputs]
+
+    async def async_inference_many(
+        self, cases: Sequence[RageCase], return_exceptions: bool = False
+    ) -> List[Union[T, Exception]]:
+        prompts = [self.case_template.format(case) for case in cases]
+        outputs, pending = self._cached_outputs(prompts)
+        for start in range(0, len(pending), self.pack_size):
+            pack = pending[start : start + self.pack_size]
+            pack_prompts = [prompts[index] for index in pack]
+            packed_outputs = await self._async_packed_inference(pack_prompts) if len(pack) > 1 else None
+            if packed_outputs is None:
+                packed_outputs = await asyncio.gather(
+                    *[self._async_shared_inference(prompt) for prompt in pack_prompts], return_exceptions=return_exceptions
+                )
+            for index, output in zip(pack, packed_outputs):
+                outputs[index] = output
+        return [output if isinstance(output, Exception) else self._normalize_output(output) for output in outputs]
+
+    def _single_outputs(self, prompts: List[str], return_exceptions: bool) -> List[Union[T, Exception]]:
+        """Outputs of `prompts` sent one per request, concurrently when there are several."""
+
+        def send(prompt: str) -> Union[T, Exception]:
+            try:
+                return self._shared_inference(prompt)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        if len(prompts) == 1:
+            return [send(prompts[0])]
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            # Each request runs in a copy of the caller's context, so request sharing and instrumentation carry over.
+            futures = [executor.submit(copy_context().run, send, prompt) for prompt in prompts]
+            return [future.result() for future in futures]
+
+    def _normalize_output(self, output: T) -> T:
+        return output
+
+    def _shared_inference(self, prompt: str) -> T:
+        shared_requests = current_shared_requests()
+        if shared_requests is None:
+            return self._inference(prompt)
+        output = shared_requests.run(self.cache_key(prompt), lambda: self._inference(prompt))
+        return output.model_copy(deep=True)
+
+    async def _async_shared_inference(self, prompt: str) -> T:
+        shared_requests = current_shared_requests()
+        if shared_requests is None:
+            return await self._async_inference(prompt)
+        output = await shared_requests.arun(self.cache_key(prompt), lambda: self._async_inference(prompt))
+        return output.model_copy(deep=True)
+
+    def _inference(self, prompt: str) -> T:
+        cache_key = self.cache_key(prompt) if self.cache is not None else None
+        if (cached_output := self._load_cached_output(cache_key)) is not None:
+            record_call(CallRecord(model_id=self.model_id, cache_hit=True))
+            return cached_output
+        model_output = self._request(prompt)
+        self._save_cached_output(cache_key, model_output.structure)
+        return model_output.structure
+
+    async def _async_inference(self, prompt: str) -> T:
+        cache_key = self.cache_key(prompt) if self.cache is not None else None
+        if (cached_output := self._load_cached_output(cache_key)) is not None:
+            record_call(CallRecord(model_id=self.model_id, cache_hit=True))
+            return cached_output
+        model_output = await self._async_request(prompt)
+        self._save_cached_output(cache_key, model_output.structure)
+        return model_output.structure
+
+    def _packed_inference(self, prompts: List[str]) -> Optional[List[T]]:
+        """Outputs of one pack of prompts, `None` if the request fails or the reply is unusable."""
+        try:
+            model_output = self._request(format_packed_prompt(prompts), packed=True)
+        except Exception:
+            return None
+        return self._unpack_outputs(prompts, model_output.structure.outputs)
+
+    async def _async_packed_inference(self, prompts: List[str]) -> Optional[List[T]]:
+        try:
+            model_output = await self._async_request(format_packed_prompt(prompts), packed=True)
+        except Exception:
+            return None
+        return self._unpack_outputs(prompts, model_output.structure.outputs)
+
+    def _unpack_outputs(self, prompts: List[str], outputs: List[T]) -> Optional[List[T]]:
+        if len(outputs) != len(prompts):
+            return None
+        if self.cache is not None:
+            # Stored under the single-case keys, a case answered in a pack is not asked again on its own.
+            for prompt, output in zip(prompts, outputs):
+                self._save_cached_output(self.cache_key(prompt), output)
+        return outputs
+
+    def _cached_outputs(self, prompts: List[str]) -> Tuple[List[Any], List[int]]:
+        """Outputs of the cached prompts, `None` elsewhere, and the indices of the prompts to send."""
+        outputs: List[Any] = [None] * len(prompts)
+        pending = []
+        for index, prompt in enumerate(prompts):
+            cached_output = self._load_cached_output(self.cache_key(prompt)) if self.cache is not None else None
+            if cached_output is None:
+                pending.append(index)
+            else:
+                record_call(CallRecord(model_id=self.model_id, cache_hit=True))
+                outputs[index] = cached_output
+        return outputs, pending
+
+    def _request(self, prompt: str, packed: bool = False) -> StructureModelOutput[Any]:
+        structure_model = self.packed_structure_model if packed else self.structure_model
+        message = UserMessage(content=prompt)
+        num_attempts = 0
+
+        def generate() -> Tuple[StructureModelOutput[Any], float]:
+            nonlocal num_attempts
+            num_attempts += 1
+            start_time = time.perf_counter()
+            model_output = structure_model.generate(message)
+            return model_output, time.perf_counter() - start_time
+
+        scheduler = self.active_scheduler
+        if scheduler is None:
+            model_output, latency = generate()
+        else:
+            model_output, latency = scheduler.run(generate, num_tokens=self.estimate_prompt_tokens(prompt, packed))
+        if is_instrumenting():
+            record_call(self._call_record(prompt, model_output, latency, retries=num_attempts - 1, packed=packed))
+        return model_output
+
+    async def _async_request(self, prompt: str, packed: bool = False) -> StructureModelOutput[Any]:
+        structure_model = self.packed_structure_model if packed else self.structure_model
+        message = UserMessage(content=prompt)
+        num_attempts = 0
+
+        async def generate() -> Tuple[StructureModelOutput[Any], float]:
+            nonlocal num_attempts
+            num_attempts += 1
+            start_time = time.perf_counter()
+            model_output = await structure_model.async_generate(message)
+            return model_output, time.perf_counter() - start_time
+
+        scheduler = self.active_scheduler
+        if scheduler is None:
+            model_output, latency = await generate()
+        else:
+            model_output, latency = await scheduler.async_run(generate, num_tokens=self.estimate_prompt_tokens(prompt, packed))
+        if is_instrumenting():
+            record_call(self._call_record(prompt, model_output, latency, retries=num_attempts - 1, packed=packed))
+        return model_output
+
+    def _call_record(  # noqa: PLR0913
+        self, prompt: str, model_output: StructureModelOutput[Any], latency_seconds: float, retries: int, packed: bool
+    ) -> CallRecord:
+        usage = model_output.extra.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens"))
+        completion_tokens = usage.get("completion_tokens", usage.get("output_tokens"))
+        estimated_usage = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = self.estimate_prompt_tokens(prompt, packed)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(model_output.structure.model_dump_json())
+        return CallRecord(
+            model_id=self.model_id,
+            latency_seconds=latency_seconds,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=model_output.cost or 0.0,
+            retries=retries,
+            estimated_usage=estimated_usage,
+        )
+
+    @property
+    def active_scheduler(self) -> Optional[RateLimitScheduler]:
+        return self.scheduler or get_scheduler(self.model_id)
+
+    def estimate_prompt_tokens(self, prompt: str, packed: bool = False) -> int:
+        """Estimated input tokens of one request, the system message and examples plus the formatted case."""
+        # Accessing the structure model refreshes its prefix tokens whenever it is rebuilt.
+        if packed:
+            self.packed_structure_model  # noqa: B018
+            return self._packed_prefix_tokens + estimate_tokens(prompt)
+        self.structure_model  # noqa: B018
+        return self._prefix_tokens + estimate_tokens(prompt)
+
+    def cache_key(self, prompt: str) -> str:
+        key_payload = {
+            "model_id": self.model_id,
+            "temperature": self.temperature,
+            "instruction": self.instruction,
+            "system_template": self.system_template,
+            "examples": [
+                {"prompt": self.case_template.format(example.rage_case), "output": example.output.model_dump(mode="json")}
+                for example in self.examples
+            ],
+            "output_schema": self.output_pydantic_model.model_json_schema(),
+            "prompt": prompt,
+        }
+        key_text = json.dumps(key_payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+    def _load_cached_output(self, cache_key: Optional[str]) -> Optional[T]:
+        if self.cache is None or cache_key is None:
+            return None
+        cached_value = self.cache.get(cache_key)
+        if cached_value is None:
+            return None
+        return self.output_pydantic_model.model_validate_json(cached_value)
+
+    def _save_cached_output(self, cache_key: Optional[str], output: T) -> None:
+        if self.cache is not None and cache_key is not None:
+            self.cache.set(cache_key, output.model_dump_json())
+
+
+def format_packed_prompt(prompts: Sequence[str]) -> str:
+    return "\n".join(
+        f"{packed_case_header.format(number=number)}\n{prompt.rstrip()}" for number, prompt in enumerate(prompts, 1)
+    )
+
+
+def _count_prefix_tokens(structure_model: Structure[Any, Any]) -> int:
+    return sum(estimate_tokens(message.content) for message in structure_model.messages if isinstance(message.content, str))
 
 
 class ScorerOutput(BaseModel):
@@ -92,8 +394,7 @@ class RageScorer(RageModel[ScorerOutput]):
                 raise ValueError(f"Score {example.output.score} is not in the range {self.score_range}")
 
     @override
-    def inference(self, case: RageCase) -> ScorerOutput:
-        scorer_output = super().inference(case)
+    def _normalize_output(self, scorer_output: ScorerOutput) -> ScorerOutput:
         if self.normalize:
             scorer_output.score = (scorer_output.score - self.score_range[0]) / (self.score_range[1] - self.score_range[0])
         return scorer_output
@@ -132,6 +433,6 @@ class RageClassifier(RageModel[ClassifierOutput]):
         fields = {}
         if self.cot:
             fields["reason"] = (str, Field(description=cot_reason_description))
-        label_tuple = tuple(self.label_set)
+        label_tuple = tuple(sorted(self.label_set))
         fields["label"] = (Literal[label_tuple], ...)  # type: ignore
         return create_model("ClassifierOutput", **fields)  # type: ignore
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import multiprocessing
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+from rage.case import RageCase
+from rage.results import ErrorResult, RageResult
+from rage.tokenizer import warm_up_jieba
+
+if TYPE_CHECKING:
+    from rage.metrics.base import RageMetric
+
+default_chunk_size = 16
+
+_worker_metric: Optional[RageMetric] = None
+
+
+def initialize_worker(metric: RageMetric) -> None:
+    """Runs once per worker process: keeps the metric and loads the jieba dictionary before the first chunk."""
+    global _worker_metric  # noqa: PLW0603
+    _worker_metric = metric
+    warm_up_jieba()
+
+
+def _safe_calculate(case: RageCase) -> Union[RageResult, ErrorResult]:
+    assert _worker_metric is not None
+    return _worker_metric.safe_calculate(case)
+
+
+def process_map(
+    metric: RageMetric,
+    cases: Iterable[RageCase],
+    processes: Optional[int] = None,
+    chunk_size: int = default_chunk_size,
+    start_method: Optional[str] = None,
+) -> Iterator[Union[RageResult, ErrorResult]]:
+    """Evaluate `metric` over `cases` in a pool of worker processes and yield the results in input order.
+
+    Cases are sent to the workers in chunks of `chunk_size`, results stream back as soon as the chunks in front of
+    them are done. The metric is pickled once per worker, so it must not hold unpicklable state such as the HTTP
+    clients of generate-based metrics.
+    """
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(processes, initializer=initialize_worker, initargs=(metric,)) as pool:
+        yield from pool.imap(_safe_calculate, cases, chunksize=chunk_size)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SharedRequests:
+    """Coalesces identical model requests, the first caller of a key does the work and every other caller reuses it."""
+
+    def __init__(self) -> None:
+        self._futures: Dict[str, Future] = {}
+        self._async_futures: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.num_requests = 0
+        self.num_shared = 0
+
+    def run(self, key: str, function: Callable[[], T]) -> T:
+        with self._lock:
+            self.num_requests += 1
+            future = self._futures.get(key)
+            is_owner = future is None
+            if future is None:
+                future = self._futures[key] = Future()
+            else:
+                self.num_shared += 1
+        if is_owner:
+            try:
+                future.set_result(function())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()
+
+    async def arun(self, key: str, function: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            self.num_requests += 1
+            future = self._async_futures.get(key)
+            is_owner = future is None
+            if future is None:
+                future = self._async_futures[key] = asyncio.get_running_loop().create_future()
+            else:
+                self.num_shared += 1
+        if is_owner:
+            try:
+                future.set_result(await function())
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+        return await asyncio.shield(future)
+
+
+_shared_requests: ContextVar[Optional[SharedRequests]] = ContextVar("rage_shared_requests", default=None)
+
+
+def current_shared_requests() -> Optional[SharedRequests]:
+    return _shared_requests.get()
+
+
+@contextmanager
+def share_requests(shared_requests: Optional[SharedRequests] = None) -> Iterator[SharedRequests]:
+    shared_requests = shared_requests or SharedRequests()
+    token = _shared_requests.set(shared_requests)
+    try:
+        yield shared_requests
+    finally:
+        _shared_requests.reset(token)
+
+
+def run_in_context(shared_requests: Optional[SharedRequests], function: Callable[..., T], *args: Any) -> T:
+    """Run `function` with `shared_requests` active, used to carry the scope into worker threads."""
+    if shared_requests is None:
+        return function(*args)
+    with share_requests(shared_requests):
+        return function(*args)
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import csv
+import math
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from rage.case import RageCase
+from rage.results import BatchResult, ErrorResult, RageResult
+from rage.suite import SuiteResult, SuiteRow
+
+PathLike = Union[str, Path]
+label_types = (str, int, float, bool, type(None))
+default_percentiles = (50, 90, 99)
+
+
+class ResultStore:
+    """Columnar view of evaluation results.
+
+    Every numeric field of a result becomes a float64 column named `<metric>.<field>`, `NaN` where the metric failed
+    or did not produce the field. Errors are kept as one boolean column per metric, `case.extra` values as factorized
+    label columns for `group_by`. Result `extra` dicts are only kept with `keep_extra=True`, in `extras`.
+
+    Build it with `ResultStore.from_rows` / `from_suite_result` / `from_batch`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        case_index: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        errors: Dict[str, np.ndarray],
+        labels: Optional[Dict[str, np.ndarray]] = None,
+        label_values: Optional[Dict[str, List[Any]]] = None,
+        extras: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    ) -> None:
+        self.case_index = case_index
+        self.columns = columns
+        self.errors = errors
+        self.labels = labels or {}
+        self.label_values = label_values or {}
+        self.extras = extras or {}
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[SuiteRow],
+        cases: Optional[Sequence[RageCase]] = None,
+        label_keys: Optional[Sequence[str]] = None,
+        keep_extra: bool = False,
+    ) -> ResultStore:
+        """`cases` are looked up by `row.case_index` for their `extra` labels, all scalar keys unless `label_keys`."""
+        builder = _ResultStoreBuilder(label_keys, keep_extra)
+        for row in rows:
+            builder.add(row.case_index, row.results, cases[row.case_index] if cases is not None else None)
+        return builder.build()
+
+    @classmethod
+    def from_suite_result(
+        cls,
+        suite_result: SuiteResult,
+        cases: Optional[Sequence[RageCase]] = None,
+        label_keys: Optional[Sequence[str]] = None,
+        keep_extra: bool = False,
+    ) -> ResultStore:
+        return cls.from_rows(suite_result.rows, cases, label_keys, keep_extra)
+
+    @classmethod
+    def from_batch(  # noqa: PLR0913
+        cls,
+        batch: Union[BatchResult, Sequence[RageResult]],
+        metric: str,
+        cases: Optional[Sequence[RageCase]] = None,
+        label_keys: Optional[Sequence[str]] = None,
+        keep_extra: bool = False,
+    ) -> ResultStore:
+        results = batch.results if isinstance(batch, BatchResult) else batch
+        builder = _ResultStoreBuilder(label_keys, keep_extra)
+        for index, result in enumerate(results):
+            builder.add(index, {metric: result}, cases[index] if cases is not None else None)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.case_index)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def mean(self, columns: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Mean of every column over the cases that have a value, `NaN` if none does."""
+        return {name: _nanmean(self.columns[name]) for name in columns or self.columns}
+
+    def percentiles(
+        self, percentiles: Sequence[float] = default_percentiles, columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for name in columns or self.columns:
+            values = self.columns[name]
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                summary[name] = {f"p{percentile:g}": math.nan for percentile in percentiles}
+                continue
+            summary[name] = {
+                f"p{percentile:g}": float(value) for percentile, value in zip(percentiles, np.percentile(values, percentiles))
+            }
+        return summary
+
+    def error_rate(self) -> Dict[str, float]:
+        return {name: float(errors.mean()) if len(errors) else 0.0 for name, errors in self.errors.items()}
+
+    def group_mean(self, key: str, columns: Optional[Sequence[str]] = None) -> Dict[Any, Dict[str, float]]:
+        """Per-label means for the `case.extra` key `key`, computed with one `bincount` per column.
+
+        A bool label that equals a number label of the same key, such as `True` and `1`, is keyed by its name `"True"`.
+        """
+        codes, values = self._label(key)
+        num_groups = len(values)
+        values = _group_keys(values)
+        group_sizes = np.bincount(codes, minlength=num_groups)
+        group_means: Dict[Any, Dict[str, float]] = {value: {} for value, size in zip(values, group_sizes) if size}
+        for name in columns or self.columns:
+            column = self.columns[name]
+            is_valid = ~np.isnan(column)
+            sums = np.bincount(codes[is_valid], weights=column[is_valid], minlength=num_groups)
+            counts = np.bincount(codes[is_valid], minlength=num_groups)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+            for value, mean in zip(values, means.tolist()):
+                if value in group_means:
+                    group_means[value][name] = mean
+        return group_means
+
+    def group_by(self, key: str) -> Dict[Any, ResultStore]:
+        """Split into one store per label of the `case.extra` key `key`, cases keep their order within a group.
+
+        Groups are keyed like in `group_mean`.
+        """
+        codes, values = self._label(key)
+        values = _group_keys(values)
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        groups = {}
+        for indices in np.split(order, boundaries):
+            if len(indices):
+                groups[values[codes[indices[0]]]] = self.take(indices)
+        return groups
+
+    def take(self, indices: np.ndarray) -> ResultStore:
+        return ResultStore(
+            case_index=self.case_index[indices],
+            columns={name: column[indices] for name, column in self.columns.items()},
+            errors={name: errors[indices] for name, errors in self.errors.items()},
+            labels={name: codes[indices] for name, codes in self.labels.items()},
+            label_values=self.label_values,
+            extras={name: [extras[index] for index in indices.tolist()] for name, extras in self.extras.items()},
+        )
+
+    def label(self, key: str) -> np.ndarray:
+        codes, values = self._label(key)
+        return np.asarray(values, dtype=object)[codes]
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """All columns of the store: `case_index`, labels, numeric columns and `<metric>.error` flags."""
+        columns: Dict[str, np.ndarray] = {"case_index": self.case_index}
+        for key in self.labels:
+            columns[key] = self.label(key)
+        columns.update(self.columns)
+        for name, errors in self.errors.items():
+            columns[f"{name}.error"] = errors
+        return columns
+
+    def to_csv(self, path: PathLike) -> None:
+        columns = self.to_columns()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(zip(*(column.tolist() for column in columns.values())))
+
+    def to_parquet(self, path: PathLike) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing parquet files requires pyarrow, please install it with `pip install pyarrow`") from e
+
+        columns = self.to_columns()
+        table = pa.table({name: column.tolist() if column.dtype == object else column for name, column in columns.items()})
+        pq.write_table(table, path)
+
+    def _label(self, key: str) -> Tuple[np.ndarray, List[Any]]:
+        if key not in self.labels:
+            raise KeyError(f"No case.extra label '{key}' in the result store")
+        return self.labels[key], self.label_values[key]
+
+
+class _ResultStoreBuilder:
+    """Appends rows into `array` buffers, which hold raw doubles instead of one Python float object per value."""
+
+    def __init__(self, label_keys: Optional[Sequence[str]], keep_extra: bool) -> None:
+        self.label_keys = label_keys
+        self.keep_extra = keep_extra
+        self.num_rows = 0
+        self.case_index = array("q")
+        self.columns: Dict[str, array] = {}
+        self.errors: Dict[str, array] = {}
+        self.labels: Dict[str, array] = {}
+        self.label_codes: Dict[str, Dict[Hashable, int]] = {}
+        self.label_values: Dict[str, List[Any]] = {}
+        self.extras: Dict[str, List[Dict[str, Any]]] = {}
+
+    def add(self, case_index: int, results: Mapping[str, RageResult], case: Optional[RageCase]) -> None:
+        self.case_index.append(case_index)
+        for metric, result in results.items():
+            self._add_result(metric, result)
+        if case is not None:
+            self._add_labels(case)
+        self.num_rows += 1
+        # Columns the row did not produce, or first seen in this row, are padded to the same length.
+        for buffers, fill_value in ((self.columns, math.nan), (self.errors, 0), (self.labels, 0)):
+            for buffer in buffers.values():
+                if len(buffer) < self.num_rows:
+                    buffer.append(fill_value)
+        for extras in self.extras.values():
+            if len(extras) < self.num_rows:
+                extras.append({})
+
+    def _add_result(self, metric: str, result: RageResult) -> None:
+        self._column(self.errors, metric, "b", 0).append(isinstance(result, ErrorResult))
+        for field, value in result.__dict__.items():
+            if isinstance(value, (int, float)):
+                self._column(self.columns, f"{metric}.{field}", "d", math.nan).append(value)
+        if self.keep_extra:
+            self.extras.setdefault(metric, [{}] * self.num_rows).append(result.extra)
+
+    def _add_labels(self, case: RageCase) -> None:
+        for key in self.label_keys if self.label_keys is not None else case.extra:
+            value = case.extra.get(key)
+            if isinstance(value, label_types):
+                codes = self.label_codes.setdefault(key, {None: 0})
+                values = self.label_values.setdefault(key, [None])
+                # True and 1 are equal dict keys, bools get codes of their own.
+                code_key = (bool, value) if isinstance(value, bool) else value
+                code = codes.get(code_key)
+                if code is None:
+                    code = codes[code_key] = len(values)
+                    values.append(value)
+                self._column(self.labels, key, "q", 0).append(code)
+
+    def _column(self, buffers: Dict[str, array], name: str, typecode: str, fill_value: Any) -> array:
+        buffer = buffers.get(name)
+        if buffer is None:
+            buffer = buffers[name] = array(typecode, [fill_value]) * self.num_rows
+        return buffer
+
+    def build(self) -> ResultStore:
+        return ResultStore(
+            case_index=np.frombuffer(self.case_index, dtype=np.int64),
+            columns={name: np.frombuffer(buffer, dtype=np.float64) for name, buffer in self.columns.items()},
+            errors={name: np.frombuffer(buffer, dtype=np.int8).astype(bool) for name, buffer in self.errors.items()},
+            labels={name: np.frombuffer(buffer, dtype=np.int64) for name, buffer in self.labels.items()},
+            label_values=self.label_values,
+            extras=self.extras,
+        )
+
+
+def _group_keys(values: List[Any]) -> List[Any]:
+    numbers = {value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)}
+    return [str(value) if isinstance(value, bool) and value in numbers else value for value in values]
+
+
+def _nanmean(values: np.ndarray) -> float:
+    is_valid = ~np.isnan(values)
+    count = int(is_valid.sum())
+    return float(values[is_valid].sum() / count) if count else math.nan
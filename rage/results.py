@@ -1,14 +1,37 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Generic, List, TypeVar, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, SerializeAsAny
 
 
 class RageResult(BaseModel):
     extra: Dict[str, Any] = {}
 
 
+T = TypeVar("T", bound=RageResult)
+
+
+class ErrorResult(RageResult):
+    error: str
+    error_type: str
+
+
+class BatchResult(BaseModel, Generic[T]):
+    results: List[Union[SerializeAsAny[T], ErrorResult]]
+    elapsed_seconds: float
+
+    @property
+    def num_errors(self) -> int:
+        return sum(isinstance(result, ErrorResult) for result in self.results)
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return float("inf") if self.results else 0.0
+        return len(self.results) / self.elapsed_seconds
+
+
 class RelevanceResult(RageResult):
     relevance: float
 
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from rage.results import PrecisionRecallF1Result
+from rage.tokenizer import Tokenizer, default_tokenizer
+
+# Below this many DP cells the pure Python loop beats the NumPy call overhead.
+_min_vectorized_cells = 4096
+
+
+def lcs_length(tokens: Sequence[str], reference_tokens: Sequence[str]) -> int:
+    if len(tokens) < len(reference_tokens):
+        tokens, reference_tokens = reference_tokens, tokens
+    if not reference_tokens:
+        return 0
+    if len(tokens) * len(reference_tokens) >= _min_vectorized_cells:
+        return int(batch_lcs_length(tokens, [reference_tokens])[0])
+
+    previous_row = [0] * (len(reference_tokens) + 1)
+    for token in tokens:
+        current_row = [0] * (len(reference_tokens) + 1)
+        for j, reference_token in enumerate(reference_tokens, start=1):
+            if token == reference_token:
+                current_row[j] = previous_row[j - 1] + 1
+            else:
+                current_row[j] = max(previous_row[j], current_row[j - 1])
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def batch_lcs_length(tokens: Sequence[str], references: Sequence[Sequence[str]]) -> np.ndarray:
+    """LCS length of `tokens` against every reference, all references are advanced together one token row at a time.
+
+    Uses the row recurrence `lcs[i][j] = cummax_j(max(lcs[i-1][j], lcs[i-1][j-1] + match[i][j]))`, so only one
+    row per reference is kept in memory.
+    """
+    lengths = np.array([len(reference) for reference in references], dtype=np.int64)
+    if not tokens or not len(references) or not lengths.max(initial=0):
+        return np.zeros(len(references), dtype=np.int64)
+
+    vocabulary: Dict[str, int] = {}
+    encoded_references = np.full((len(references), int(lengths.max())), -1, dtype=np.int64)
+    for index, reference in enumerate(references):
+        encoded_references[index, : len(reference)] = [vocabulary.setdefault(token, len(vocabulary)) for token in reference]
+
+    row = np.zeros((len(references), encoded_references.shape[1] + 1), dtype=np.int64)
+    for token in tokens:
+        token_id = vocabulary.get(token)
+        if token_id is None:
+            continue
+        matches = encoded_references == token_id
+        current_row = np.maximum(row[:, 1:], row[:, :-1] + matches)
+        np.maximum.accumulate(current_row, axis=1, out=current_row)
+        row[:, 1:] = current_row
+    return row[np.arange(len(references)), lengths]
+
+
+def _prf(lcs: int, num_tokens: int, num_reference_tokens: int) -> PrecisionRecallF1Result:
+    if lcs == 0:
+        return PrecisionRecallF1Result(precision=0.0, recall=0.0, f1=0.0)
+    precision = lcs / num_tokens
+    recall = lcs / num_reference_tokens
+    return PrecisionRecallF1Result(precision=precision, recall=recall, f1=2 * precision * recall / (precision + recall))
+
+
+class RougeL:
+    """ROUGE-L with a pluggable tokenizer, the default segments with jieba so that Chinese text is scored per word.
+
+    `RougeL(char_tokenize)` scores per character instead.
+    """
+
+    def __init__(self, tokenizer: Optional[Tokenizer] = None) -> None:
+        self.tokenizer = tokenizer or default_tokenizer
+
+    def score(self, text: str, reference_text: str) -> PrecisionRecallF1Result:
+        return self.score_tokens(self.tokenizer(text), self.tokenizer(reference_text))
+
+    def score_tokens(self, tokens: Sequence[str], reference_tokens: Sequence[str]) -> PrecisionRecallF1Result:
+        return _prf(lcs_length(tokens, reference_tokens), len(tokens), len(reference_tokens))
+
+    def score_many(self, text: str, reference_texts: Sequence[str]) -> List[PrecisionRecallF1Result]:
+        tokens = self.tokenizer(text)
+        references = [self.tokenizer(reference_text) for reference_text in reference_texts]
+        lcs_lengths = batch_lcs_length(tokens, references)
+        return [_prf(int(lcs), len(tokens), len(reference_tokens)) for lcs, reference_tokens in zip(lcs_lengths, references)]
+
+
+default_rouge_l = RougeL()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status_code == 429:  # noqa: PLR2004
+        return True
+    cause = error.__cause__ or getattr(error, "last_attempt", None)
+    if cause is not None and hasattr(cause, "exception"):
+        cause = cause.exception()
+    return isinstance(cause, BaseException) and cause is not error and is_rate_limit_error(cause)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Reservation based token bucket, `reserve` takes the tokens immediately and returns how long to wait."""
+
+    def __init__(self, capacity_per_minute: float) -> None:
+        self.capacity = capacity_per_minute
+        self.tokens = capacity_per_minute
+        self.updated_at = time.monotonic()
+
+    def reserve(self, amount: float, rate_scale: float = 1.0, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        rate_per_second = self.capacity * rate_scale / 60
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate_per_second)
+        self.updated_at = now
+        # A single request larger than the bucket still goes through once the bucket is full.
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / rate_per_second
+
+
+class SchedulerStats(BaseModel):
+    num_requests: int = 0
+    num_rate_limited: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    rate_scale: float = 1.0
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.num_requests if self.num_requests else 0.0
+
+
+class RateLimitScheduler:
+    """Paces requests to one model under requests-per-minute and tokens-per-minute budgets.
+
+    On a rate limit error the scheduler pauses every caller for an exponentially growing backoff (or the server's
+    `Retry-After`) and halves its sending rate, the rate then recovers additively with each successful request.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 6,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        min_rate_scale: float = 0.1,
+    ) -> None:
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.min_rate_scale = min_rate_scale
+        self.stats = SchedulerStats()
+        self._backoff_until = 0.0
+        self._consecutive_rate_limits = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, num_tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._backoff_until - now, 0.0)
+            if self.request_bucket is not None:
+                delay = max(delay, self.request_bucket.reserve(1, self.stats.rate_scale, now))
+            if self.token_bucket is not None:
+                delay = max(delay, self.token_bucket.reserve(num_tokens, self.stats.rate_scale, now))
+            self.stats.num_requests += 1
+            self.stats.total_wait_seconds += delay
+            self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, delay)
+            if delay > 0:
+                self.stats.queue_depth += 1
+                self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+            return delay
+
+    def _dequeue(self) -> None:
+        with self._lock:
+            self.stats.queue_depth -= 1
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self._consecutive_rate_limits = 0
+            self.stats.rate_scale = min(1.0, self.stats.rate_scale + 0.05)
+
+    def _on_rate_limited(self, error: BaseException) -> None:
+        with self._lock:
+            self._consecutive_rate_limits += 1
+            self.stats.num_rate_limited += 1
+            self.stats.rate_scale = max(self.min_rate_scale, self.stats.rate_scale / 2)
+            backoff = retry_after_seconds(error)
+            if backoff is None:
+                backoff = min(self.max_backoff, self.initial_backoff * 2 ** (self._consecutive_rate_limits - 1))
+            self._backoff_until = max(self._backoff_until, time.monotonic() + backoff)
+
+    def acquire(self, num_tokens: int = 0) -> None:
+        delay = self._reserve(num_tokens)
+        if delay > 0:
+            time.sleep(delay)
+            self._dequeue()
+
+    async def async_acquire(self, num_tokens: int = 0) -> None:
+        delay = self._reserve(num_tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self._dequeue()
+
+    def run(self, function: Callable[[], T], num_tokens: int = 0) -> T:
+        num_retries = 0
+        while True:
+            self.acquire(num_tokens)
+            try:
+                result = function()
+            except Exception as e:
+                if not is_rate_limit_error(e) or num_retries >= self.max_retries:
+                    raise
+                self._on_rate_limited(e)
+                num_retries += 1
+            else:
+                self._on_success()
+                return result
+
+    async def async_run(self, function: Callable[[], Awaitable[T]], num_tokens: int = 0) -> T:
+        num_retries = 0
+        while True:
+            await self.async_acquire(num_tokens)
+            try:
+                result = await function()
+            except Exception as e:
+                if not is_rate_limit_error(e) or num_retries >= self.max_retries:
+                    raise
+                self._on_rate_limited(e)
+                num_retries += 1
+            else:
+                self._on_success()
+                return result
+
+
+_schedulers: Dict[str, RateLimitScheduler] = {}
+
+
+def configure_rate_limit(
+    model_id: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    max_retries: int = 6,
+) -> RateLimitScheduler:
+    scheduler = RateLimitScheduler(requests_per_minute, tokens_per_minute, max_retries=max_retries)
+    _schedulers[model_id] = scheduler
+    return scheduler
+
+
+def get_scheduler(model_id: str) -> Optional[RateLimitScheduler]:
+    return _schedulers.get(model_id)
+
+
+def scheduler_stats() -> Dict[str, SchedulerStats]:
+    return {model_id: scheduler.stats.model_copy() for model_id, scheduler in _schedulers.items()}
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, FrozenSet, Iterable, List, Pattern, Tuple
+
+if TYPE_CHECKING:
+    from functools import _CacheInfo
+
+Span = Tuple[int, int]
+leading_space = re.compile(r"\s*")
+
+closing_quotes = "\"'\u2019\u201d\u300d\u300f\uff09)\\]"
+chinese_terminators = "\u3002\uff01\uff1f\uff1b!?"
+cjk_characters = "\u3400-\u4dbf\u4e00-\u9fff"
+default_abbreviations = frozenset(["mr", "mrs", "ms", "dr", "prof", "vs", "e.g", "i.e", "fig"])
+# Abbreviations that often end a sentence, like "etc." or "Inc.": they end one before a capitalized word.
+default_final_abbreviations = frozenset(["etc", "inc", "ltd", "jr", "sr"])
+
+
+def compile_sentence_boundary(abbreviations: Iterable[str], final_abbreviations: Iterable[str] = ()) -> Pattern[str]:
+    """One pattern for all boundaries, with the whitespace after them so that the next sentence starts at `match.end()`.
+
+    Chinese terminators end a sentence anywhere. A period only ends one before whitespace, the end of the text or CJK
+    text, so decimals, versions and domains stay in one piece. It never ends one after `abbreviations`, and only before
+    a capitalized word, CJK text or the end of the text after `final_abbreviations` and dotted acronyms such as U.S. A
+    single capital other than I followed by a capitalized word is read as an initial, such as the J. in J. Smith, which
+    also keeps a sentence ending in a letter together with the next one, as in "Plan B. Next". Closing quotes and
+    brackets belong to the terminator.
+    """
+    not_after_abbreviation = "".join(
+        rf"(?<!\b{re.escape(abbreviation)}\.)" for abbreviation in sorted(abbreviations, key=len, reverse=True)
+    )
+    final_words = [re.escape(abbreviation) for abbreviation in sorted(final_abbreviations, key=len, reverse=True)]
+    not_inside_sentence = "".join(
+        rf"(?!(?<=\b{word}\.)(?!\s+(?-i:[A-Z])|\s*$|\s*[{cjk_characters}]))" for word in [*final_words, r"[a-z]\.[a-z]"]
+    )
+    # Starting with a character class lets the regex engine skip ahead to candidate characters.
+    return re.compile(
+        rf"[{chinese_terminators}.]"
+        rf"(?:(?<=[{chinese_terminators}])[{chinese_terminators}]*[{closing_quotes}]*"
+        rf"|(?!(?<=\b(?-i:[A-HJ-Z])\.)\s+(?-i:[A-Z])){not_after_abbreviation}{not_inside_sentence}"
+        rf"\.*[{closing_quotes}]*(?=\s|$|[{cjk_characters}]))\s*",
+        re.IGNORECASE,
+    )
+
+
+class SentenceSegmenter:
+    """Splits mixed Chinese and English text into sentences, as `(start, end)` spans over the original string.
+
+    Spans exclude the terminating punctuation and surrounding whitespace, so `text[start:end]` is the sentence.
+    Spans are memoized per text in an LRU cache of `cache_size` texts.
+    """
+
+    def __init__(
+        self,
+        abbreviations: Iterable[str] = default_abbreviations,
+        final_abbreviations: Iterable[str] = default_final_abbreviations,
+        cache_size: int = 65536,
+    ) -> None:
+        self.abbreviations: FrozenSet[str] = frozenset(abbreviation.lower() for abbreviation in abbreviations)
+        self.final_abbreviations: FrozenSet[str] = frozenset(abbreviation.lower() for abbreviation in final_abbreviations)
+        self.boundary = compile_sentence_boundary(self.abbreviations, self.final_abbreviations)
+        self._cached_spans = lru_cache(maxsize=cache_size)(self._spans)
+
+    def spans(self, text: str) -> Tuple[Span, ...]:
+        return self._cached_spans(text)
+
+    def split(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.spans(text)]
+
+    def spans_batch(self, texts: Iterable[str]) -> List[Tuple[Span, ...]]:
+        """Spans of many documents, repeated documents are segmented once."""
+        spans = self._cached_spans
+        return [spans(text) for text in texts]
+
+    def split_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        texts = list(texts)
+        return [[text[start:end] for start, end in spans] for text, spans in zip(texts, self.spans_batch(texts))]
+
+    def cache_info(self) -> _CacheInfo:
+        """Hits, misses and size of the span cache."""
+        return self._cached_spans.cache_info()
+
+    def clear_cache(self) -> None:
+        self._cached_spans.cache_clear()
+
+    def _spans(self, text: str) -> Tuple[Span, ...]:
+        spans = []
+        start = leading_space.match(text).end()  # type: ignore
+        for match in self.boundary.finditer(text, start):
+            end = match.start()
+            if end > start:
+                if text[end - 1].isspace():
+                    end = _rstrip(text, start, end)
+                spans.append((start, end))
+            start = match.end()
+        end = _rstrip(text, start, len(text))
+        if end > start:
+            spans.append((start, end))
+        return tuple(spans)
+
+
+def _rstrip(text: str, start: int, end: int) -> int:
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return end
+
+
+default_segmenter = SentenceSegmenter()
+
+
+def sentence_spans(text: str) -> Tuple[Span, ...]:
+    return default_segmenter.spans(text)
+
+
+def split_sentences(text: str) -> List[str]:
+    return default_segmenter.split(text)
+
+
+def split_sentences_batch(texts: Iterable[str]) -> List[List[str]]:
+    return default_segmenter.split_batch(texts)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Iterator, Literal, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from rage.case import RageCase
+from rage.checkpoint import case_id
+from rage.results import ErrorResult
+from rage.suite import SuiteRow
+
+Scores = Union[Mapping[str, float], Sequence[float], np.ndarray]
+Statistic = Literal["mean", "median"]
+
+# Upper bound on the number of elements of one resampling matrix, resamples are drawn in chunks below it.
+max_chunk_elements = 1 << 22
+
+
+class ConfidenceInterval(BaseModel):
+    estimate: float
+    low: float
+    high: float
+    confidence: float
+    num_samples: int
+    num_resamples: int
+
+
+class PairedComparison(BaseModel):
+    method: Literal["bootstrap", "permutation"]
+    num_cases: int
+    baseline: float
+    candidate: float
+    difference: float
+    p_value: float
+    low: Optional[float] = None
+    high: Optional[float] = None
+    confidence: Optional[float] = None
+
+    @property
+    def is_significant(self) -> bool:
+        return self.p_value < (1 - (self.confidence or 0.95))
+
+
+def run_scores(
+    rows: Iterable[SuiteRow], metric: str, field: str, cases: Optional[Sequence[RageCase]] = None
+) -> Dict[str, float]:
+    """Scores of one result field keyed by case id, `NaN` for failed cases.
+
+    The id is `row.case_id` when the run was checkpointed, otherwise the `case_id` of `cases[row.case_index]`, and
+    the case index as a last resort.
+    """
+    scores = {}
+    for row in rows:
+        if row.case_id is not None:
+            key = row.case_id
+        elif cases is not None:
+            key = case_id(cases[row.case_index])
+        else:
+            key = str(row.case_index)
+        result = row.results.get(metric)
+        value = getattr(result, field, None) if not isinstance(result, ErrorResult) else None
+        scores[key] = float(value) if value is not None else math.nan
+    return scores
+
+
+def align(baseline: Scores, candidate: Scores) -> Tuple[np.ndarray, np.ndarray]:
+    """Pair the scores of two runs, by case id for mappings and by position for arrays, and drop incomplete pairs."""
+    if isinstance(baseline, Mapping) and isinstance(candidate, Mapping):
+        case_ids = [key for key in baseline if key in candidate]
+        baseline_values = np.fromiter((baseline[key] for key in case_ids), dtype=np.float64, count=len(case_ids))
+        candidate_values = np.fromiter((candidate[key] for key in case_ids), dtype=np.float64, count=len(case_ids))
+    elif isinstance(baseline, Mapping) or isinstance(candidate, Mapping):
+        raise TypeError("Both runs must be keyed by case id, or both must be aligned arrays")
+    else:
+        baseline_values = np.asarray(baseline, dtype=np.float64)
+        candidate_values = np.asarray(candidate, dtype=np.float64)
+        if baseline_values.shape != candidate_values.shape:
+            raise ValueError(f"Runs are not aligned: {len(baseline_values)} vs {len(candidate_values)} cases")
+    is_complete = ~(np.isnan(baseline_values) | np.isnan(candidate_values))
+    return baseline_values[is_complete], candidate_values[is_complete]
+
+
+def bootstrap_ci(  # noqa: PLR0913
+    values: Union[Sequence[float], np.ndarray],
+    confidence: float = 0.95,
+    num_resamples: int = 10_000,
+    statistic: Statistic = "mean",
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> ConfidenceInterval:
+    """Percentile bootstrap interval of the mean or median, `NaN` values (failed cases) are left out."""
+    _check_confidence(confidence)
+    _check_num_resamples(num_resamples, "num_resamples")
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        raise ValueError("No scores to bootstrap")
+    rng = np.random.default_rng(seed)
+    resampled = np.concatenate(
+        [_statistic(values[indices], statistic) for indices in _resample_indices(rng, len(values), num_resamples, chunk_size)]
+    )
+    low, high = np.quantile(resampled, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return ConfidenceInterval(
+        estimate=float(_statistic(values[np.newaxis], statistic)[0]),
+        low=float(low),
+        high=float(high),
+        confidence=confidence,
+        num_samples=len(values),
+        num_resamples=num_resamples,
+    )
+
+
+def paired_bootstrap_test(  # noqa: PLR0913
+    baseline: Scores,
+    candidate: Scores,
+    confidence: float = 0.95,
+    num_resamples: int = 10_000,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> PairedComparison:
+    """Bootstrap the mean per-case difference `candidate - baseline`.
+
+    The interval is the percentile interval of the resampled differences, the two-sided p-value compares the
+    observed difference against the resampled differences shifted to a zero mean.
+    """
+    _check_confidence(confidence)
+    _check_num_resamples(num_resamples, "num_resamples")
+    baseline_values, candidate_values = _paired(baseline, candidate)
+    differences = candidate_values - baseline_values
+    observed = float(differences.mean())
+    rng = np.random.default_rng(seed)
+    resampled = np.concatenate(
+        [differences[indices].mean(axis=1) for indices in _resample_indices(rng, len(differences), num_resamples, chunk_size)]
+    )
+    low, high = np.quantile(resampled, [(1 - confidence) / 2, (1 + confidence) / 2])
+    num_extreme = int(np.count_nonzero(np.abs(resampled - observed) >= abs(observed)))
+    return PairedComparison(
+        method="bootstrap",
+        num_cases=len(differences),
+        baseline=float(baseline_values.mean()),
+        candidate=float(candidate_values.mean()),
+        difference=observed,
+        p_value=(num_extreme + 1) / (num_resamples + 1),
+        low=float(low),
+        high=float(high),
+        confidence=confidence,
+    )
+
+
+def paired_permutation_test(
+    baseline: Scores,
+    candidate: Scores,
+    num_permutations: int = 10_000,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> PairedComparison:
+    """Two-sided sign-flip permutation test of the mean per-case difference `candidate - baseline`."""
+    _check_num_resamples(num_permutations, "num_permutations")
+    baseline_values, candidate_values = _paired(baseline, candidate)
+    differences = candidate_values - baseline_values
+    num_cases = len(differences)
+    observed = float(differences.mean())
+    total = differences.sum()
+    rng = np.random.default_rng(seed)
+    num_extreme = 0
+    for size in _chunk_sizes(num_cases, num_permutations, chunk_size):
+        # One random bit per case decides its sign, flipping the cases in `flips` turns the total into
+        # `total - 2 * flipped`. The tolerance keeps the identity permutation extreme despite rounding.
+        random_bytes = rng.integers(0, 256, size=(size, (num_cases + 7) // 8), dtype=np.uint8)
+        flips = np.unpackbits(random_bytes, axis=1, count=num_cases)
+        permuted = (total - 2 * (flips @ differences)) / num_cases
+        num_extreme += int(np.count_nonzero(np.abs(permuted) >= abs(observed) - 1e-12))
+    return PairedComparison(
+        method="permutation",
+        num_cases=num_cases,
+        baseline=float(baseline_values.mean()),
+        candidate=float(candidate_values.mean()),
+        difference=observed,
+        p_value=(num_extreme + 1) / (num_permutations + 1),
+    )
+
+
+def _check_confidence(confidence: float) -> None:
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+
+
+def _check_num_resamples(num_resamples: int, name: str) -> None:
+    if num_resamples < 1:
+        raise ValueError(f"{name} must be at least 1, got {num_resamples}")
+
+
+def _paired(baseline: Scores, candidate: Scores) -> Tuple[np.ndarray, np.ndarray]:
+    baseline_values, candidate_values = align(baseline, candidate)
+    if len(baseline_values) == 0:
+        raise ValueError("The runs have no scored case in common")
+    return baseline_values, candidate_values
+
+
+def _statistic(samples: np.ndarray, statistic: Statistic) -> np.ndarray:
+    if statistic == "median":
+        return np.median(samples, axis=1)
+    return samples.mean(axis=1)
+
+
+def _chunk_sizes(num_samples: int, num_resamples: int, chunk_size: Optional[int]) -> Iterator[int]:
+    chunk_size = chunk_size or max(1, max_chunk_elements // num_samples)
+    for start in range(0, num_resamples, chunk_size):
+        yield min(chunk_size, num_resamples - start)
+
+
+def _resample_indices(
+    rng: np.random.Generator, num_samples: int, num_resamples: int, chunk_size: Optional[int]
+) -> Iterator[np.ndarray]:
+    dtype = np.int32 if num_samples < 2**31 else np.int64
+    for size in _chunk_sizes(num_samples, num_resamples, chunk_size):
+        yield rng.integers(0, num_samples, size=(size, num_samples), dtype=dtype)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Deque, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, SerializeAsAny
+
+from rage.case import RageCase
+from rage.checkpoint import Checkpoint, RecordKey, case_id
+from rage.metrics.base import RageMetric
+from rage.request_sharing import SharedRequests, run_in_context, share_requests
+from rage.results import ErrorResult, RageResult
+
+ProjectionKey = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+class SuiteRow(BaseModel):
+    case_index: int
+    case_id: Optional[str] = None
+    results: Dict[str, SerializeAsAny[RageResult]]
+    num_shared_requests: int = 0
+
+    @property
+    def num_errors(self) -> int:
+        return sum(isinstance(result, ErrorResult) for result in self.results.values())
+
+
+class SuiteResult(BaseModel):
+    rows: List[SuiteRow]
+    elapsed_seconds: float
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return float("inf") if self.rows else 0.0
+        return len(self.rows) / self.elapsed_seconds
+
+
+class EvaluationSuite:
+    """Runs a panel of metrics over a dataset and returns one combined row per case.
+
+    Work shared between metrics is done once per case: metrics that project the case onto the same fields share the
+    refined case, identical model requests are coalesced, and sentence splits and token sequences come from the
+    process-wide caches in `rage.utils` and `rage.tokenizer`.
+
+    Every metric runs one case at a time through `safe_calculate`, so a model's `pack_size` never packs several cases
+    into one request here; run `calculate_batch` on the metric itself for that. Context precision still packs the
+    contexts of each case.
+    """
+
+    def __init__(self, metrics: Union[Sequence[RageMetric], Mapping[str, RageMetric]], max_concurrency: int = 8) -> None:
+        if isinstance(metrics, Mapping):
+            self.metrics = dict(metrics)
+        else:
+            self.metrics = {}
+            for metric in metrics:
+                name = type(metric).__name__
+                if name in self.metrics:
+                    raise ValueError(f"Duplicate metric name '{name}', pass a mapping to name the metrics explicitly")
+                self.metrics[name] = metric
+        self.max_concurrency = max_concurrency
+
+    def refine_case(self, case: RageCase) -> Dict[str, RageCase]:
+        projections: Dict[ProjectionKey, RageCase] = {}
+        refined_cases = {}
+        for name, metric in self.metrics.items():
+            if not metric.required_fields:
+                refined_cases[name] = case
+                continue
+            projection_key = (frozenset(metric.required_fields), frozenset(metric.optional_fields))
+            if projection_key not in projections:
+                try:
+                    projections[projection_key] = metric.refine_case(case)
+                except ValueError:
+                    # Let the metric itself raise, so the error is recorded in its result.
+                    projections[projection_key] = case
+            refined_cases[name] = projections[projection_key]
+        return refined_cases
+
+    def evaluate_case(self, case: RageCase) -> SuiteRow:
+        return self.evaluate([case])[0]
+
+    def evaluate(self, cases: Iterable[RageCase]) -> List[SuiteRow]:
+        return self.run(cases).rows
+
+    def run(self, cases: Iterable[RageCase]) -> SuiteResult:
+        start_time = time.perf_counter()
+        rows = list(self.iter_run(cases))
+        return SuiteResult(rows=rows, elapsed_seconds=time.perf_counter() - start_time)
+
+    def iter_run(
+        self,
+        cases: Iterable[RageCase],
+        max_pending: Optional[int] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        retry_failed: bool = True,
+    ) -> Iterator[SuiteRow]:
+        """Lazily evaluate `cases` and yield rows in input order.
+
+        At most `max_pending` cases (default `2 * max_concurrency`) are in flight, so memory stays bounded however
+        long the input is and a slow consumer applies backpressure to the reader.
+
+        With a `checkpoint`, every finished `(case, metric)` result is recorded as soon as it completes and results
+        already in the checkpoint are reused instead of recomputed. Failed results are recomputed when
+        `retry_failed` is true. An `IncrementalCheckpoint` also recomputes results whose metric inputs changed.
+        """
+        max_pending = max_pending or 2 * self.max_concurrency
+        fingerprints = {name: metric.fingerprint() for name, metric in self.metrics.items()} if checkpoint is not None else {}
+        pending: Deque[Tuple[int, Optional[str], SharedRequests, Dict[str, Future]]] = deque()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for case_index, case in enumerate(cases):
+                shared_requests = SharedRequests()
+                current_case_id = case_id(case) if checkpoint is not None else None
+                futures: Dict[str, Future] = {}
+                for name, refined_case in self.refine_case(case).items():
+                    if checkpoint is not None:
+                        record_key = checkpoint.record_key(current_case_id, name, fingerprints[name], refined_case)  # type: ignore
+                        stored_result = checkpoint.get(*record_key, include_failed=not retry_failed)
+                        if stored_result is not None:
+                            futures[name] = Future()
+                            futures[name].set_result(stored_result)
+                            continue
+                    futures[name] = executor.submit(run_in_context, shared_requests, self._safe_calculate, name, refined_case)
+                    if checkpoint is not None:
+                        futures[name].add_done_callback(partial(_record_result, checkpoint, record_key))
+                pending.append((case_index, current_case_id, shared_requests, futures))
+                if len(pending) >= max_pending:
+                    yield self._collect_row(*pending.popleft())
+            while pending:
+                yield self._collect_row(*pending.popleft())
+
+    def _collect_row(
+        self, case_index: int, current_case_id: Optional[str], shared_requests: SharedRequests, futures: Dict[str, Future]
+    ) -> SuiteRow:
+        return SuiteRow(
+            case_index=case_index,
+            case_id=current_case_id,
+            results={name: future.result() for name, future in futures.items()},
+            num_shared_requests=shared_requests.num_shared,
+        )
+
+    async def arun(self, cases: Iterable[RageCase], max_concurrency: Optional[int] = None) -> SuiteResult:
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def _evaluate_case(case_index: int, case: RageCase) -> SuiteRow:
+            async with semaphore:
+                with share_requests() as shared_requests:
+                    refined_cases = self.refine_case(case)
+                    results = await asyncio.gather(
+                        *[self._safe_acalculate(name, refined_case) for name, refined_case in refined_cases.items()]
+                    )
+                return SuiteRow(
+                    case_index=case_index,
+                    results=dict(zip(refined_cases, results)),
+                    num_shared_requests=shared_requests.num_shared,
+                )
+
+        start_time = time.perf_counter()
+        rows = await asyncio.gather(*[_evaluate_case(case_index, case) for case_index, case in enumerate(cases)])
+        return SuiteResult(rows=list(rows), elapsed_seconds=time.perf_counter() - start_time)
+
+    def _safe_calculate(self, name: str, case: RageCase) -> RageResult:
+        return self.metrics[name].safe_calculate(case)
+
+    async def _safe_acalculate(self, name: str, case: RageCase) -> RageResult:
+        return await self.metrics[name].safe_acalculate(case)
+
+
+def _record_result(checkpoint: Checkpoint, record_key: RecordKey, future: Future) -> None:
+    checkpoint.record(*record_key, future.result())
@@ -1,8 +1,15 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from typing import ClassVar, Dict, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from rage.case import RageCase
+from rage.tokenizer import default_tokenizer, estimate_tokens
+
+context_fields = ("contexts", "retrieved_contexts")
+ContextRef = Tuple[str, int]
 
 
 class RageCaseTemplate(BaseModel, ABC):
@@ -25,3 +32,110 @@ class SimpleCaseTemplate(RageCaseTemplate):
         if case.generated_answer:
             text += "Generated Answer: " + case.generated_answer + "\n"
         return text
+
+
+class ContextPackingReport(BaseModel):
+    """Which contexts made it into the prompt, indices refer to the original `contexts` / `retrieved_contexts`.
+
+    `max_prompt_tokens` and `estimated_tokens` count the formatted case only, not the instruction or the examples.
+    """
+
+    max_prompt_tokens: int
+    estimated_tokens: int
+    kept: Dict[str, List[int]] = {}
+    truncated: Dict[str, List[int]] = {}
+    dropped: Dict[str, List[int]] = {}
+
+    @property
+    def is_packed(self) -> bool:
+        return any(self.truncated.values()) or any(self.dropped.values())
+
+
+class BudgetedCaseTemplate(SimpleCaseTemplate):
+    """Formats like `SimpleCaseTemplate` but keeps the estimated tokens of the formatted case within `max_prompt_tokens`.
+
+    `max_prompt_tokens` is a per-case budget: the model's instruction and examples are sent on top of it, so set it to
+    the context window minus that prefix. Contexts are considered in order (`keep`, `truncate`) or by lexical overlap
+    with the question (`rank`). `keep` and `rank` skip contexts that do not fit whole, `truncate` cuts the first
+    context that overflows and drops the rest. Kept contexts are always emitted in their original order.
+    """
+
+    max_prompt_tokens: int = 4096
+    strategy: Literal["keep", "truncate", "rank"] = "rank"
+    min_truncated_tokens: int = 32
+    packed_cache_size: ClassVar[int] = 256
+    _packed: Dict[str, Tuple[RageCase, ContextPackingReport]] = PrivateAttr(default_factory=dict)
+
+    def format(self, case: RageCase) -> str:  # noqa: A003
+        return super().format(self.cached_pack(case)[0])
+
+    def cached_pack(self, case: RageCase) -> Tuple[RageCase, ContextPackingReport]:
+        """`pack` memoized per case, so formatting the prompt and reporting on it tokenize the contexts once."""
+        key = case.model_dump_json()
+        packed = self._packed.get(key)
+        if packed is None:
+            packed = self.pack(case)
+            if len(self._packed) >= self.packed_cache_size:
+                self._packed.clear()
+            self._packed[key] = packed
+        return packed
+
+    def pack(self, case: RageCase) -> Tuple[RageCase, ContextPackingReport]:
+        placeholders = {field: [""] for field in context_fields if getattr(case, field)}
+        budget = self.max_prompt_tokens - estimate_tokens(super().format(case.model_copy(update=placeholders)))
+        kept: Dict[ContextRef, str] = {}
+        truncated: List[ContextRef] = []
+        for ref in self._candidates(case):
+            context = getattr(case, ref[0])[ref[1]]
+            # Each context also pays for the newline joining it to the next one.
+            cost = estimate_tokens(context) + 1
+            if cost <= budget:
+                kept[ref] = context
+                budget -= cost
+            elif self.strategy == "truncate":
+                if budget - 1 >= self.min_truncated_tokens:
+                    kept[ref] = truncate_to_tokens(context, budget - 1)
+                    truncated.append(ref)
+                break
+
+        updates: Dict[str, List[str]] = {}
+        report = ContextPackingReport(max_prompt_tokens=self.max_prompt_tokens, estimated_tokens=0)
+        for field in placeholders:
+            num_contexts = len(getattr(case, field))
+            updates[field] = [kept[(field, index)] for index in range(num_contexts) if (field, index) in kept]
+            report.kept[field] = [index for index in range(num_contexts) if (field, index) in kept]
+            report.truncated[field] = [index for name, index in truncated if name == field]
+            report.dropped[field] = [index for index in range(num_contexts) if (field, index) not in kept]
+        packed_case = case.model_copy(update=updates)
+        report.estimated_tokens = estimate_tokens(super().format(packed_case))
+        return packed_case, report
+
+    def _candidates(self, case: RageCase) -> List[ContextRef]:
+        refs = [(field, index) for field in context_fields for index in range(len(getattr(case, field) or []))]
+        if self.strategy != "rank":
+            return refs
+        query = case.question or case.generated_answer or case.answer or ""
+        query_tokens = set(default_tokenizer(query))
+
+        def overlap(ref: ContextRef) -> int:
+            return len(query_tokens.intersection(default_tokenizer(getattr(case, ref[0])[ref[1]])))
+
+        return sorted(refs, key=overlap, reverse=True)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` whose estimated token count is at most `max_tokens`."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def context_packing_report(template: RageCaseTemplate, case: RageCase) -> Optional[ContextPackingReport]:
+    if isinstance(template, BudgetedCaseTemplate):
+        return template.cached_pack(case)[1]
+    return None
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from types import ModuleType
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel
+
+Tokenizer = Callable[[str], Sequence[str]]
+cjk_pattern = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+jieba_cache_env = "RAGE_JIEBA_CACHE"
+
+_jieba: Optional[ModuleType] = None
+
+
+def load_jieba() -> ModuleType:
+    """Import jieba on first use, with its dictionary cache at `$RAGE_JIEBA_CACHE` when that is set."""
+    global _jieba  # noqa: PLW0603
+    if _jieba is None:
+        import jieba
+
+        if cache_file := os.environ.get(jieba_cache_env):
+            jieba.dt.cache_file = os.path.abspath(os.path.expanduser(cache_file))
+        _jieba = jieba
+    return _jieba
+
+
+def configure_jieba_cache(cache_file: str) -> None:
+    """Persist jieba's prefix dictionary to `cache_file` instead of the temp dir, takes effect before it is loaded."""
+    load_jieba().dt.cache_file = os.path.abspath(os.path.expanduser(cache_file))
+
+
+def warm_up_jieba(cache_file: Optional[str] = None) -> None:
+    """Load jieba's prefix dictionary now rather than on the first tokenization.
+
+    The first process builds the dictionary and writes it to the cache file, later processes only load the cache.
+    """
+    if cache_file is not None:
+        configure_jieba_cache(cache_file)
+    load_jieba().initialize()
+
+
+def jieba_tokenize(text: str) -> List[str]:
+    return [token for token in load_jieba().cut(text) if token.strip()]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count, one token per CJK character and one per four characters of anything else."""
+    num_cjk_chars = len(cjk_pattern.findall(text))
+    return num_cjk_chars + math.ceil((len(text) - num_cjk_chars) / 4)
+
+
+def char_tokenize(text: str) -> List[str]:
+    return [char for char in text if not char.isspace()]
+
+
+class TokenCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    num_entries: int = 0
+    num_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachedTokenizer:
+    """LRU cache in front of a tokenizer, keyed by the hash of the text.
+
+    Args:
+        tokenizer: The tokenizer to cache.
+        max_entries: Maximum number of cached texts.
+        max_tokens: Maximum number of cached tokens over all entries, bounds the memory of the cache.
+    """
+
+    def __init__(
+        self, tokenizer: Tokenizer = jieba_tokenize, max_entries: int = 100_000, max_tokens: Optional[int] = 10_000_000
+    ) -> None:
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self.max_tokens = max_tokens
+        self.stats = TokenCacheStats()
+        self._cache: OrderedDict[bytes, Tuple[str, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str) -> Tuple[str, ...]:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            tokens = self._cache.get(key)
+            if tokens is not None:
+                self._cache.move_to_end(key)
+                self.stats.hits += 1
+                return tokens
+            self.stats.misses += 1
+
+        tokens = tuple(self.tokenizer(text))
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = tokens
+                self.stats.num_entries += 1
+                self.stats.num_tokens += len(tokens)
+                self._evict()
+        return tokens
+
+    def _evict(self) -> None:
+        while self._cache and (
+            self.stats.num_entries > self.max_entries
+            or (self.max_tokens is not None and self.stats.num_tokens > self.max_tokens)
+        ):
+            _, tokens = self._cache.popitem(last=False)
+            self.stats.num_entries -= 1
+            self.stats.num_tokens -= len(tokens)
+            self.stats.evictions += 1
+
+    def resize(self, max_entries: Optional[int] = None, max_tokens: Optional[int] = None) -> None:
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_tokens is not None:
+                self.max_tokens = max_tokens
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.stats = TokenCacheStats()
+
+    def __reduce__(self) -> Union[str, Tuple[Any, ...]]:
+        # Pickled without its entries, so metrics can be shipped to worker processes. The process-wide default
+        # tokenizer unpickles as the worker's own default tokenizer.
+        if self is default_tokenizer:
+            return "default_tokenizer"
+        return (CachedTokenizer, (self.tokenizer, self.max_entries, self.max_tokens))
+
+
+default_tokenizer = CachedTokenizer(jieba_tokenize)
+
+
+def configure_token_cache(max_entries: Optional[int] = None, max_tokens: Optional[int] = None) -> None:
+    default_tokenizer.resize(max_entries=max_entries, max_tokens=max_tokens)
+
+
+def token_cache_stats() -> TokenCacheStats:
+    return default_tokenizer.stats.model_copy()
@@ -1,30 +1,38 @@
 from __future__ import annotations
 
-import re
-from typing import Dict, cast
-
-import jieba
-from rouge import Rouge
+from typing import Optional
 
 from rage.results import PrecisionRecallF1Result
+from rage.rouge import RougeL, default_rouge_l
+from rage.segmenter import default_segmenter
+from rage.tokenizer import Tokenizer, default_tokenizer
 
 
 def split_chinese_sentences(text: str) -> list[str]:
-    sentence_delimiters = re.compile(r"[。？！!?；]+")
-    return [s.strip() for s in sentence_delimiters.split(text) if s]
+    """Sentences of mixed Chinese and English text, see `rage.segmenter.SentenceSegmenter`."""
+    return default_segmenter.split(text)
+
 
+def clear_sentence_cache() -> None:
+    default_segmenter.clear_cache()
 
-def calculate_word_overlap(text: str, reference_text: str, split_to_sentence: bool = False) -> PrecisionRecallF1Result:
+
+def calculate_word_overlap(
+    text: str, reference_text: str, split_to_sentence: bool = False, tokenizer: Optional[Tokenizer] = None
+) -> PrecisionRecallF1Result:
     if text.strip() == "" or reference_text.strip() == "":
         return PrecisionRecallF1Result(precision=0.0, recall=0.0, f1=0.0)
 
+    tokenizer = tokenizer or default_tokenizer
     if split_to_sentence:
-        text_tokens = {word for sentence in split_chinese_sentences(text) for word in jieba.cut(sentence)}
-        reference_text_tokens = {word for sentence in split_chinese_sentences(reference_text) for word in jieba.cut(sentence)}
+        text_tokens = {word for sentence in split_chinese_sentences(text) for word in tokenizer(sentence)}
+        reference_text_tokens = {word for sentence in split_chinese_sentences(reference_text) for word in tokenizer(sentence)}
     else:
-        text_tokens = set(jieba.cut(text))
-        reference_text_tokens = set(jieba.cut(reference_text))
+        text_tokens = set(tokenizer(text))
+        reference_text_tokens = set(tokenizer(reference_text))
 
+    if not text_tokens or not reference_text_tokens:
+        return PrecisionRecallF1Result(precision=0.0, recall=0.0, f1=0.0)
     num_overlap = len(text_tokens & reference_text_tokens)
     if num_overlap == 0:
         return PrecisionRecallF1Result(precision=0.0, recall=0.0, f1=0.0)
@@ -35,11 +43,9 @@ def calculate_word_overlap(text: str, reference_text: str, split_to_sentence: bo
     return PrecisionRecallF1Result(precision=precision, recall=recall, f1=f1)
 
 
-def caculate_rouge_l_score(text: str, reference_text: str) -> PrecisionRecallF1Result:
-    rouge = Rouge()
+def caculate_rouge_l_score(text: str, reference_text: str, tokenizer: Optional[Tokenizer] = None) -> PrecisionRecallF1Result:
     if text.strip() == "" or reference_text.strip() == "":
         return PrecisionRecallF1Result(precision=0.0, recall=0.0, f1=0.0)
 
-    scores = rouge.get_scores(text, reference_text)[0]["rouge-l"]
-    scores = cast(Dict[str, float], scores)
-    return PrecisionRecallF1Result(precision=scores["p"], recall=scores["r"], f1=scores["f"])
+    rouge_l = default_rouge_l if tokenizer is None else RougeL(tokenizer)
+    return rouge_l.score(text, reference_text)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, ClassVar, Iterator, List
+
+import pytest
+from generate.chat_completion import (
+    ChatCompletionModel,
+    ChatCompletionOutput,
+    ChatCompletionStreamOutput,
+    ChatModelRegistry,
+    ModelParameters,
+)
+from generate.chat_completion.message import AssistantMessage, Prompt, ensure_messages
+from generate.modifiers.structure import json_schema_title
+from typing_extensions import Self
+
+from rage.models import packed_case_pattern
+
+NEGATIVE_MARKER = "[irrelevant]"
+
+
+def fake_packed_reply(system_content: str, user_content: str) -> dict[str, Any]:
+    schema = json.loads(system_content.split(json_schema_title, 1)[1])
+    item_schema = next(iter(schema["$defs"].values()))
+    outputs = []
+    for case_content in packed_case_pattern.split(user_content)[2::2]:
+        output: dict[str, Any] = {}
+        if "reason" in item_schema["properties"]:
+            output["reason"] = "fake reason"
+        if "score" in item_schema["properties"]:
+            output["score"] = item_schema["properties"]["score"]["maximum"]
+        if "label" in item_schema["properties"]:
+            labels = item_schema["properties"]["label"]["enum"]
+            output["label"] = ("No" if NEGATIVE_MARKER in case_content else "Yes") if "Yes" in labels else labels[0]
+        outputs.append(output)
+    if FakeJudgeChat.drop_packed_output:
+        outputs.pop()
+    return {"outputs": outputs}
+
+
+def fake_structure_reply(system_content: str, user_content: str = "") -> dict[str, Any] | list[dict[str, Any]]:
+    if '"outputs"' in system_content:
+        return fake_packed_reply(system_content, user_content)
+    if '"type": "array"' in system_content:
+        return [{"statement": "fake statement", "reason": "fake reason", "supported": "Yes"}]
+    reply: dict[str, Any] = {}
+    if '"reason"' in system_content:
+        reply["reason"] = "fake reason"
+    if (match := re.search(r"Le\(le=([\d.]+)\)", system_content)) is not None:
+        reply["score"] = float(match.group(1))
+    if (match := re.search(r"Literal\[(.*?)\]", system_content)) is not None:
+        labels = [label.strip().strip('"') for label in match.group(1).split(",")]
+        if "Yes" in labels:
+            reply["label"] = "No" if NEGATIVE_MARKER in user_content else "Yes"
+        else:
+            reply["label"] = labels[0]
+    return reply
+
+
+class FakeJudgeChat(ChatCompletionModel):
+    model_type = "fake"
+    calls: ClassVar[List[str]] = []
+    latency: ClassVar[float] = 0.0
+    in_flight: ClassVar[int] = 0
+    max_in_flight: ClassVar[int] = 0
+    drop_packed_output: ClassVar[bool] = False
+    fail_packed_request: ClassVar[bool] = False
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, name: str = "judge") -> None:
+        self._name = name
+        self.parameters = ModelParameters()
+
+    def _reply(self, prompt: Prompt, mode: str) -> ChatCompletionOutput:
+        messages = ensure_messages(prompt)
+        self.calls.append(mode)
+        if self.fail_packed_request and '"outputs"' in str(messages[0].content):
+            raise ConnectionError("Fake transport error")
+        content = json.dumps(fake_structure_reply(str(messages[0].content), str(messages[-1].content)))
+        return ChatCompletionOutput(model_info=self.model_info, message=AssistantMessage(content=content))
+
+    @classmethod
+    def _enter(cls) -> None:
+        with cls._lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+
+    @classmethod
+    def _exit(cls) -> None:
+        with cls._lock:
+            cls.in_flight -= 1
+
+    def generate(self, prompt: Prompt, **kwargs: Any) -> ChatCompletionOutput:
+        self._enter()
+        time.sleep(self.latency)
+        self._exit()
+        return self._reply(prompt, "sync")
+
+    async def async_generate(self, prompt: Prompt, **kwargs: Any) -> ChatCompletionOutput:
+        self._enter()
+        await asyncio.sleep(self.latency)
+        self._exit()
+        return self._reply(prompt, "async")
+
+    def stream_generate(self, prompt: Prompt, **kwargs: Any) -> Iterator[ChatCompletionStreamOutput]:
+        raise NotImplementedError
+
+    def async_stream_generate(self, prompt: Prompt, **kwargs: Any) -> AsyncIterator[ChatCompletionStreamOutput]:
+        raise NotImplementedError
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @classmethod
+    def from_name(cls, name: str) -> Self:
+        return cls(name)
+
+
+ChatModelRegistry[FakeJudgeChat.model_type] = (FakeJudgeChat, ModelParameters)
+
+
+@pytest.fixture()
+def fake_judge() -> type[FakeJudgeChat]:
+    FakeJudgeChat.calls.clear()
+    FakeJudgeChat.latency = 0.0
+    FakeJudgeChat.max_in_flight = 0
+    FakeJudgeChat.drop_packed_output = False
+    FakeJudgeChat.fail_packed_request = False
+    return FakeJudgeChat
+
+
+@pytest.fixture()
+def negative_marker() -> str:
+    """Cases containing this marker are labeled "No" by the fake judge."""
+    return NEGATIVE_MARKER
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from rage.case import RageCase
+from rage.metrics import (
+    GenerateBasedAnswerCorrectness,
+    GenerateBasedAnswerFaithfulness,
+    GenerateBasedAnswerRelevance,
+    GenerateBasedContextCoverage,
+    GenerateBasedContextPrecision,
+)
+
+case = RageCase(
+    question="What is the capital of France?",
+    answer="Paris is the capital of France.",
+    retrieved_contexts=[
+        "Paris is the capital of France and also the largest city in the country.",
+        "Lyon is a major city in France.",
+    ],
+    generated_answer="Paris",
+)
+
+
+def test_acalculate_uses_async_generate(fake_judge):
+    metrics = [
+        GenerateBasedAnswerCorrectness.from_parameters(model_id="fake/judge"),
+        GenerateBasedAnswerFaithfulness.from_parameters(model_id="fake/judge"),
+        GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge"),
+        GenerateBasedContextCoverage.from_parameters(model_id="fake/judge"),
+        GenerateBasedContextPrecision.from_parameters(model_id="fake/judge"),
+    ]
+    for metric in metrics:
+        assert asyncio.run(metric.acalculate(case)) == metric.calculate(case)
+    num_calls = len(metrics) - 1 + len(case.retrieved_contexts)
+    assert fake_judge.calls.count("async") == fake_judge.calls.count("sync") == num_calls
+
+
+def test_acalculate_many_keeps_order_and_isolates_errors(fake_judge):
+    metric = GenerateBasedContextPrecision.from_parameters(model_id="fake/judge")
+    cases = [
+        case,
+        RageCase(question="Who?", retrieved_contexts=["Someone."] * 3),
+        RageCase.model_construct(question="Who?", retrieved_contexts=None),
+    ]
+    batch_result = asyncio.run(metric.acalculate_many(cases, max_concurrency=2))
+    assert [len(result.precision_at_k) for result in batch_result.results[:2]] == [2, 3]
+    assert batch_result.num_errors == 1
+
+
+@pytest.mark.parametrize("pack_size", [1, 2])
+def test_max_concurrency_below_one_is_rejected(pack_size):
+    metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", pack_size=pack_size)
+    with pytest.raises(ValueError, match="max_concurrency must be at least 1"):
+        metric.calculate_batch([case], max_concurrency=0)
+    with pytest.raises(ValueError, match="max_concurrency must be at least 1"):
+        asyncio.run(metric.acalculate_many([case], max_concurrency=0))
+
+
+def test_context_precision_fans_out_per_context(fake_judge, negative_marker):
+    fake_judge.latency = 0.05
+    metric = GenerateBasedContextPrecision.from_parameters(model_id="fake/judge", max_context_concurrency=3)
+    retrieved_contexts = [f"Context {index} {negative_marker if index % 2 else ''}" for index in range(6)]
+    context_case = RageCase(question="What is the capital of France?", retrieved_contexts=retrieved_contexts)
+
+    result = metric.calculate(context_case)
+    assert [verification.label for verification in result.extra["verifications"]] == ["Yes", "No"] * 3
+    assert result.precision_at_k == [1, 1 / 2, 2 / 3, 2 / 4, 3 / 5, 3 / 6]
+    assert fake_judge.max_in_flight == metric.max_context_concurrency
+
+    fake_judge.max_in_flight = 0
+    assert asyncio.run(metric.acalculate(context_case)) == result
+    assert fake_judge.max_in_flight == metric.max_context_concurrency
@@ -0,0 +1,17 @@
+from benchmarks.bench import compare, run_benchmarks
+from benchmarks.corpus import generate_corpus
+
+
+def test_corpus_is_seeded():
+    assert generate_corpus("small", "zh", seed=1) == generate_corpus("small", "zh", seed=1)
+    assert generate_corpus("small", "en", seed=1) != generate_corpus("small", "en", seed=2)
+
+
+def test_compare_flags_regressions():
+    report = run_benchmarks(["context_prf1_exact"], ["small"], ["zh"], repeat=1)
+    assert report.results[0].ops_per_sec > 0
+    assert not compare(report, report)[0].is_regression
+
+    faster_baseline = report.model_copy(deep=True)
+    faster_baseline.results[0].ops_per_sec *= 2
+    assert compare(report, faster_baseline)[0].is_regression
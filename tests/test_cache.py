@@ -0,0 +1,57 @@
+import pytest
+
+from rage import cache as rage_cache
+from rage.cache import DirectoryResponseCache, SQLiteResponseCache
+from rage.case import RageCase
+from rage.metrics import GenerateBasedAnswerCorrectness
+
+case = RageCase(
+    question="Who wrote 'Romeo and Juliet'?",
+    answer="Shakespeare wrote 'Romeo and Juliet'",
+    generated_answer="Shakespeare",
+)
+
+
+@pytest.fixture(params=["sqlite", "directory"])
+def cache_factory(request, tmp_path):
+    def _create_cache(**kwargs):
+        if request.param == "sqlite":
+            return SQLiteResponseCache(tmp_path / "cache.sqlite", **kwargs)
+        return DirectoryResponseCache(tmp_path / "cache", **kwargs)
+
+    return _create_cache
+
+
+def test_rage_model_consults_cache(fake_judge, cache_factory):
+    cache = cache_factory()
+    metric = GenerateBasedAnswerCorrectness.from_parameters(model_id="fake/judge", cache=cache)
+    first_result = metric.calculate(case)
+    second_result = metric.calculate(case)
+    assert first_result == second_result
+    assert len(fake_judge.calls) == 1
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 1)
+
+    metric.model.temperature = 0.5
+    metric.calculate(case)
+    assert len(fake_judge.calls) == len(cache) == 2  # noqa: PLR2004
+
+
+def test_cache_eviction(cache_factory, monkeypatch):
+    cache = cache_factory(max_entries=2, ttl=60)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    assert len(cache) == 2  # noqa: PLR2004
+    assert cache.get("a") is None
+    assert cache.stats.evictions == 1
+
+    now = rage_cache.time.time()
+    monkeypatch.setattr(rage_cache.time, "time", lambda: now + 120)
+    assert cache.get("c") is None
+
+
+def test_read_only_cache(cache_factory):
+    cache_factory().set("key", "value")
+    read_only_cache = cache_factory(read_only=True)
+    read_only_cache.set("other", "value")
+    assert read_only_cache.get("key") == "value"
+    assert read_only_cache.get("other") is None
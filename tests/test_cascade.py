@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from rage.case import RageCase
+from rage.metrics import CascadeMetric, GenerateBasedAnswerCorrectness, RougeLAnswerCorrectness
+from rage.results import ErrorResult
+
+cases = [
+    RageCase(question="Capital of France?", answer="Paris is the capital", generated_answer="Paris is the capital"),
+    RageCase(question="Capital of France?", answer="Paris is the capital", generated_answer="I do not know"),
+    RageCase(question="Capital of France?", answer="Paris is the capital", generated_answer="The capital is Paris"),
+    RageCase.model_construct(question="Capital of France?", answer=None, generated_answer="Paris"),
+]
+
+
+def cascade_metric(**kwargs) -> CascadeMetric:
+    judge = GenerateBasedAnswerCorrectness.from_parameters(model_id="fake/judge", cot=True)
+    return CascadeMetric(RougeLAnswerCorrectness(), judge, "correctness", **kwargs)
+
+
+def test_only_uncertain_cases_reach_the_judge(fake_judge):
+    batch_result = cascade_metric().calculate_batch(cases)
+    decided, rejected, escalated, failed = batch_result.results
+    assert (decided.correctness, decided.extra["cascade"]) == (1.0, {"tier": "screen", "screen_score": 1.0, "band": "accept"})
+    assert (rejected.correctness, rejected.extra["cascade"]["band"]) == (0.0, "reject")
+    assert escalated.extra["cascade"]["tier"] == "judge"
+    assert escalated.extra["reason"] == "fake reason"
+    assert isinstance(failed, ErrorResult)
+    assert fake_judge.calls == ["sync"]
+
+
+def test_single_and_async_paths_agree(fake_judge):
+    metric = cascade_metric()
+    results = [metric.safe_calculate(case) for case in cases]
+    assert asyncio.run(metric.acalculate_many(cases)).results == results
+    assert fake_judge.calls.count("async") == fake_judge.calls.count("sync") == 1
+
+
+def test_raw_screen_scores_can_be_kept(fake_judge):
+    metric = cascade_metric(high=0.2, decided_scores=None)
+    result = metric.calculate(cases[2])
+    assert result == RougeLAnswerCorrectness().calculate(cases[2]).model_copy(update={"extra": result.extra})
+    assert result.extra["cascade"]["band"] == "accept"
+    assert fake_judge.calls == []
+
+
+def test_band_must_not_be_empty():
+    with pytest.raises(ValueError, match="low < high"):
+        cascade_metric(low=0.5, high=0.5)
@@ -0,0 +1,94 @@
+from rage.case import RageCase
+from rage.checkpoint import Checkpoint, IncrementalCheckpoint, case_id
+from rage.metrics import ContextPrecisionRecallF1, GenerateBasedContextPrecision, RougeLAnswerCorrectness
+from rage.results import CorrectnessResult, ErrorResult, PrecisionRecallF1Result
+from rage.suite import EvaluationSuite
+
+
+class CountingRougeL(RougeLAnswerCorrectness):
+    num_calls = 0
+
+    def calculate(self, case: RageCase) -> CorrectnessResult:
+        CountingRougeL.num_calls += 1
+        return super().calculate(case)
+
+
+cases = [
+    RageCase(answer="Paris", generated_answer="Paris", contexts=["Paris"], retrieved_contexts=["Paris"], extra={"id": 1}),
+    RageCase(answer="Lyon", generated_answer="Paris", contexts=["Lyon"]),
+]
+
+
+def test_resume_skips_completed_and_retries_failed(tmp_path):
+    suite = EvaluationSuite({"rouge_l": CountingRougeL(), "context_prf": ContextPrecisionRecallF1()})
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    with Checkpoint(checkpoint_path) as checkpoint:
+        first_rows = list(suite.iter_run(cases, checkpoint=checkpoint))
+    assert [row.case_id for row in first_rows] == ["1", case_id(cases[1])]
+    assert isinstance(first_rows[1].results["context_prf"], ErrorResult)
+    assert CountingRougeL.num_calls == len(cases)
+
+    with open(checkpoint_path, "a") as f:
+        f.write('{"case_id": "torn')
+    with Checkpoint(checkpoint_path) as checkpoint:
+        assert checkpoint.failed_keys() == {(case_id(cases[1]), "context_prf")}
+        resumed_rows = list(suite.iter_run(cases, checkpoint=checkpoint))
+    assert CountingRougeL.num_calls == len(cases)
+    assert [row.results for row in resumed_rows] == [row.results for row in first_rows]
+
+
+class CountingContextPRF1(ContextPrecisionRecallF1):
+    num_calls = 0
+
+    def calculate(self, case: RageCase) -> PrecisionRecallF1Result:
+        CountingContextPRF1.num_calls += 1
+        return super().calculate(case)
+
+
+def test_incremental_run_recomputes_only_changed_inputs(tmp_path):
+    CountingRougeL.num_calls = CountingContextPRF1.num_calls = 0
+    checkpoint_path = tmp_path / "incremental.jsonl"
+    complete_cases = [case.model_copy(update={"retrieved_contexts": ["Lyon"]}) if i else case for i, case in enumerate(cases)]
+    suite = EvaluationSuite({"rouge_l": CountingRougeL(), "context_prf": CountingContextPRF1()})
+    with IncrementalCheckpoint(checkpoint_path) as checkpoint:
+        list(suite.iter_run(complete_cases, checkpoint=checkpoint))
+    assert (CountingRougeL.num_calls, CountingContextPRF1.num_calls) == (2, 2)
+
+    edited_cases = [complete_cases[0], complete_cases[1].model_copy(update={"generated_answer": "Lyon", "extra": {"id": 2}})]
+    with IncrementalCheckpoint(checkpoint_path) as checkpoint:
+        rows = list(suite.iter_run(edited_cases, checkpoint=checkpoint))
+        assert (checkpoint.num_reused, checkpoint.num_recorded) == (3, 1)
+    assert (CountingRougeL.num_calls, CountingContextPRF1.num_calls) == (3, 2)
+    assert rows[1].results["rouge_l"] == CorrectnessResult(correctness=1.0)
+
+    reconfigured = EvaluationSuite({"rouge_l": CountingRougeL(), "context_prf": CountingContextPRF1(match_function="exact")})
+    with IncrementalCheckpoint(checkpoint_path) as checkpoint:
+        list(reconfigured.iter_run(edited_cases, checkpoint=checkpoint))
+    assert (CountingRougeL.num_calls, CountingContextPRF1.num_calls) == (3, 4)
+
+
+def test_fingerprint_follows_configuration():
+    assert ContextPrecisionRecallF1().fingerprint() == ContextPrecisionRecallF1().fingerprint()
+    assert ContextPrecisionRecallF1().fingerprint() != ContextPrecisionRecallF1(match_function="exact").fingerprint()
+    assert ContextPrecisionRecallF1().fingerprint() != CountingContextPRF1().fingerprint()
+
+
+def test_fingerprint_ignores_execution_knobs():
+    fingerprint = GenerateBasedContextPrecision.from_parameters().fingerprint()
+    assert GenerateBasedContextPrecision.from_parameters(max_context_concurrency=16).fingerprint() == fingerprint
+    assert GenerateBasedContextPrecision.from_parameters(pack_size=8, timeout=10).fingerprint() == fingerprint
+    assert GenerateBasedContextPrecision.from_parameters(temperature=0.5).fingerprint() != fingerprint
+
+
+def test_torn_tail_is_truncated_before_appending(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    with Checkpoint(checkpoint_path) as checkpoint:
+        checkpoint.record("a", "rouge_l", CorrectnessResult(correctness=1))
+    with open(checkpoint_path, "a") as f:
+        f.write('{"case_id": "torn')
+    with Checkpoint(checkpoint_path) as checkpoint:
+        checkpoint.record("b", "rouge_l", CorrectnessResult(correctness=0))
+    for _ in range(2):
+        with Checkpoint(checkpoint_path) as checkpoint:
+            assert checkpoint.completed_keys() == {("a", "rouge_l"), ("b", "rouge_l")}
+            assert checkpoint.get("b", "rouge_l") == CorrectnessResult(correctness=0)
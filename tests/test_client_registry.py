@@ -0,0 +1,27 @@
+from rage.client_registry import ChatClientRegistry
+from rage.metrics import GenerateBasedAnswerCorrectness, GenerateBasedAnswerRelevance
+
+
+def test_registry_shares_http_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    registry = ChatClientRegistry()
+    gpt35 = registry.get("openai/gpt-3.5-turbo", timeout=60, temperature=0)
+    assert registry.get("openai/gpt-3.5-turbo", timeout=60, temperature=0) is gpt35
+    gpt4 = registry.get("openai/gpt-4", timeout=60, temperature=0)
+    assert gpt4.http_client is gpt35.http_client  # type: ignore
+    assert registry.get("openai/gpt-4", timeout=10, temperature=0).http_client is not gpt35.http_client  # type: ignore
+
+    registry.configure(max_connections=8, keepalive_expiry=30)
+    assert gpt35.http_client.limits.max_connections == 8  # type: ignore  # noqa: PLR2004
+    stats = registry.stats()
+    assert (stats.num_chat_models, stats.num_http_clients, stats.model_hits, stats.model_misses) == (3, 2, 1, 3)
+    assert stats.open_connections == 0
+
+
+def test_metrics_reuse_chat_models(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    correctness = GenerateBasedAnswerCorrectness.from_parameters(model_id="openai/gpt-3.5-turbo")
+    relevance = GenerateBasedAnswerRelevance.from_parameters(model_id="openai/gpt-3.5-turbo")
+    assert correctness.model.structure_model.model is relevance.model.structure_model.model
+    relevance.model.temperature = 0.5
+    assert correctness.model.structure_model.model is not relevance.model.structure_model.model
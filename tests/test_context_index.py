@@ -0,0 +1,33 @@
+import random
+
+from rage.case import RageCase
+from rage.context_index import ContextIndex
+from rage.metrics import RougeLAnswerFaithfulness, WorldOverlapAnswerFaithfulness
+from rage.rouge import lcs_length
+from rage.tokenizer import char_tokenize
+
+
+def test_lcs_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(200):
+        contexts = ["".join(rng.choices("abcde", k=rng.randint(0, 12))) for _ in range(rng.randint(1, 3))]
+        sentence = rng.choices("abcdef", k=rng.randint(0, 10))
+        index = ContextIndex(contexts, tokenizer=char_tokenize)
+        lcs, best_context = index.lcs(sentence)
+        assert lcs == lcs_length(sentence, char_tokenize("".join(contexts)))
+        assert (best_context is None) == (lcs == 0)
+
+
+def test_scores_attribute_the_best_context():
+    index = ContextIndex(["东京在日本", "巴黎是法国的首都"], tokenizer=char_tokenize)
+    assert index.word_overlap(char_tokenize("巴黎在法国")) == (1.0, 1)
+    assert index.lcs(char_tokenize("巴黎法国首都")) == (6, 1)
+    assert index.word_overlap([]) == (0.0, None)
+
+
+def test_faithfulness_reports_supporting_context():
+    case = RageCase(answer="巴黎是法国的首都。东京在日本。", retrieved_contexts=["东京在日本", "巴黎是法国的首都"])
+    for metric in (RougeLAnswerFaithfulness(), WorldOverlapAnswerFaithfulness()):
+        result = metric.calculate(case)
+        assert result.faithfulness == 1.0  # noqa: PLR2004
+        assert result.extra["answer_sentence_best_context"] == [1, 0]
@@ -0,0 +1,49 @@
+import csv
+import json
+
+from rage.dataset import JsonlResultWriter, evaluate_file, evaluate_stream, read_cases
+from rage.metrics import RougeLAnswerCorrectness, WorldOverlapAnswerCorrectness
+from rage.suite import EvaluationSuite
+
+records = [
+    {"id": index, "answer": "Paris is the capital of France.", "generated_answer": f"Paris {index}", "contexts": ["Paris"]}
+    for index in range(5)
+]
+
+
+def test_read_jsonl_and_csv(tmp_path):
+    jsonl_path = tmp_path / "cases.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    csv_path = tmp_path / "cases.csv"
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows({**record, "contexts": json.dumps(record["contexts"])} for record in records)
+
+    jsonl_cases = list(read_cases(jsonl_path))
+    csv_cases = list(read_cases(csv_path))
+    assert [case.extra["id"] for case in jsonl_cases] == list(range(5))
+    assert [case.extra["id"] for case in csv_cases] == [str(index) for index in range(5)]
+    assert [case.contexts for case in csv_cases] == [case.contexts for case in jsonl_cases] == [["Paris"]] * 5
+
+
+def test_evaluate_stream_writes_rows_incrementally(tmp_path):
+    input_path = tmp_path / "cases.jsonl"
+    input_path.write_text("\n".join(json.dumps(record) for record in records))
+    output_path = tmp_path / "results.jsonl"
+    suite = EvaluationSuite([RougeLAnswerCorrectness(), WorldOverlapAnswerCorrectness()], max_concurrency=2)
+
+    stream = evaluate_stream(read_cases(input_path), suite, output_path, max_pending=2)
+    first_row = next(stream)
+    assert first_row.case_index == 0
+    assert len(output_path.read_text().splitlines()) == 1
+    stream.close()
+
+    with JsonlResultWriter(output_path, append=True) as writer:
+        assert len(list(evaluate_stream(read_cases(input_path), suite, writer=writer))) == len(records)
+    assert len(output_path.read_text().splitlines()) == 1 + len(records)
+
+    assert evaluate_file(input_path, output_path, suite) == len(records)
+    output_records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [record["case_index"] for record in output_records] == list(range(5))
+    assert output_records[0]["results"]["RougeLAnswerCorrectness"]["type"] == "CorrectnessResult"
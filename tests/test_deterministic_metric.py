@@ -1,3 +1,5 @@
+from functools import partial
+
 from rage.case import RageCase
 from rage.metrics import (
     ContextPrecisionRecallF1,
@@ -6,6 +8,15 @@ from rage.metrics import (
     WorldOverlapAnswerCorrectness,
     WorldOverlapAnswerFaithfulness,
 )
+from rage.metrics.deterministic.context_precision_recall_f1 import (
+    ExactMatcher,
+    FunctionMatcher,
+    RougeMatcher,
+    exact_match,
+    rouge_match,
+)
+from rage.results import ErrorResult, PrecisionRecallF1Result
+from rage.tokenizer import CachedTokenizer, char_tokenize
 
 
 def test_context_precision_recall_f1():
@@ -61,3 +72,61 @@ def test_rouge_l_answer_faithfulness():
     metric = RougeLAnswerFaithfulness()
     result = metric.calculate(case)
     assert isinstance(result.faithfulness, float)
+
+
+def test_calculate_batch_keeps_order_and_isolates_errors():
+    cases = [
+        RageCase(answer="Paris is the capital of France.", generated_answer="Paris is the capital of France."),
+        RageCase(answer="Paris is the capital of France.", generated_answer="Lyon"),
+    ]
+    metric = WorldOverlapAnswerCorrectness()
+    batch_result = metric.calculate_batch(cases, max_concurrency=2)
+    assert [result.correctness for result in batch_result.results] == [metric.calculate(case).correctness for case in cases]
+    assert batch_result.num_errors == 0
+    assert batch_result.throughput > 0
+
+    failing_cases = [RageCase(contexts=["Paris"], retrieved_contexts=["Paris"]), RageCase(contexts=["Paris"])]
+    batch_result = ContextPrecisionRecallF1().calculate_batch(failing_cases, max_concurrency=2)
+    assert isinstance(batch_result.results[0], PrecisionRecallF1Result)
+    assert isinstance(batch_result.results[1], ErrorResult)
+    assert batch_result.num_errors == 1
+
+
+def test_cached_tokenizer_is_bounded_and_counts_hits():
+    tokenizer = CachedTokenizer(char_tokenize, max_entries=2)
+    assert tokenizer("a b") == ("a", "b")
+    assert tokenizer("a b") == ("a", "b")
+    tokenizer("c")
+    tokenizer("d")
+    assert (tokenizer.stats.hits, tokenizer.stats.misses) == (1, 3)
+    assert tokenizer.stats.num_entries == tokenizer.stats.evictions + 1
+
+    metric = WorldOverlapAnswerCorrectness(tokenizer=tokenizer)
+    case = RageCase(answer="abc", generated_answer="abd")
+    assert metric.calculate(case).correctness == metric.calculate(case).correctness
+    assert tokenizer.stats.hits == 3  # noqa: PLR2004
+
+
+def test_context_matchers_agree_with_pairwise_match_functions():
+    retrieved_contexts = [
+        "Paris is the capital of France",
+        "Lyon is a major city in France",
+        "Paris is the capital of France",
+        "Berlin is the capital of Germany",
+    ]
+    contexts = ["Paris is the capital of France", "Lyon is a city in France", "Paris is the capital of France"]
+    for threshold in [0.0, 0.5, 0.8, 1.0]:
+        pairwise = FunctionMatcher(partial(rouge_match, threshold=threshold))
+        indexed = RougeMatcher(threshold=threshold)
+        # "Tokyo" shares no token with any retrieved context, it only matches at threshold 0.
+        assert indexed.match(retrieved_contexts, [*contexts, "Tokyo"]) == pairwise.match(
+            retrieved_contexts, [*contexts, "Tokyo"]
+        )
+    assert ExactMatcher().match(retrieved_contexts, contexts) == FunctionMatcher(exact_match).match(
+        retrieved_contexts, contexts
+    )
+
+    result = ContextPrecisionRecallF1(match_function="exact").calculate(
+        RageCase(retrieved_contexts=retrieved_contexts, contexts=contexts)
+    )
+    assert (result.precision, result.recall) == (0.5, 0.5)
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from rage.cache import DirectoryResponseCache
+from rage.case import RageCase
+from rage.instrumentation import current_collector, instrument
+from rage.metrics import GenerateBasedAnswerRelevance, GenerateBasedContextPrecision, RougeLAnswerCorrectness
+from rage.suite import EvaluationSuite
+
+case = RageCase(
+    question="法国的首都是哪里？",
+    answer="巴黎",
+    retrieved_contexts=["法国的首都是巴黎。", "[irrelevant] 天气晴朗。"],
+    generated_answer="巴黎",
+)
+
+
+def test_suite_results_carry_call_summaries(fake_judge, tmp_path):
+    relevance = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", cache=DirectoryResponseCache(tmp_path))
+    precision = GenerateBasedContextPrecision.from_parameters(model_id="fake/judge")
+    suite = EvaluationSuite([relevance, precision, RougeLAnswerCorrectness()], max_concurrency=1)
+    with instrument() as collector:
+        rows = suite.evaluate([case, case])
+        asyncio.run(relevance.safe_acalculate(case))
+    assert current_collector() is None
+
+    summary = rows[0].results["GenerateBasedContextPrecision"].extra["instrumentation"]
+    assert summary["num_calls"] == len(case.retrieved_contexts)
+    assert summary["prompt_tokens"] > 0
+    assert rows[1].results["GenerateBasedAnswerRelevance"].extra["instrumentation"]["num_cache_hits"] == 1
+    assert rows[0].results["RougeLAnswerCorrectness"].extra["instrumentation"]["num_calls"] == 0
+
+    report = collector.report()
+    assert report.metrics["GenerateBasedAnswerRelevance"].num_calls == 3  # noqa: PLR2004
+    judge = report.models["fake/judge"]
+    assert judge.num_calls == 7  # noqa: PLR2004
+    assert judge.num_cache_hits == 2  # noqa: PLR2004
+    assert set(judge.latency_quantiles) == {"0.5", "0.9", "0.99"}
+    assert json.loads(collector.to_json())["models"]["fake/judge"]["num_calls"] == judge.num_calls
+    prometheus = collector.to_prometheus()
+    assert 'rage_llm_calls_total{model="fake/judge"} 7' in prometheus
+    assert 'rage_llm_latency_seconds{model="fake/judge",quantile="0.5"}' in prometheus
+
+
+def test_results_are_unchanged_without_instrumentation(fake_judge):
+    relevance = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge")
+    assert "instrumentation" not in relevance.safe_calculate(case).extra
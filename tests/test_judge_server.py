@@ -0,0 +1,53 @@
+import httpx
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.judge_server import FakeJudgeServer, JudgeServerConfig
+from benchmarks.load_test import run_load
+from rage.client_registry import default_registry
+from rage.metrics import GenerateBasedAnswerRelevance, GenerateBasedContextCoverage
+from rage.results import ErrorResult
+from rage.scheduler import RateLimitScheduler
+
+
+@pytest.fixture()
+def judge_server(monkeypatch):
+    config = JudgeServerConfig(latency_distribution="constant", latency_seconds=0.01)
+    with FakeJudgeServer(config) as server:
+        monkeypatch.setenv("OPENAI_API_BASE", server.base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "fake")
+        default_registry.clear()
+        yield server
+    default_registry.clear()
+
+
+def test_load_harness_against_fake_judge(judge_server):
+    cases = generate_corpus("small")[:4]
+    result = run_load(judge_server, cases, concurrency=4, metric_names=["relevance", "precision", "coverage"])
+    assert result.num_cases == len(cases)
+    assert result.num_errors == 0
+    assert result.num_llm_calls == judge_server.stats.num_requests
+    assert set(result.case_latency) == {"p50", "p95", "p99"}
+
+
+def test_rate_limited_requests_are_retried(judge_server):
+    judge_server.config.rate_limit_rate = 0.5
+    judge_server.config.retry_after_seconds = 0.01
+    scheduler = RateLimitScheduler(max_retries=20)
+    metric = GenerateBasedContextCoverage.from_parameters(model_id="openai/gpt-3.5-turbo", scheduler=scheduler)
+    judge_server.register_model(metric.model)
+    results = metric.calculate_batch(generate_corpus("small")[:4], max_concurrency=2).results
+    assert not any(isinstance(result, ErrorResult) for result in results)
+    assert scheduler.stats.num_rate_limited == judge_server.stats.num_rate_limited > 0
+
+
+def test_replies_follow_the_registered_schema(judge_server):
+    relevance = GenerateBasedAnswerRelevance.from_parameters(model_id="openai/gpt-3.5-turbo", normalize=False)
+    case = generate_corpus("small")[0]
+    with pytest.raises(httpx.HTTPStatusError, match="400"):
+        relevance.calculate(case)
+
+    judge_server.register_model(relevance.model)
+    score = relevance.calculate(case).relevance
+    assert relevance.model.score_range[0] <= score <= relevance.model.score_range[1]
+    assert score != round(score)
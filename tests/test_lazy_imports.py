@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import rage.metrics
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+
+def test_metrics_import_heavy_dependencies_lazily():
+    code = "import sys, rage.metrics; print(sorted(m for m in ('generate', 'jieba', 'numpy') if m in sys.modules))"
+    assert run_python(code).strip() == "[]"
+
+
+def test_all_metrics_resolve():
+    assert all(getattr(rage.metrics, name) for name in rage.metrics.__all__)
+    assert set(rage.metrics.__all__) <= set(dir(rage.metrics))
+
+
+def test_warm_up_persists_jieba_cache(tmp_path):
+    cache_file = tmp_path / "jieba.cache"
+    code = f"from rage.tokenizer import warm_up_jieba; warm_up_jieba({str(cache_file)!r})"
+    run_python(code)
+    assert cache_file.stat().st_size > 0
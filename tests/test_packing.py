@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from rage.cache import SQLiteResponseCache
+from rage.case import RageCase
+from rage.metrics import GenerateBasedAnswerFaithfulness, GenerateBasedAnswerRelevance, GenerateBasedContextPrecision
+
+
+@pytest.fixture()
+def cases(negative_marker):
+    return [
+        RageCase(question=f"Question {index}", generated_answer=f"Answer {index} {negative_marker if index % 2 else ''}")
+        for index in range(5)
+    ]
+
+
+def test_packed_batch_matches_single_case_batch(fake_judge, cases):
+    single_results = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge").calculate_batch(cases).results
+    num_single_calls = len(fake_judge.calls)
+    fake_judge.calls.clear()
+
+    metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", pack_size=2, cot=True)
+    packed_results = metric.calculate_batch(cases, max_concurrency=1).results
+    assert [result.relevance for result in packed_results] == [result.relevance for result in single_results] == [1.0] * 5
+    assert all(result.extra["reason"] == "fake reason" for result in packed_results)
+    assert (num_single_calls, len(fake_judge.calls)) == (5, 3)
+
+
+def test_packed_outputs_keep_case_order(fake_judge, cases):
+    metric = GenerateBasedAnswerFaithfulness.from_parameters(model_id="fake/judge", pack_size=3)
+    faithfulness_cases = [case.model_copy(update={"retrieved_contexts": ["Context"]}) for case in cases]
+    batch_result = asyncio.run(
+        metric.acalculate_many([*faithfulness_cases, RageCase.model_construct(question="Who?", retrieved_contexts=None)])
+    )
+    assert [result.faithfulness for result in batch_result.results[:5]] == [1.0, 0.0, 1.0, 0.0, 1.0]
+    assert batch_result.num_errors == 1
+    assert fake_judge.calls == ["async", "async"]
+
+
+def test_failed_pack_falls_back_to_single_cases(fake_judge, cases):
+    fake_judge.drop_packed_output = True
+    metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", pack_size=5)
+    batch_result = metric.calculate_batch(cases)
+    assert [result.relevance for result in batch_result.results] == [1.0] * 5
+    assert len(fake_judge.calls) == 1 + len(cases)
+
+
+def test_failed_pack_request_falls_back_to_concurrent_single_cases(fake_judge, cases):
+    fake_judge.fail_packed_request = True
+    fake_judge.latency = 0.05
+    metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", pack_size=5)
+    batch_result = metric.calculate_batch(cases)
+    assert [result.relevance for result in batch_result.results] == [1.0] * 5
+    assert (len(fake_judge.calls), fake_judge.max_in_flight) == (1 + len(cases), len(cases))
+
+    fake_judge.max_in_flight = 0
+    assert asyncio.run(metric.acalculate_many(cases)).results == batch_result.results
+    assert fake_judge.max_in_flight == len(cases)
+
+
+def test_packed_outputs_are_cached_per_case(fake_judge, cases, tmp_path):
+    cache = SQLiteResponseCache(tmp_path / "cache.sqlite")
+    packed_metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", pack_size=5, cache=cache)
+    packed_results = packed_metric.calculate_batch(cases).results
+    single_metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", cache=cache)
+    assert single_metric.calculate(cases[3]) == packed_results[3]
+    assert len(fake_judge.calls) == 1
+
+
+def test_context_precision_packs_contexts(fake_judge, negative_marker):
+    fake_judge.latency = 0.05
+    metric = GenerateBasedContextPrecision.from_parameters(model_id="fake/judge", pack_size=2, max_context_concurrency=2)
+    retrieved_contexts = [f"Context {index} {negative_marker if index % 2 else ''}" for index in range(6)]
+    context_case = RageCase(question="What is the capital of France?", retrieved_contexts=retrieved_contexts)
+    result = metric.calculate(context_case)
+    assert result.precision_at_k == [1, 1 / 2, 2 / 3, 2 / 4, 3 / 5, 3 / 6]
+    assert (fake_judge.calls, fake_judge.max_in_flight) == (["sync"] * 3, 2)
+
+    fake_judge.max_in_flight = 0
+    assert asyncio.run(metric.acalculate(context_case)) == result
+    assert fake_judge.max_in_flight == metric.max_context_concurrency
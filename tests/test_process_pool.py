@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from rage.case import RageCase
+from rage.metrics import ContextPrecisionRecallF1, GenerateBasedAnswerRelevance, RougeLAnswerFaithfulness
+from rage.results import ErrorResult
+
+
+@pytest.mark.parametrize(
+    "metric",
+    [ContextPrecisionRecallF1.from_parameters(match_strategy="rouge"), RougeLAnswerFaithfulness()],
+    ids=["context_prf1", "rouge"],
+)
+def test_process_results_match_thread_results(metric):
+    cases = generate_corpus("small")
+    process_results = metric.calculate_batch(cases, max_concurrency=2, executor="process", chunk_size=3).results
+    thread_results = metric.calculate_batch(cases).results
+    assert [result.model_dump(exclude={"extra"}) for result in process_results] == [
+        result.model_dump(exclude={"extra"}) for result in thread_results
+    ]
+
+
+def test_process_errors_are_captured():
+    cases = [RageCase(question="q"), *generate_corpus("small")[:2]]
+    metric = ContextPrecisionRecallF1.from_parameters()
+    results = metric.calculate_batch(cases, max_concurrency=2, executor="process").results
+    assert isinstance(results[0], ErrorResult)
+    assert not any(isinstance(result, ErrorResult) for result in results[1:])
+
+
+def test_generate_based_metrics_stay_in_process(fake_judge):
+    metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge")
+    with pytest.raises(ValueError, match="worker processes"):
+        metric.calculate_batch(generate_corpus("small")[:2], executor="process")
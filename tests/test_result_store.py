@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+import pytest
+
+from rage.case import RageCase
+from rage.metrics import ContextPrecisionRecallF1, RougeLAnswerFaithfulness
+from rage.result_store import ResultStore
+from rage.results import ErrorResult, FaithfulnessResult
+from rage.suite import EvaluationSuite
+
+
+@pytest.fixture()
+def store():
+    results = [
+        FaithfulnessResult(faithfulness=1.0),
+        FaithfulnessResult(faithfulness=0.5),
+        ErrorResult(error="boom", error_type="ValueError"),
+        FaithfulnessResult(faithfulness=0.0, extra={"note": "no support"}),
+    ]
+    cases = [RageCase(extra={"lang": lang}) for lang in ("zh", "en", "zh", "zh")]
+    return ResultStore.from_batch(results, "faithfulness", cases=cases, keep_extra=True)
+
+
+def test_aggregations_skip_errors(store):
+    assert store["faithfulness.faithfulness"].tolist()[:2] == [1.0, 0.5]
+    assert math.isnan(store["faithfulness.faithfulness"][2])
+    assert store.mean() == {"faithfulness.faithfulness": 0.5}
+    assert store.percentiles([50])["faithfulness.faithfulness"] == {"p50": 0.5}
+    assert store.error_rate() == {"faithfulness": 0.25}
+    assert store.extras["faithfulness"][3] == {"note": "no support"}
+
+
+def test_group_by_case_extra(store):
+    assert store.group_mean("lang") == {"zh": {"faithfulness.faithfulness": 0.5}, "en": {"faithfulness.faithfulness": 0.5}}
+    groups = store.group_by("lang")
+    assert set(groups) == {"zh", "en"}
+    assert groups["zh"].case_index.tolist() == [0, 2, 3]
+    assert groups["zh"].error_rate() == {"faithfulness": pytest.approx(1 / 3)}
+
+
+def test_from_suite_rows_and_csv(tmp_path):
+    cases = [
+        RageCase(
+            answer="巴黎是法国的首都。",
+            retrieved_contexts=["巴黎是法国的首都"],
+            contexts=["巴黎是法国的首都"],
+            extra={"split": "a"},
+        ),
+        RageCase(answer="柏林在德国。", retrieved_contexts=["东京在日本"], extra={"split": "b"}),
+    ]
+    suite = EvaluationSuite({"faithfulness": RougeLAnswerFaithfulness(), "prf1": ContextPrecisionRecallF1()})
+    store = ResultStore.from_suite_result(suite.run(cases), cases)
+    assert set(store.columns) == {"faithfulness.faithfulness", "prf1.precision", "prf1.recall", "prf1.f1"}
+    assert store.error_rate() == {"faithfulness": 0.0, "prf1": 0.5}
+    assert np.array_equal(store.label("split"), np.array(["a", "b"], dtype=object))
+
+    store.to_csv(tmp_path / "results.csv")
+    header, *lines = (tmp_path / "results.csv").read_text(encoding="utf-8").splitlines()
+    assert header.split(",")[:2] == ["case_index", "split"]
+    assert len(lines) == len(cases)
+
+
+def test_bool_labels_do_not_merge_with_numbers():
+    results = [FaithfulnessResult(faithfulness=score) for score in (1.0, 0.0, 0.5)]
+    cases = [RageCase(extra={"k": value}) for value in (True, 1, False)]
+    store = ResultStore.from_batch(results, "faithfulness", cases=cases)
+    assert store.label("k").tolist() == [True, 1, False]
+    assert store.group_mean("k") == {
+        "True": {"faithfulness.faithfulness": 1.0},
+        1: {"faithfulness.faithfulness": 0.0},
+        False: {"faithfulness.faithfulness": 0.5},
+    }
+    assert set(store.group_by("k")) == {"True", 1, False}
+    assert ResultStore.from_batch(results[:1], "faithfulness", cases=cases[:1]).group_mean("k") == {
+        True: {"faithfulness.faithfulness": 1.0}
+    }
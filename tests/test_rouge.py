@@ -0,0 +1,34 @@
+import random
+
+from rage.rouge import RougeL, batch_lcs_length, lcs_length
+from rage.tokenizer import char_tokenize
+
+
+def naive_lcs_length(tokens, reference_tokens):
+    table = [[0] * (len(reference_tokens) + 1) for _ in range(len(tokens) + 1)]
+    for i, token in enumerate(tokens, start=1):
+        for j, reference_token in enumerate(reference_tokens, start=1):
+            if token == reference_token:
+                table[i][j] = table[i - 1][j - 1] + 1
+            else:
+                table[i][j] = max(table[i - 1][j], table[i][j - 1])
+    return table[-1][-1]
+
+
+def test_lcs_length_matches_naive_dp():
+    rng = random.Random(0)
+    for _ in range(50):
+        tokens = rng.choices("abcde", k=rng.randint(0, 100))
+        references = [rng.choices("abcdef", k=rng.randint(0, 100)) for _ in range(3)]
+        expected = [naive_lcs_length(tokens, reference) for reference in references]
+        assert [lcs_length(tokens, reference) for reference in references] == expected
+        assert batch_lcs_length(tokens, references).tolist() == expected
+
+
+def test_rouge_l_chinese_char_level():
+    rouge_l = RougeL(char_tokenize)
+    score = rouge_l.score("巴黎是法国的首都", "法国的首都")
+    assert (score.precision, score.recall) == (5 / 8, 1.0)
+    assert rouge_l.score_many("巴黎是法国的首都", ["法国的首都", "", "巴黎"]) == [
+        rouge_l.score("巴黎是法国的首都", reference) for reference in ["法国的首都", "", "巴黎"]
+    ]
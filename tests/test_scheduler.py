@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from rage.case import RageCase
+from rage.metrics import GenerateBasedAnswerRelevance
+from rage.scheduler import RateLimitScheduler, TokenBucket, is_rate_limit_error
+from rage.tokenizer import estimate_tokens
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_token_bucket_paces_reservations():
+    bucket = TokenBucket(capacity_per_minute=60)
+    now = bucket.updated_at = 0.0
+    assert bucket.reserve(60, now=now) == 0
+    assert bucket.reserve(30, now=now) == pytest.approx(30)
+    assert bucket.reserve(1, now=now + 31) == 0
+    assert bucket.reserve(1, rate_scale=0.5, now=now + 31) == pytest.approx(2)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("巴黎是法国的首都") == 8  # noqa: PLR2004
+    assert estimate_tokens("Paris is the capital") == 5  # noqa: PLR2004
+
+
+def test_scheduler_retries_rate_limits_and_slows_down():
+    scheduler = RateLimitScheduler(requests_per_minute=6000, initial_backoff=0.01)
+    attempts = []
+
+    def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:  # noqa: PLR2004
+            raise RateLimitError
+        return "ok"
+
+    assert scheduler.run(flaky) == "ok"
+    assert scheduler.stats.num_rate_limited == 2  # noqa: PLR2004
+    assert scheduler.stats.num_requests == 3  # noqa: PLR2004
+    assert scheduler.stats.rate_scale == pytest.approx(0.3)
+    assert scheduler.stats.queue_depth == 0
+
+    with pytest.raises(KeyError):
+        scheduler.run(lambda: {}["missing"])
+
+    wrapped = RuntimeError("retries exhausted")
+    wrapped.__cause__ = RateLimitError()
+    assert is_rate_limit_error(wrapped)
+
+    no_retry = RateLimitScheduler(max_retries=0)
+    with pytest.raises(RateLimitError):
+        asyncio.run(no_retry.async_run(flaky_async))
+
+
+async def flaky_async() -> str:
+    raise RateLimitError
+
+
+def test_model_routes_requests_through_scheduler(fake_judge):
+    scheduler = RateLimitScheduler(requests_per_minute=600, tokens_per_minute=10**6)
+    metric = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", scheduler=scheduler)
+    case = RageCase(question="法国的首都是哪里？", answer="巴黎")
+    metric.calculate(case)
+    asyncio.run(metric.acalculate(case))
+    assert scheduler.stats.num_requests == 2  # noqa: PLR2004
+    assert metric.model.estimate_prompt_tokens("巴黎") > estimate_tokens("巴黎")
@@ -0,0 +1,51 @@
+from rage.segmenter import SentenceSegmenter, sentence_spans, split_sentences_batch
+from rage.utils import split_chinese_sentences
+
+
+def test_chinese_and_english_sentences():
+    text = "巴黎是法国的首都。It has 2.1 million people, e.g. many. Dr. Smith agrees! 对吗？是的"
+    assert split_chinese_sentences(text) == [
+        "巴黎是法国的首都",
+        "It has 2.1 million people, e.g. many",
+        "Dr. Smith agrees",
+        "对吗",
+        "是的",
+    ]
+
+
+def test_spans_index_the_original_text():
+    text = '  He said "yes." 好的。  '
+    spans = sentence_spans(text)
+    assert [text[start:end] for start, end in spans] == ['He said "yes', "好的"]
+    assert sentence_spans("") == ()
+
+
+def test_batch_and_cache():
+    segmenter = SentenceSegmenter(abbreviations=["approx"])
+    texts = ["It is approx. 3 km. Walk.", "It is approx. 3 km. Walk.", "一。二"]
+    assert segmenter.split_batch(texts) == [["It is approx. 3 km", "Walk"], ["It is approx. 3 km", "Walk"], ["一", "二"]]
+    assert segmenter.cache_info().hits == 1
+    assert split_sentences_batch(["a. B"]) == [["a", "B"]]
+
+
+def test_initials():
+    texts = ["J. R. R. Tolkien wrote it. So do I. He agreed.", "Plan B. Next. Take vitamin C."]
+    assert split_sentences_batch(texts) == [
+        ["J. R. R. Tolkien wrote it", "So do I", "He agreed"],
+        ["Plan B. Next", "Take vitamin C"],
+    ]
+
+
+def test_sentence_final_abbreviations_and_acronyms():
+    texts = [
+        "We bought apples, pears etc. Then we left.",
+        "He works at Acme Inc. The firm grew.",
+        "The U.S. economy grew. It rose.",
+        "Apples etc. are fruit. Dr. Smith agrees.",
+    ]
+    assert split_sentences_batch(texts) == [
+        ["We bought apples, pears etc", "Then we left"],
+        ["He works at Acme Inc", "The firm grew"],
+        ["The U.S. economy grew", "It rose"],
+        ["Apples etc. are fruit", "Dr. Smith agrees"],
+    ]
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+
+from rage.case import RageCase
+from rage.metrics import RougeLAnswerFaithfulness
+from rage.stats import align, bootstrap_ci, paired_bootstrap_test, paired_permutation_test, run_scores
+from rage.suite import EvaluationSuite
+
+
+def test_bootstrap_ci_covers_the_mean():
+    values = np.random.default_rng(0).normal(0.6, 0.1, size=2000)
+    interval = bootstrap_ci(values, num_resamples=2000, seed=0, chunk_size=300)
+    assert interval.low < 0.6 < interval.high  # noqa: PLR2004
+    assert interval.high - interval.low < 0.02  # noqa: PLR2004
+    assert bootstrap_ci(values, num_resamples=500, seed=1) == bootstrap_ci(values, num_resamples=500, seed=1, chunk_size=7)
+
+
+def test_paired_tests_detect_a_real_difference():
+    rng = np.random.default_rng(0)
+    baseline = rng.random(500)
+    improved = baseline + 0.05 + rng.normal(0, 0.05, size=500)
+    for comparison in (
+        paired_bootstrap_test(baseline, improved, num_resamples=2000, seed=0),
+        paired_permutation_test(baseline, improved, num_permutations=2000, seed=0),
+    ):
+        assert comparison.difference == pytest.approx(0.05, abs=0.01)
+        assert comparison.is_significant
+
+    unchanged = paired_permutation_test(baseline, baseline + rng.normal(0, 0.05, size=500), seed=0)
+    assert not unchanged.is_significant
+
+
+def test_resampling_parameters_are_validated():
+    values = [0.1, 0.5, 0.9]
+    with pytest.raises(ValueError, match="num_resamples must be at least 1"):
+        bootstrap_ci(values, num_resamples=0)
+    with pytest.raises(ValueError, match="confidence must be between 0 and 1"):
+        bootstrap_ci(values, confidence=95)
+    with pytest.raises(ValueError, match="confidence must be between 0 and 1"):
+        paired_bootstrap_test(values, values, confidence=1.0)
+    with pytest.raises(ValueError, match="num_resamples must be at least 1"):
+        paired_bootstrap_test(values, values, num_resamples=0)
+    with pytest.raises(ValueError, match="num_permutations must be at least 1"):
+        paired_permutation_test(values, values, num_permutations=0)
+
+
+def test_runs_are_aligned_by_case_id():
+    baseline = {"a": 1.0, "b": 0.0, "c": math.nan}
+    candidate = {"c": 1.0, "b": 1.0, "a": 1.0, "d": 0.0}
+    baseline_values, candidate_values = align(baseline, candidate)
+    assert baseline_values.tolist() == [1.0, 0.0]
+    assert candidate_values.tolist() == [1.0, 1.0]
+
+
+def test_run_scores_from_suite_rows():
+    cases = [
+        RageCase(answer="巴黎是法国的首都。", retrieved_contexts=["巴黎是法国的首都"], extra={"id": "paris"}),
+        RageCase(question="no answer", extra={"id": "empty"}),
+    ]
+    rows = EvaluationSuite([RougeLAnswerFaithfulness()]).evaluate(cases)
+    assert run_scores(rows, "RougeLAnswerFaithfulness", "faithfulness", cases) == {"paris": 1.0, "empty": 0.0}
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from rage.case import RageCase
+from rage.metrics import (
+    ContextPrecisionRecallF1,
+    GenerateBasedAnswerCorrectness,
+    GenerateBasedContextPrecision,
+    RougeLAnswerCorrectness,
+)
+from rage.results import CorrectnessResult, ErrorResult
+from rage.suite import EvaluationSuite
+
+cases = [
+    RageCase(
+        question="What is the capital of France?",
+        answer="Paris is the capital of France.",
+        contexts=["Paris is the capital of France."],
+        retrieved_contexts=["Paris is the capital of France.", "Paris is the capital of France."],
+        generated_answer="Paris",
+    ),
+    RageCase(question="Who wrote 'Romeo and Juliet'?", answer="Shakespeare", generated_answer="Shakespeare"),
+]
+
+
+def make_suite():
+    return EvaluationSuite(
+        {
+            "correctness": GenerateBasedAnswerCorrectness.from_parameters(model_id="fake/judge"),
+            "correctness_copy": GenerateBasedAnswerCorrectness.from_parameters(model_id="fake/judge"),
+            "context_precision": GenerateBasedContextPrecision.from_parameters(model_id="fake/judge"),
+            "rouge_l": RougeLAnswerCorrectness(),
+            "context_prf": ContextPrecisionRecallF1(),
+        }
+    )
+
+
+def test_suite_returns_one_row_per_case_and_shares_requests(fake_judge):
+    rows = make_suite().evaluate(cases)
+    assert [row.case_index for row in rows] == [0, 1]
+    assert rows[0].results["correctness"] == rows[0].results["correctness_copy"]
+    assert isinstance(rows[1].results["rouge_l"], CorrectnessResult)
+    assert isinstance(rows[1].results["context_prf"], ErrorResult)
+    assert rows[0].num_shared_requests == rows[1].num_shared_requests + 1 == 2  # noqa: PLR2004
+    assert len(fake_judge.calls) == 3  # noqa: PLR2004
+
+
+def test_async_suite_matches_sync_suite(fake_judge):
+    suite = make_suite()
+    async_rows = asyncio.run(suite.arun(cases)).rows
+    assert async_rows == suite.evaluate(cases)
+    assert fake_judge.calls.count("async") == fake_judge.calls.count("sync")
+
+
+def test_suite_result_serializes_metric_fields(fake_judge):
+    suite_result = make_suite().run(cases)
+    loaded = json.loads(suite_result.model_dump_json())
+    for row, loaded_row in zip(suite_result.rows, loaded["rows"]):
+        for name, result in row.results.items():
+            restored = type(result).model_validate(loaded_row["results"][name])
+            assert restored.model_dump(mode="json") == result.model_dump(mode="json")
+    assert set(suite_result.rows[0].model_dump()["results"]["rouge_l"]) == {"extra", "correctness"}
+
+
+class CountingRougeL(RougeLAnswerCorrectness):
+    num_calls = 0
+    num_projections = 0
+
+    def refine_case(self, case: RageCase) -> RageCase:
+        refined_case = super().refine_case(case)
+        CountingRougeL.num_calls += 1
+        CountingRougeL.num_projections += refined_case is not case
+        return refined_case
+
+
+def test_metrics_reuse_the_shared_projection():
+    suite = EvaluationSuite({"rouge_l": CountingRougeL(), "rouge_l_copy": CountingRougeL()})
+    rows = suite.evaluate(cases)
+    assert rows[0].results["rouge_l"] == rows[0].results["rouge_l_copy"]
+    # One projection per case by the suite, then each metric checks it once in `calculate`.
+    assert (CountingRougeL.num_calls, CountingRougeL.num_projections) == (len(cases) * 3, len(cases))
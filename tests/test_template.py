@@ -0,0 +1,60 @@
+from rage.case import RageCase
+from rage.metrics import GenerateBasedAnswerFaithfulness, GenerateBasedAnswerRelevance, GenerateBasedContextPrecision
+from rage.template import BudgetedCaseTemplate, SimpleCaseTemplate, truncate_to_tokens
+from rage.tokenizer import estimate_tokens
+
+noise = "天气晴朗，适合出门散步。" * 20
+case = RageCase(
+    question="法国的首都是哪里？",
+    answer="巴黎",
+    retrieved_contexts=[noise, "法国的首都是巴黎。", noise + "。"],
+)
+
+
+def test_budgeted_template_within_budget_matches_simple_template():
+    template = BudgetedCaseTemplate(max_prompt_tokens=10_000)
+    _, report = template.pack(case)
+    assert template.format(case) == SimpleCaseTemplate().format(case)
+    assert not report.is_packed
+    assert report.kept["retrieved_contexts"] == [0, 1, 2]
+
+
+def test_budgeted_template_strategies():
+    budget = 270
+    ranked, report = BudgetedCaseTemplate(max_prompt_tokens=budget, strategy="rank").pack(case)
+    assert ranked.retrieved_contexts == ["法国的首都是巴黎。"]
+    assert report.dropped["retrieved_contexts"] == [0, 2]
+    assert report.estimated_tokens <= budget
+
+    _, report = BudgetedCaseTemplate(max_prompt_tokens=budget, strategy="keep").pack(case)
+    assert report.kept["retrieved_contexts"] == [0]
+
+    budget = 250
+    truncated, report = BudgetedCaseTemplate(max_prompt_tokens=budget, strategy="truncate").pack(case)
+    assert report.truncated["retrieved_contexts"] == [0]
+    assert report.dropped["retrieved_contexts"] == [1, 2]
+    assert report.estimated_tokens <= budget
+    assert truncate_to_tokens("abcdefgh", 1) == "abcd"
+    assert estimate_tokens(truncated.retrieved_contexts[0]) < estimate_tokens(noise)
+
+
+def test_metrics_record_context_packing(fake_judge):
+    template = BudgetedCaseTemplate(max_prompt_tokens=300)
+    relevance = GenerateBasedAnswerRelevance.from_parameters(model_id="fake/judge", case_template=template)
+    relevance_case = case.model_copy(update={"generated_answer": "巴黎"})
+    assert not relevance.calculate(relevance_case).extra["context_packing"]["dropped"]
+
+    precision = GenerateBasedContextPrecision.from_parameters(model_id="fake/judge", case_template=template)
+    reports = precision.calculate(case).extra["context_packing"]
+    assert len(reports) == len(case.retrieved_contexts)
+
+
+def test_metrics_pack_each_case_once(fake_judge, monkeypatch):
+    template = BudgetedCaseTemplate(max_prompt_tokens=300)
+    pack = BudgetedCaseTemplate.pack
+    packed_cases = []
+    monkeypatch.setattr(BudgetedCaseTemplate, "pack", lambda self, case: packed_cases.append(case) or pack(self, case))
+    faithfulness = GenerateBasedAnswerFaithfulness.from_parameters(model_id="fake/judge", case_template=template)
+    result = faithfulness.calculate(case.model_copy(update={"generated_answer": "巴黎"}))
+    assert result.extra["context_packing"]["dropped"] == {"retrieved_contexts": [2]}
+    assert len(packed_cases) == 1